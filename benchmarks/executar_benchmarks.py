@@ -0,0 +1,377 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmarks dos pipelines de dados e dos agentes, sem rede nem chaves de API.
+
+Os serviços externos são trocados pelos substitutos de 'substitutos.py':
+respostas HTTP gravadas (arXiv e ComexStat), um LLM que reproduz respostas
+gravadas e um embedding determinístico. Cada caso é repetido e a mediana é
+comparada com a linha de base salva em 'baseline.json' (na primeira execução,
+sem linha de base, os resultados são gravados como linha de base).
+
+Execução (a partir da raiz do repositório):
+    python benchmarks/executar_benchmarks.py                  # compara com a linha de base
+    python benchmarks/executar_benchmarks.py --salvar-baseline
+    python benchmarks/executar_benchmarks.py --tamanhos 100 1000 --repeticoes 3
+    python benchmarks/executar_benchmarks.py --linhas-sinteticas 1000000 10000000
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from substitutos import (
+    DIR_FIXTURES,
+    EmbeddingDeterministico,
+    LLMGravado,
+    ServidorFixtures,
+    carregar_config,
+    importar_modulo,
+)
+
+DIR_BENCHMARKS = os.path.dirname(os.path.abspath(__file__))
+ARQUIVO_BASELINE = os.path.join(DIR_BENCHMARKS, "baseline.json")
+ARQUIVO_RESULTADO = os.path.join(DIR_BENCHMARKS, "resultado.json")
+
+VOCABULARIO = (
+    "algoritmo recomendação rede social engajamento privacidade dados modelo linguagem "
+    "aprendizado profundo usuário conteúdo moderação desinformação ética tendência "
+    "generativa classificação grafo influência comunidade métrica avaliação"
+).split()
+
+
+def gerar_corpus(quantidade: int, palavras_por_documento: int = 200, semente: int = 42):
+    """
+    Gera documentos sintéticos e determinísticos a partir de um vocabulário fixo.
+    """
+    from llama_index.core import Document
+
+    aleatorio = random.Random(semente)
+    return [
+        Document(text=" ".join(aleatorio.choices(VOCABULARIO, k=palavras_por_documento)), doc_id=f"doc_{i}")
+        for i in range(quantidade)
+    ]
+
+
+class Medidor:
+    def __init__(self, repeticoes: int):
+        self.repeticoes = repeticoes
+        self.resultados = {}
+
+    def medir(self, nome: str, fn, repeticoes: int = None, medir_memoria: bool = False):
+        """
+        Executa 'fn' repetidas vezes (sem a saída dos prints) e guarda a
+        mediana e o mínimo em milissegundos. Com 'medir_memoria', registra
+        também o pico de memória alocada (via tracemalloc, que deixa a
+        execução mais lenta).
+        """
+        tempos = []
+        pico = 0
+        for _ in range(repeticoes or self.repeticoes):
+            if medir_memoria:
+                tracemalloc.start()
+            with contextlib.redirect_stdout(io.StringIO()):
+                inicio = time.perf_counter()
+                fn()
+                tempos.append((time.perf_counter() - inicio) * 1000)
+            if medir_memoria:
+                pico = max(pico, tracemalloc.get_traced_memory()[1])
+                tracemalloc.stop()
+        self.resultados[nome] = {
+            "mediana_ms": round(statistics.median(tempos), 3),
+            "min_ms": round(min(tempos), 3),
+            "repeticoes": len(tempos),
+        }
+        memoria = ""
+        if medir_memoria:
+            self.resultados[nome]["pico_memoria_mb"] = round(pico / 1024 ** 2, 1)
+            memoria = f"  pico {self.resultados[nome]['pico_memoria_mb']:.1f} MB"
+        print(f"{nome:<40} mediana {self.resultados[nome]['mediana_ms']:>10.2f} ms  (mín. {self.resultados[nome]['min_ms']:.2f} ms){memoria}")
+
+
+# ==============================================================================
+# CASOS
+# ==============================================================================
+def benchmarks_comex(medidor: Medidor, config_comex):
+    medidor.medir("comex.obter_dados", lambda: config_comex.obter_dados_comex("2024", "março", "EXP"))
+    medidor.medir("comex.resumo.media_peso", lambda: config_comex.resumo_dados_comex("média do peso líquido"))
+    medidor.medir("comex.resumo.principais_estados", lambda: config_comex.resumo_dados_comex("principais estados"))
+    medidor.medir("comex.resumo.media_peso_uf", lambda: config_comex.resumo_dados_comex("média do peso líquido", uf="SP"))
+    config_comex.limpar_dados_comex()
+
+
+def benchmarks_comex_sintetico(medidor: Medidor, config_comex, quantidades_linhas):
+    """
+    Mede a carga de arquivos sintéticos grandes servidos por HTTP local.
+    """
+    gerador = importar_modulo("comex", "gerador_dados_sinteticos")
+    url_original = config_comex.COMEX_URL_BASE
+    for linhas in quantidades_linhas:
+        with tempfile.TemporaryDirectory() as diretorio:
+            with contextlib.redirect_stdout(io.StringIO()):
+                gerador.gerar_arquivo_comex(os.path.join(diretorio, "comex"), linhas, ano=2024, tipo_operacao="EXP")
+            with ServidorFixtures(diretorio) as servidor:
+                config_comex.COMEX_URL_BASE = f"{servidor.url_base}/comex"
+                medidor.medir(
+                    f"comex.obter_dados.sintetico.{linhas}",
+                    lambda: config_comex.obter_dados_comex("2024", "março", "EXP"),
+                    repeticoes=1,
+                    medir_memoria=True,
+                )
+                config_comex.limpar_dados_comex()
+    config_comex.COMEX_URL_BASE = url_original
+
+
+def benchmarks_indice(medidor: Medidor, config_exemplo, tamanhos):
+    for tamanho in tamanhos:
+        documentos = gerar_corpus(tamanho)
+        with tempfile.TemporaryDirectory() as diretorio:
+            indice = {}
+
+            def construir():
+                indice["atual"] = config_exemplo.VectorStoreIndex.from_documents(documentos)
+                indice["atual"].storage_context.persist(persist_dir=diretorio)
+
+            def carregar():
+                contexto = config_exemplo.StorageContext.from_defaults(persist_dir=diretorio)
+                indice["atual"] = config_exemplo.load_index_from_storage(contexto)
+
+            medidor.medir(f"indice.construir.{tamanho}", construir, repeticoes=1)
+            medidor.medir(f"indice.carregar.{tamanho}", carregar)
+            retriever = indice["atual"].as_retriever(similarity_top_k=3)
+            medidor.medir(
+                f"indice.consultar.{tamanho}",
+                lambda: retriever.retrieve("algoritmos de recomendação e privacidade nas redes sociais"),
+            )
+
+
+def gerar_postagens(destino: str, quantidade: int, semente: int = 42) -> str:
+    """
+    Grava um Parquet sintético de postagens para 'analisar_engajamento_lote'.
+    """
+    import numpy as np
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    rng = np.random.default_rng(semente)
+    datas = np.datetime64("2023-01-01") + rng.integers(0, 730, quantidade).astype("timedelta64[D]")
+    tabela = pa.table({
+        "id": pa.array([f"post_{i}" for i in range(quantidade)]),
+        "data": pa.array(datas.astype("datetime64[s]")),
+        "curtidas": rng.poisson(150, quantidade),
+        "comentarios": rng.poisson(30, quantidade),
+        "compartilhamentos": rng.poisson(10, quantidade),
+        "seguidores": rng.integers(100, 50_000, quantidade),
+    })
+    caminho = os.path.join(destino, f"postagens_{quantidade}.parquet")
+    pq.write_table(tabela, caminho)
+    return caminho
+
+
+def benchmarks_engajamento(medidor: Medidor, config_exemplo, quantidade: int = 100_000):
+    with tempfile.TemporaryDirectory() as diretorio:
+        caminho = gerar_postagens(diretorio, quantidade)
+        medidor.medir(
+            f"engajamento.lote.{quantidade}",
+            lambda: config_exemplo.analisar_engajamento_lote(caminho, top_n=10, periodo="semana"),
+        )
+
+
+def benchmarks_sessao(medidor: Medidor, config_exemplo):
+    """
+    Grava a sessão duas vezes seguidas, cada uma com a memória de um script,
+    e confere que as duas memórias voltam na restauração.
+    """
+    from comum.sessao import SessaoPersistente
+    from llama_index.core.llms import ChatMessage, MessageRole
+
+    def memoria_com(texto: str):
+        memoria = config_exemplo.gerenciador_contexto.criar_memoria()
+        memoria.put(ChatMessage(role=MessageRole.USER, content=texto))
+        return memoria
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        sessao = SessaoPersistente("benchmark", diretorio)
+
+        def salvar_e_restaurar():
+            sessao.salvar(memorias={"agente_funcoes": memoria_com("passo 1")})
+            sessao.salvar(config_exemplo.armazem_artefatos, {"agente_documentos": memoria_com("passo 3")})
+            restauradas = {
+                "agente_funcoes": config_exemplo.gerenciador_contexto.criar_memoria(),
+                "agente_documentos": config_exemplo.gerenciador_contexto.criar_memoria(),
+            }
+            sessao.restaurar(config_exemplo.armazem_artefatos, restauradas)
+            for nome, memoria in restauradas.items():
+                if not memoria.get_all():
+                    raise AssertionError(f"O histórico de '{nome}' se perdeu ao gravar a sessão.")
+
+        medidor.medir("sessao.salvar_restaurar", salvar_e_restaurar)
+
+
+# Pedidos que a rota rápida atende sozinha e pedidos que ela só atenderia em parte
+PEDIDOS_ROTA_RAPIDA = {
+    "comex": [
+        "Baixe os dados de importação de maio de 2024. Depois, me diga qual a média do peso líquido das cargas.",
+        "Para o ano de 2024, no mês de abril, quais foram os 5 principais estados exportadores?",
+        "Carregue as importações de janeiro de 2024 e me diga os principais estados.",
+        "Qual a média do peso líquido das exportações de março de 2024?",
+    ],
+    "exemplo": [
+        "Qual é o engajamento de uma postagem com 150 curtidas, 35 comentários, 20 compartilhamentos e 2000 seguidores?",
+        "Analise o engajamento de posts.csv por semana e mostre os 3 melhores posts.",
+    ],
+}
+PEDIDOS_DO_AGENTE = {
+    "comex": [
+        "Qual a média do peso líquido das exportações de maio de 2024 para a China?",
+        "Qual a média do peso líquido das exportações de maio de 2024? Compare com 2023.",
+        "Qual a média do peso líquido das exportações de maio de 2024, e também a mediana?",
+    ],
+    "exemplo": [
+        "Compare o engajamento de dois posts: um com 150 curtidas, 35 comentários, 20 compartilhamentos e "
+        "2000 seguidores, e outro com 10 curtidas, 2 comentários, 1 compartilhamentos e 500 seguidores.",
+        "Calcule o engajamento de uma postagem com 150 curtidas, 35 comentários, 20 compartilhamentos e "
+        "2000 seguidores e me retorne artigos sobre engajamento no arXiv.",
+        "Analise o engajamento de posts.csv nos últimos 2 anos.",
+    ],
+}
+
+
+def benchmarks_rota_rapida(medidor: Medidor, configs):
+    for projeto, config in configs.items():
+        pre_roteador = config.pre_roteador
+        for pedido in PEDIDOS_ROTA_RAPIDA[projeto]:
+            _, confianca = pre_roteador.planejar(pedido)
+            if confianca < pre_roteador.confianca_minima:
+                raise AssertionError(f"A rota rápida deixou de atender: {pedido!r} (confiança {confianca:.2f}).")
+        for pedido in PEDIDOS_DO_AGENTE[projeto]:
+            _, confianca = pre_roteador.planejar(pedido)
+            if confianca >= pre_roteador.confianca_minima:
+                raise AssertionError(f"A rota rápida atenderia só parte de: {pedido!r} (confiança {confianca:.2f}).")
+        pedidos = PEDIDOS_ROTA_RAPIDA[projeto] + PEDIDOS_DO_AGENTE[projeto]
+        medidor.medir(f"rota_rapida.{projeto}.planejar", lambda p=pre_roteador, ps=pedidos: [p.planejar(t) for t in ps])
+
+
+def benchmarks_agente(medidor: Medidor, config_exemplo, llm: LLMGravado, respostas):
+    medidor.medir("arxiv.consulta_artigos", lambda: config_exemplo.consulta_artigos("inteligência artificial"))
+
+    agente = config_exemplo.ReActAgent(
+        tools=[config_exemplo.FunctionTool.from_defaults(fn=config_exemplo.calcular_engajamento)],
+        llm=llm,
+    )
+
+    async def perguntar():
+        # 'agent.run' precisa de um loop de eventos ativo
+        return await agente.run(
+            "Qual é o engajamento de uma postagem com 150 curtidas, 35 comentários, "
+            "20 compartilhamentos e 2000 seguidores?"
+        )
+
+    def executar_agente():
+        llm.reproduzir(respostas["agente_engajamento"])
+        asyncio.run(perguntar())
+
+    medidor.medir("agente.engajamento.ponta_a_ponta", executar_agente)
+
+    # Busca no arXiv (servidor de fixtures) chamada pelo agente
+    agente_arxiv = config_exemplo.ReActAgent(
+        tools=[config_exemplo.FunctionTool.from_defaults(fn=config_exemplo.consulta_artigos)],
+        llm=llm,
+    )
+
+    def executar_agente_arxiv():
+        llm.reproduzir(respostas["agente_arxiv"])
+        asyncio.run(agente_arxiv.run("Quais artigos do arXiv tratam de inteligência artificial nas redes sociais?"))
+
+    medidor.medir("agente.arxiv.ponta_a_ponta", executar_agente_arxiv)
+
+
+# ==============================================================================
+# COMPARAÇÃO COM A LINHA DE BASE
+# ==============================================================================
+def comparar(resultados, tolerancia: float) -> bool:
+    """
+    Compara as medianas com 'baseline.json'. Retorna False se algum caso
+    ficou mais lento que a linha de base além da tolerância. Sem linha de
+    base (primeira execução), os resultados atuais viram a linha de base.
+    """
+    if not os.path.exists(ARQUIVO_BASELINE):
+        with open(ARQUIVO_BASELINE, "w", encoding="utf-8") as f:
+            json.dump(resultados, f, indent=2, ensure_ascii=False)
+        print(f"\nNenhuma linha de base encontrada: resultados atuais gravados em {ARQUIVO_BASELINE}.")
+        return True
+    with open(ARQUIVO_BASELINE, encoding="utf-8") as f:
+        baseline = json.load(f)
+
+    print(f"\n{'Caso':<40} {'Base (ms)':>12} {'Atual (ms)':>12} {'Variação':>10}")
+    sem_regressao = True
+    for nome, atual in resultados.items():
+        if nome not in baseline:
+            print(f"{nome:<40} {'-':>12} {atual['mediana_ms']:>12.2f} {'novo':>10}")
+            continue
+        base = baseline[nome]["mediana_ms"]
+        variacao = (atual["mediana_ms"] - base) / base if base else 0.0
+        marcador = ""
+        if variacao > tolerancia:
+            marcador = "  <-- REGRESSÃO"
+            sem_regressao = False
+        print(f"{nome:<40} {base:>12.2f} {atual['mediana_ms']:>12.2f} {variacao:>+9.1%}{marcador}")
+    return sem_regressao
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks com fixtures gravadas.")
+    parser.add_argument("--tamanhos", type=int, nargs="+", default=[100, 1000, 5000], help="Tamanhos do corpus do índice.")
+    parser.add_argument("--repeticoes", type=int, default=5)
+    parser.add_argument("--tolerancia", type=float, default=0.20, help="Aumento relativo aceito antes de acusar regressão.")
+    parser.add_argument("--linhas-sinteticas", type=int, nargs="*", default=[], help="Tamanhos de arquivos ComexStat sintéticos a carregar.")
+    parser.add_argument("--salvar-baseline", action="store_true")
+    args = parser.parse_args()
+
+    with open(os.path.join(DIR_FIXTURES, "llm_respostas.json"), encoding="utf-8") as f:
+        respostas = json.load(f)
+    llm = LLMGravado(respostas=respostas["sintese"])
+    embed_model = EmbeddingDeterministico()
+    medidor = Medidor(args.repeticoes)
+
+    with ServidorFixtures() as servidor:
+        with contextlib.redirect_stdout(io.StringIO()):
+            config_comex = carregar_config("comex", servidor.url_base, llm, embed_model)
+            config_exemplo = carregar_config("exemplo", servidor.url_base, llm, embed_model)
+
+        print("\n=== ComexStat ===")
+        benchmarks_comex(medidor, config_comex)
+        if args.linhas_sinteticas:
+            benchmarks_comex_sintetico(medidor, config_comex, args.linhas_sinteticas)
+        print("\n=== Índice vetorial ===")
+        benchmarks_indice(medidor, config_exemplo, args.tamanhos)
+        print("\n=== Engajamento em lote ===")
+        benchmarks_engajamento(medidor, config_exemplo)
+        print("\n=== Sessão ===")
+        benchmarks_sessao(medidor, config_exemplo)
+        print("\n=== Rota rápida ===")
+        benchmarks_rota_rapida(medidor, {"comex": config_comex, "exemplo": config_exemplo})
+        print("\n=== arXiv e agente ===")
+        benchmarks_agente(medidor, config_exemplo, llm, respostas)
+
+    with open(ARQUIVO_RESULTADO, "w", encoding="utf-8") as f:
+        json.dump(medidor.resultados, f, indent=2, ensure_ascii=False)
+    if args.salvar_baseline:
+        with open(ARQUIVO_BASELINE, "w", encoding="utf-8") as f:
+            json.dump(medidor.resultados, f, indent=2, ensure_ascii=False)
+        print(f"\nLinha de base salva em {ARQUIVO_BASELINE}")
+        return
+    if not comparar(medidor.resultados, args.tolerancia):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+# -*- coding: utf-8 -*-
+"""
+Substitutos locais e determinísticos para os serviços externos usados pelos
+scripts: um servidor HTTP que entrega as respostas gravadas do arXiv e os
+arquivos da ComexStat, um LLM que reproduz respostas gravadas e um modelo de
+embedding determinístico. Permitem medir desempenho sem rede nem chaves.
+"""
+
+import functools
+import hashlib
+import importlib.util
+import math
+import os
+import re
+import sys
+import threading
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, List, Sequence
+
+from llama_index.core.base.embeddings.base import BaseEmbedding
+from llama_index.core.base.llms.types import CompletionResponse, LLMMetadata
+from llama_index.core.llms import CustomLLM
+from llama_index.core.llms.callbacks import llm_completion_callback
+from pydantic import Field, PrivateAttr
+
+RAIZ_REPOSITORIO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DIR_FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+
+# ==============================================================================
+# LLM E EMBEDDING
+# ==============================================================================
+class LLMGravado(CustomLLM):
+    """
+    LLM que devolve, em ordem e de forma cíclica, uma lista de respostas gravadas.
+    """
+
+    respostas: List[str] = Field(default_factory=list)
+    _posicao: int = PrivateAttr(default=0)
+
+    @classmethod
+    def class_name(cls) -> str:
+        return "LLMGravado"
+
+    @property
+    def metadata(self) -> LLMMetadata:
+        return LLMMetadata(model_name="llm-gravado", is_chat_model=False)
+
+    def reproduzir(self, respostas: Sequence[str]) -> None:
+        self.respostas = list(respostas)
+        self._posicao = 0
+
+    def _proxima(self) -> str:
+        resposta = self.respostas[self._posicao % len(self.respostas)]
+        self._posicao += 1
+        return resposta
+
+    @llm_completion_callback()
+    def complete(self, prompt: str, formatted: bool = False, **kwargs: Any) -> CompletionResponse:
+        return CompletionResponse(text=self._proxima())
+
+    @llm_completion_callback()
+    def stream_complete(self, prompt: str, formatted: bool = False, **kwargs: Any):
+        texto = self._proxima()
+
+        def gerar():
+            acumulado = ""
+            for pedaco in re.findall(r"\S+\s*", texto):
+                acumulado += pedaco
+                yield CompletionResponse(text=acumulado, delta=pedaco)
+
+        return gerar()
+
+
+class EmbeddingDeterministico(BaseEmbedding):
+    """
+    Embedding por hashing de palavras: textos com palavras em comum ficam
+    próximos, o que mantém a recuperação significativa sem modelo externo.
+    """
+
+    dimensao: int = 256
+
+    @classmethod
+    def class_name(cls) -> str:
+        return "EmbeddingDeterministico"
+
+    def _vetor(self, texto: str) -> List[float]:
+        vetor = [0.0] * self.dimensao
+        for palavra in re.findall(r"\w+", texto.lower()):
+            h = int.from_bytes(hashlib.blake2b(palavra.encode("utf-8"), digest_size=8).digest(), "little")
+            vetor[h % self.dimensao] += 1.0 if (h >> 63) & 1 else -1.0
+        norma = math.sqrt(sum(x * x for x in vetor)) or 1.0
+        return [x / norma for x in vetor]
+
+    def _get_query_embedding(self, query: str) -> List[float]:
+        return self._vetor(query)
+
+    async def _aget_query_embedding(self, query: str) -> List[float]:
+        return self._vetor(query)
+
+    def _get_text_embedding(self, text: str) -> List[float]:
+        return self._vetor(text)
+
+
+# ==============================================================================
+# SERVIDOR HTTP DE FIXTURES
+# ==============================================================================
+class _ManipuladorFixtures(SimpleHTTPRequestHandler):
+    # A API do arXiv responde em /api/query?... independentemente da busca
+    rotas_fixas = {"/api/query": "arxiv/busca.xml"}
+
+    def translate_path(self, path):
+        caminho = path.split("?", 1)[0]
+        if caminho in self.rotas_fixas:
+            return os.path.join(self.directory, self.rotas_fixas[caminho])
+        return super().translate_path(path)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class ServidorFixtures:
+    """
+    Servidor HTTP local (em uma thread) que entrega os arquivos de 'raiz'.
+    Use como gerenciador de contexto; 'url_base' fica disponível dentro do bloco.
+    """
+
+    def __init__(self, raiz: str = DIR_FIXTURES):
+        self.raiz = raiz
+        self.url_base = None
+        self._servidor = None
+
+    def __enter__(self) -> "ServidorFixtures":
+        manipulador = functools.partial(_ManipuladorFixtures, directory=self.raiz)
+        self._servidor = ThreadingHTTPServer(("127.0.0.1", 0), manipulador)
+        self.url_base = f"http://127.0.0.1:{self._servidor.server_address[1]}"
+        threading.Thread(target=self._servidor.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self._servidor.shutdown()
+        self._servidor.server_close()
+
+
+# ==============================================================================
+# CARREGAMENTO DOS MÓDULOS DE CONFIGURAÇÃO
+# ==============================================================================
+def importar_modulo(projeto: str, nome: str):
+    """
+    Importa '<projeto>/<nome>.py' com um nome próprio ('<projeto>_<nome>'),
+    evitando conflitos entre os módulos de mesmo nome dos dois projetos.
+    """
+    diretorio = os.path.join(RAIZ_REPOSITORIO, projeto)
+    # Os scripts importam os módulos vizinhos do próprio projeto
+    if diretorio not in sys.path:
+        sys.path.append(diretorio)
+    caminho = os.path.join(diretorio, f"{nome}.py")
+    spec = importlib.util.spec_from_file_location(f"{projeto}_{nome}", caminho)
+    modulo = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(modulo)
+    return modulo
+
+
+def carregar_config(projeto: str, url_base: str, llm: LLMGravado, embed_model: BaseEmbedding):
+    """
+    Importa o 'passo_0_configuracao_e_ferramentas.py' de um projeto ('exemplo'
+    ou 'comex') apontando os serviços externos para os substitutos locais.
+    """
+    for chave in ("GROQ_API_KEY", "NVIDIA_API_KEY", "TAVILY_API_KEY"):
+        os.environ.setdefault(chave, "benchmark")
+    os.environ["COMEX_URL_BASE"] = f"{url_base}/comex"
+    os.environ.setdefault("ARQUIVO_RASTREAMENTO", os.path.join(RAIZ_REPOSITORIO, "rastros", "benchmark.jsonl"))
+
+    config = importar_modulo(projeto, "passo_0_configuracao_e_ferramentas")
+
+    import arxiv
+
+    arxiv.Client.query_url_format = f"{url_base}/api/query?{{}}"
+    config.Settings.llm = llm
+    config.Settings.embed_model = embed_model
+    return config
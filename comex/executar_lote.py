@@ -0,0 +1,55 @@
+# executar_lote.py
+# -*- coding: utf-8 -*-
+"""
+Executa em lote as perguntas de um arquivo JSONL com o agente de comércio
+exterior (passo 1), várias ao mesmo tempo, e grava um resultado por linha
+com latência, ferramentas chamadas, tokens e resposta.
+
+Cada pergunta tem seu próprio contexto de dados ('novo_contexto_dados'):
+sem handle, 'resumo_dados_comex' consulta o que a própria pergunta carregou,
+nunca os dados de outra pergunta em paralelo.
+
+Exemplos:
+    python executar_lote.py
+    python executar_lote.py --consultas minhas_perguntas.jsonl --concorrencia 8 --por-minuto 20
+"""
+
+import argparse
+import asyncio
+import time
+
+import passo_0_configuracao_e_ferramentas as config
+from passo_1_agente_de_comex import criar_agente
+from comum.lote import ExecutorLote, formatar_resumo, ler_consultas
+
+
+async def main(args):
+    print("\n" + "=" * 50)
+    print("EXECUÇÃO EM LOTE: AGENTE DE COMÉRCIO EXTERIOR")
+    print("=" * 50 + "\n")
+
+    executor = ExecutorLote(
+        lambda: criar_agente(verbose=False),
+        concorrencia=args.concorrencia,
+        consultas_por_minuto=args.por_minuto,
+        pre_roteador=config.pre_roteador,
+        llm_sintese=config.roteador.llm("sintese"),
+        preparar_consulta=config.novo_contexto_dados,
+    )
+    resumo = await executor.executar(ler_consultas(args.consultas), args.saida)
+
+    print("\n--- Resumo do lote ---")
+    print(formatar_resumo(resumo))
+    print(f"Resultados em {args.saida}")
+
+    print("\n--- Estatísticas por rota de modelo ---")
+    print(config.roteador.relatorio())
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Executa perguntas em lote com o agente de comércio exterior.")
+    parser.add_argument("--consultas", default="consultas_lote.jsonl", help="JSONL com os campos 'id' e 'pergunta'.")
+    parser.add_argument("--saida", default=f"resultados_lote/comex_{time.strftime('%Y%m%d_%H%M%S')}.jsonl")
+    parser.add_argument("--concorrencia", type=int, default=4)
+    parser.add_argument("--por-minuto", type=float, default=None, help="Máximo de perguntas iniciadas por minuto.")
+    asyncio.run(main(parser.parse_args()))
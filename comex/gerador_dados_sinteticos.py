@@ -0,0 +1,156 @@
+# gerador_dados_sinteticos.py
+# -*- coding: utf-8 -*-
+"""
+Gerador de arquivos sintéticos no formato da ComexStat (EXP/IMP_<ano>_MUN.csv).
+
+Produz arquivos com as mesmas colunas, separador ';', aspas e codificação
+ISO-8859-1 dos arquivos oficiais, com cardinalidades e distribuições próximas
+das reais (concentração por estado, produto e país; pesos e valores com cauda
+longa). As linhas são geradas e gravadas em blocos, então arquivos de 1 a 100
+milhões de linhas não precisam caber na memória.
+
+Os arquivos gerados podem ser lidos por 'obter_dados_comex' apontando a
+variável COMEX_URL_BASE para o diretório de saída, ou para o servidor HTTP
+local iniciado com --servir.
+
+Exemplos:
+    python gerador_dados_sinteticos.py --linhas 10000000 --destino dados_sinteticos
+    python gerador_dados_sinteticos.py --linhas 1000000 --tipo IMP --servir 8000
+    COMEX_URL_BASE=dados_sinteticos python passo_1_agente_de_comex.py
+"""
+
+import argparse
+import csv
+import functools
+import os
+import time
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+import pandas as pd
+
+COLUNAS = ["CO_ANO", "CO_MES", "SH4", "CO_PAIS", "SG_UF_NCM", "CO_MUN", "KG_LIQUIDO", "VL_FOB"]
+
+# UF: (código IBGE, número de municípios, peso relativo nas operações)
+UFS = {
+    "SP": (35, 645, 24.0), "MG": (31, 853, 10.0), "RJ": (33, 92, 9.0), "PR": (41, 399, 8.0),
+    "RS": (43, 497, 8.0), "SC": (42, 295, 6.0), "MT": (51, 141, 5.0), "GO": (52, 246, 4.0),
+    "BA": (29, 417, 4.0), "PA": (15, 144, 3.5), "ES": (32, 78, 3.0), "MS": (50, 79, 2.5),
+    "AM": (13, 62, 2.0), "PE": (26, 185, 2.0), "CE": (23, 184, 1.5), "MA": (21, 217, 1.2),
+    "TO": (17, 139, 0.8), "DF": (53, 1, 0.6), "RN": (24, 167, 0.5), "PB": (25, 223, 0.5),
+    "AL": (27, 102, 0.4), "SE": (28, 75, 0.3), "PI": (22, 224, 0.3), "RO": (11, 52, 0.4),
+    "AP": (16, 16, 0.1), "AC": (12, 22, 0.1), "RR": (14, 15, 0.1),
+}
+QUANTIDADE_SH4 = 1250
+QUANTIDADE_PAISES = 240
+# Pesos mensais aproximados (o volume cresce ao longo do ano)
+PESOS_MESES = np.array([0.075, 0.072, 0.082, 0.080, 0.086, 0.085, 0.088, 0.088, 0.085, 0.087, 0.083, 0.089])
+
+
+def _pesos_zipf(quantidade: int, expoente: float) -> np.ndarray:
+    pesos = 1.0 / np.arange(1, quantidade + 1) ** expoente
+    return pesos / pesos.sum()
+
+
+class _Catalogos:
+    """
+    Códigos fixos (municípios, SH4, países) sorteados uma única vez por semente.
+    """
+
+    def __init__(self, rng: np.random.Generator):
+        self.siglas = np.array(list(UFS))
+        pesos = np.array([peso for _, _, peso in UFS.values()])
+        self.pesos_uf = pesos / pesos.sum()
+        quantidades = np.array([qtd for _, qtd, _ in UFS.values()])
+        self.inicio_mun = np.concatenate([[0], np.cumsum(quantidades)[:-1]])
+        self.qtd_mun = quantidades
+        self.municipios = np.concatenate([
+            codigo * 100000 + np.sort(rng.choice(np.arange(100, 99999), size=qtd, replace=False))
+            for codigo, qtd, _ in UFS.values()
+        ])
+        self.sh4 = np.array([f"{c:04d}" for c in np.sort(rng.choice(np.arange(101, 9706), size=QUANTIDADE_SH4, replace=False))])
+        self.pesos_sh4 = rng.permutation(_pesos_zipf(QUANTIDADE_SH4, 1.1))
+        self.paises = np.sort(rng.choice(np.arange(13, 896), size=QUANTIDADE_PAISES, replace=False))
+        self.pesos_paises = rng.permutation(_pesos_zipf(QUANTIDADE_PAISES, 1.3))
+
+
+def _gerar_bloco(rng: np.random.Generator, catalogos: _Catalogos, ano: int, mes: int, linhas: int) -> pd.DataFrame:
+    uf = rng.choice(len(catalogos.siglas), size=linhas, p=catalogos.pesos_uf)
+    municipio = catalogos.inicio_mun[uf] + (rng.random(linhas) * catalogos.qtd_mun[uf]).astype(np.int64)
+    kg_liquido = rng.lognormal(mean=7.0, sigma=2.5, size=linhas).astype(np.int64)
+    preco_por_kg = rng.lognormal(mean=1.0, sigma=1.2, size=linhas)
+    return pd.DataFrame({
+        "CO_ANO": np.full(linhas, ano, dtype=np.int32),
+        # Como nos arquivos da ComexStat, o mês tem dois dígitos ("03")
+        "CO_MES": np.full(linhas, f"{mes:02d}"),
+        "SH4": catalogos.sh4[rng.choice(QUANTIDADE_SH4, size=linhas, p=catalogos.pesos_sh4)],
+        "CO_PAIS": catalogos.paises[rng.choice(QUANTIDADE_PAISES, size=linhas, p=catalogos.pesos_paises)],
+        "SG_UF_NCM": catalogos.siglas[uf],
+        "CO_MUN": catalogos.municipios[municipio],
+        "KG_LIQUIDO": kg_liquido,
+        "VL_FOB": (kg_liquido * preco_por_kg).astype(np.int64) + 1,
+    }, columns=COLUNAS)
+
+
+def gerar_arquivo_comex(
+    destino: str,
+    linhas: int,
+    ano: int = 2024,
+    tipo_operacao: str = "EXP",
+    semente: int = 0,
+    linhas_por_bloco: int = 1_000_000,
+) -> str:
+    """
+    Gera '<destino>/<tipo_operacao>_<ano>_MUN.csv' com aproximadamente
+    'linhas' linhas, ordenadas por mês como nos arquivos oficiais.
+
+    Returns:
+        str: O caminho do arquivo gerado.
+    """
+    tipo_operacao = tipo_operacao.upper()
+    os.makedirs(destino, exist_ok=True)
+    caminho = os.path.join(destino, f"{tipo_operacao}_{ano}_MUN.csv")
+    rng = np.random.default_rng(semente)
+    catalogos = _Catalogos(rng)
+    linhas_por_mes = np.round(PESOS_MESES / PESOS_MESES.sum() * linhas).astype(np.int64)
+
+    print(f"[GERADOR] Gerando {linhas_por_mes.sum()} linhas em {caminho}...")
+    inicio = time.perf_counter()
+    cabecalho = True
+    with open(caminho, "w", encoding="iso-8859-1", newline="") as arquivo:
+        for mes, total_mes in enumerate(linhas_por_mes, start=1):
+            for deslocamento in range(0, total_mes, linhas_por_bloco):
+                bloco = _gerar_bloco(rng, catalogos, ano, mes, min(linhas_por_bloco, total_mes - deslocamento))
+                bloco.to_csv(arquivo, sep=";", index=False, header=cabecalho, quoting=csv.QUOTE_ALL, lineterminator="\n")
+                cabecalho = False
+    tamanho_mb = os.path.getsize(caminho) / 1024 ** 2
+    print(f"[GERADOR] Concluído em {time.perf_counter() - inicio:.1f}s ({tamanho_mb:.1f} MB).")
+    return caminho
+
+
+def servir_diretorio(diretorio: str, porta: int) -> None:
+    """
+    Serve os arquivos gerados por HTTP, simulando o servidor da ComexStat.
+    """
+    manipulador = functools.partial(SimpleHTTPRequestHandler, directory=diretorio)
+    servidor = ThreadingHTTPServer(("127.0.0.1", porta), manipulador)
+    print(f"[GERADOR] Servindo '{diretorio}'. Use COMEX_URL_BASE=http://127.0.0.1:{porta}")
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        servidor.server_close()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Gera arquivos sintéticos no formato da ComexStat.")
+    parser.add_argument("--linhas", type=int, default=1_000_000)
+    parser.add_argument("--ano", type=int, default=2024)
+    parser.add_argument("--tipo", default="EXP", choices=["EXP", "IMP"])
+    parser.add_argument("--semente", type=int, default=0)
+    parser.add_argument("--destino", default="dados_sinteticos")
+    parser.add_argument("--servir", type=int, metavar="PORTA", help="Serve o diretório por HTTP após gerar.")
+    args = parser.parse_args()
+
+    gerar_arquivo_comex(args.destino, args.linhas, args.ano, args.tipo, args.semente)
+    if args.servir:
+        servir_diretorio(args.destino, args.servir)
@@ -0,0 +1,229 @@
+# indice_comex.py
+# -*- coding: utf-8 -*-
+"""
+Índices secundários sobre os dados da ComexStat já carregados.
+
+Filtrar 'df_comex' por estado, produto, país ou município com uma máscara
+booleana percorre todas as linhas a cada pergunta. Aqui, na carga, cada
+coluna indexada é ordenada uma única vez: guardamos as posições das linhas
+na ordem dos valores e onde começa cada valor distinto. Uma busca por valor
+vira uma consulta a um dicionário e uma fatia dessas posições; uma faixa
+('SH4' de 1201 a 1299) são duas buscas binárias. Com mais de um critério, a
+fatia menor é conferida contra os demais apenas nas suas próprias linhas.
+
+Siglas e textos são convertidos em códigos na ordem alfabética, então faixas
+também funcionam para eles. Códigos numéricos aceitam texto ('0102' para o
+SH4 102), como aparecem nas perguntas.
+
+Sem memória para criar o índice, 'filtrar_sem_indice' aplica os mesmos
+critérios com máscaras booleanas.
+
+Uso:
+    indice = IndiceComex(df_comex)
+    sp = indice.filtrar(SG_UF_NCM="SP")
+    soja = indice.filtrar(SG_UF_NCM=["MT", "GO"], SH4=(1201, 1208))
+"""
+
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+# Colunas indexadas, quando presentes (arquivos por município têm SH4; os por NCM, CO_NCM)
+COLUNAS_INDEXADAS = ["SG_UF_NCM", "CO_PAIS", "SH4", "CO_NCM", "CO_MUN"]
+
+_VAZIO = np.empty(0, dtype=np.int64)
+
+
+class _IndiceColuna:
+    """
+    Posições das linhas ordenadas pelo valor da coluna e o intervalo
+    [limites[i], limites[i + 1]) de cada valor distinto.
+    """
+
+    def __init__(self, serie: pd.Series):
+        self.rotulos: Optional[np.ndarray] = None
+        if isinstance(serie.dtype, pd.CategoricalDtype):
+            # Categorias do Arrow não vêm em ordem: renumera em ordem alfabética
+            postos, self.rotulos = pd.factorize(serie.cat.categories.to_numpy(), sort=True)
+            codigos = serie.cat.codes.to_numpy()
+            valores = np.where(codigos >= 0, postos[codigos], -1)
+        elif not pd.api.types.is_numeric_dtype(serie.dtype):
+            valores, self.rotulos = pd.factorize(serie, sort=True)
+        else:
+            valores = serie.to_numpy()
+        self.valores = valores
+        self.numerico = self.rotulos is None and pd.api.types.is_integer_dtype(serie.dtype)
+
+        # Ordenação estável: dentro de cada valor, as linhas seguem a ordem original
+        self.ordem = np.argsort(valores, kind="stable")
+        ordenados = valores[self.ordem]
+        inicios = np.flatnonzero(ordenados[1:] != ordenados[:-1]) + 1
+        self.chaves = ordenados[np.concatenate(([0], inicios))] if len(ordenados) else ordenados
+        self.limites = np.concatenate(([0], inicios, [len(ordenados)]))
+        self._posicao = {chave: i for i, chave in enumerate(self.chaves.tolist())}
+
+    def _codigo(self, valor: Any) -> Any:
+        if self.rotulos is not None:
+            i = int(np.searchsorted(self.rotulos, valor))
+            return i if i < len(self.rotulos) and self.rotulos[i] == valor else None
+        if self.numerico and isinstance(valor, str):
+            return int(valor) if valor.strip().isdigit() else None
+        return valor
+
+    def _limite_faixa(self, valor: Any, lado: str) -> Any:
+        # Extremo de uma faixa no espaço dos códigos (o valor não precisa existir)
+        if self.rotulos is not None:
+            i = int(np.searchsorted(self.rotulos, valor, side=lado))
+            return i if lado == "left" else i - 1
+        return int(valor) if self.numerico and isinstance(valor, str) else valor
+
+    def _grupos(self, criterio) -> List[int]:
+        """Índices, em 'chaves', dos valores distintos aceitos pelo critério."""
+        if isinstance(criterio, tuple):
+            inicio, fim = criterio
+            if inicio is None:
+                # Códigos -1 (valores nulos) ficam fora de qualquer faixa
+                i = int(np.searchsorted(self.chaves, 0)) if self.rotulos is not None else 0
+            else:
+                i = int(np.searchsorted(self.chaves, self._limite_faixa(inicio, "left"), side="left"))
+            j = len(self.chaves) if fim is None else int(np.searchsorted(self.chaves, self._limite_faixa(fim, "right"), side="right"))
+            return list(range(i, j))
+        valores = criterio if isinstance(criterio, (list, set, frozenset)) else [criterio]
+        grupos = (self._posicao.get(self._codigo(v)) for v in valores)
+        return sorted(g for g in grupos if g is not None)
+
+    def posicoes(self, criterio) -> np.ndarray:
+        grupos = self._grupos(criterio)
+        if not grupos:
+            return _VAZIO
+        if grupos == list(range(grupos[0], grupos[-1] + 1)):
+            # Valores consecutivos ocupam uma única fatia
+            return self.ordem[self.limites[grupos[0]]:self.limites[grupos[-1] + 1]]
+        return np.concatenate([self.ordem[self.limites[g]:self.limites[g + 1]] for g in grupos])
+
+    def aceita(self, posicoes: np.ndarray, criterio) -> np.ndarray:
+        """Máscara das 'posicoes' cujo valor atende ao critério."""
+        grupos = self._grupos(criterio)
+        return np.isin(self.valores[posicoes], self.chaves[grupos])
+
+    def tamanho(self, criterio) -> int:
+        return int(sum(self.limites[g + 1] - self.limites[g] for g in self._grupos(criterio)))
+
+
+class IndiceComex:
+    """
+    Args:
+        df (pd.DataFrame): Dados carregados por 'obter_dados_comex'.
+        colunas (list): Colunas a indexar. Padrão: COLUNAS_INDEXADAS presentes.
+    """
+
+    def __init__(self, df: pd.DataFrame, colunas: Optional[Sequence[str]] = None):
+        self.df = df
+        colunas = [c for c in (colunas or COLUNAS_INDEXADAS) if c in df.columns]
+        self.indices: Dict[str, _IndiceColuna] = {c: _IndiceColuna(df[c]) for c in colunas}
+
+    @property
+    def colunas(self) -> List[str]:
+        return list(self.indices)
+
+    @property
+    def nbytes(self) -> int:
+        """Memória ocupada pelos índices (sem contar o DataFrame)."""
+        # Colunas numéricas usam os próprios arrays do DataFrame como 'valores'
+        return sum(
+            i.ordem.nbytes + i.limites.nbytes + i.chaves.nbytes + (i.valores.nbytes if i.rotulos is not None else 0)
+            for i in self.indices.values()
+        )
+
+    def _em_ordem(self, indice: _IndiceColuna, criterio) -> np.ndarray:
+        posicoes = indice.posicoes(criterio)
+        if len(indice._grupos(criterio)) <= 1:
+            # Um único valor: a ordenação estável já deixou as linhas em ordem
+            return posicoes
+        if len(posicoes) > len(self.df) // 16:
+            # Seleções grandes: marcar as linhas é mais barato que ordenar
+            marcadas = np.zeros(len(self.df), dtype=bool)
+            marcadas[posicoes] = True
+            return np.flatnonzero(marcadas)
+        return np.sort(posicoes)
+
+    def posicoes(self, **criterios) -> np.ndarray:
+        """
+        Posições das linhas que atendem a todos os critérios, em ordem crescente.
+
+        Cada critério é 'COLUNA=valor', 'COLUNA=[v1, v2]' (qualquer um) ou
+        'COLUNA=(inicio, fim)' (faixa inclusiva; None deixa o lado aberto).
+        Colunas sem índice são conferidas só nas linhas já selecionadas.
+        """
+        indexados = [(c, v) for c, v in criterios.items() if c in self.indices]
+        if not indexados:
+            raise ValueError(f"Informe ao menos um critério sobre as colunas indexadas: {', '.join(self.indices)}")
+        indexados.sort(key=lambda cv: self.indices[cv[0]].tamanho(cv[1]))
+
+        coluna, criterio = indexados[0]
+        posicoes = self._em_ordem(self.indices[coluna], criterio)
+        for coluna, criterio in indexados[1:]:
+            if not len(posicoes):
+                break
+            posicoes = posicoes[self.indices[coluna].aceita(posicoes, criterio)]
+        for coluna, criterio in criterios.items():
+            if coluna in self.indices or not len(posicoes):
+                continue
+            valores = self.df[coluna].to_numpy()[posicoes]
+            if isinstance(criterio, tuple):
+                inicio, fim = criterio
+                mascara = np.ones(len(posicoes), dtype=bool)
+                if inicio is not None:
+                    mascara &= valores >= inicio
+                if fim is not None:
+                    mascara &= valores <= fim
+            else:
+                mascara = np.isin(valores, list(criterio) if isinstance(criterio, (list, set, frozenset)) else [criterio])
+            posicoes = posicoes[mascara]
+        return posicoes
+
+    def filtrar(self, **criterios) -> pd.DataFrame:
+        """Linhas que atendem aos critérios (veja 'posicoes')."""
+        return self.df.take(self.posicoes(**criterios))
+
+    def contar(self, **criterios) -> int:
+        if len(criterios) == 1 and next(iter(criterios)) in self.indices:
+            coluna, criterio = next(iter(criterios.items()))
+            return self.indices[coluna].tamanho(criterio)
+        return len(self.posicoes(**criterios))
+
+
+def filtrar_sem_indice(df: pd.DataFrame, **criterios) -> pd.DataFrame:
+    """
+    Aplica os critérios de 'IndiceComex.filtrar' com uma máscara booleana,
+    percorrendo cada coluna uma vez. Não aloca nada além da máscara: serve
+    para quando a memória não comporta (re)criar o índice.
+    """
+    ausentes = [c for c in criterios if c not in df.columns]
+    if ausentes:
+        raise ValueError(f"Colunas inexistentes nos dados: {', '.join(ausentes)}")
+    mascara = np.ones(len(df), dtype=bool)
+    for coluna, criterio in criterios.items():
+        serie = df[coluna]
+        numerico = pd.api.types.is_integer_dtype(serie.dtype)
+
+        def converter(valor):
+            # Códigos numéricos aceitam texto ('0102' para o SH4 102), como no índice
+            return int(valor) if numerico and isinstance(valor, str) else valor
+
+        if isinstance(criterio, tuple):
+            inicio, fim = criterio
+            if isinstance(serie.dtype, pd.CategoricalDtype):
+                serie = serie.astype(object)
+            aceitas = serie.notna().to_numpy().copy()
+            if inicio is not None:
+                aceitas &= (serie >= converter(inicio)).to_numpy()
+            if fim is not None:
+                aceitas &= (serie <= converter(fim)).to_numpy()
+        else:
+            valores = criterio if isinstance(criterio, (list, set, frozenset)) else [criterio]
+            validos = [v for v in valores if not (numerico and isinstance(v, str) and not v.strip().isdigit())]
+            aceitas = serie.isin([converter(v) for v in validos]).to_numpy()
+        mascara &= aceitas
+    return df[mascara]
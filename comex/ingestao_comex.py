@@ -0,0 +1,108 @@
+# ingestao_comex.py
+# -*- coding: utf-8 -*-
+"""
+Leitura dos arquivos CSV da ComexStat com o leitor de CSV do Apache Arrow.
+
+O arquivo (local ou o fluxo de uma resposta HTTP) é lido em blocos por um
+leitor multithread que já converte o ISO-8859-1 para UTF-8, ignora as
+colunas não pedidas e descarta as linhas de outros meses antes de acumular o
+resultado. Assim o arquivo anual nunca fica inteiro na memória e o texto não
+é decodificado e copiado várias vezes, como acontece com 'response.text' +
+'io.StringIO' + 'pd.read_csv'. A tabela final é entregue ao pandas sem
+consolidar os blocos (colunas numéricas sem nulos não são copiadas).
+
+Uso:
+    df = ler_csv_comex("EXP_2024_MUN.csv", mes=3)
+    with cliente_http.abrir(url) as resposta:
+        df = ler_csv_comex(resposta.raw, mes=3)
+"""
+
+import io
+from typing import BinaryIO, List, Optional, Tuple, Union
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+from pyarrow import csv
+
+# Colunas usadas pelas ferramentas (arquivos por município)
+COLUNAS_COMEX = ["CO_ANO", "CO_MES", "SH4", "CO_PAIS", "SG_UF_NCM", "CO_MUN", "KG_LIQUIDO", "VL_FOB"]
+
+# Siglas e meses se repetem muito: viram categorias no pandas
+TIPOS_COLUNAS = {
+    "CO_MES": pa.int8(),
+    "SG_UF_NCM": pa.dictionary(pa.int32(), pa.string()),
+}
+
+
+def _ler_cabecalho(fonte: Union[str, BinaryIO]) -> Tuple[Union[str, BinaryIO], List[str]]:
+    """
+    Lê os nomes das colunas sem consumir o fluxo: arquivos são reabertos e
+    fluxos são envolvidos em um buffer que permite espiar a primeira linha.
+    """
+    if isinstance(fonte, str):
+        with open(fonte, "rb") as f:
+            linha = f.readline()
+    else:
+        if not hasattr(fonte, "peek"):
+            fonte = io.BufferedReader(fonte, buffer_size=1 << 16)
+        linha = fonte.peek(1 << 16).split(b"\n", 1)[0]
+    nomes = [nome.strip().strip('"') for nome in linha.decode("iso-8859-1").split(";")]
+    return fonte, nomes
+
+
+def ler_csv_comex(
+    fonte: Union[str, BinaryIO],
+    mes: Optional[int] = None,
+    colunas: Optional[List[str]] = None,
+    tamanho_bloco: int = 16 << 20,
+    ignorar_linhas_invalidas: bool = False,
+) -> Tuple[pd.DataFrame, int]:
+    """
+    Lê um CSV da ComexStat (';', ISO-8859-1) filtrando o mês durante a leitura.
+
+    Args:
+        fonte (str | file): Caminho do arquivo ou objeto binário em fluxo
+            (ex.: 'resposta.raw' de 'cliente_http.abrir').
+        mes (int): Mantém apenas as linhas com CO_MES igual a este valor.
+            Se omitido, mantém todas.
+        colunas (list): Colunas a ler. Padrão: COLUNAS_COMEX presentes no arquivo.
+        tamanho_bloco (int): Bytes por bloco do leitor.
+        ignorar_linhas_invalidas (bool): Descarta linhas com número errado
+            de campos em vez de levantar erro.
+
+    Returns:
+        tuple: (DataFrame filtrado, total de linhas lidas do arquivo).
+    """
+    if colunas is None:
+        fonte, nomes = _ler_cabecalho(fonte)
+        colunas = [c for c in COLUNAS_COMEX if c in nomes]
+    leitor = csv.open_csv(
+        fonte,
+        read_options=csv.ReadOptions(encoding="iso-8859-1", block_size=tamanho_bloco, use_threads=True),
+        parse_options=csv.ParseOptions(
+            delimiter=";",
+            invalid_row_handler=(lambda linha: "skip") if ignorar_linhas_invalidas else None,
+        ),
+        convert_options=csv.ConvertOptions(
+            include_columns=colunas,
+            include_missing_columns=False,
+            column_types={c: t for c, t in TIPOS_COLUNAS.items() if c in colunas},
+        ),
+    )
+
+    blocos = []
+    linhas_lidas = 0
+    for bloco in leitor:
+        linhas_lidas += bloco.num_rows
+        if mes is not None:
+            bloco = bloco.filter(pc.equal(bloco.column("CO_MES"), mes))
+        if bloco.num_rows:
+            blocos.append(bloco)
+
+    tabela = pa.Table.from_batches(blocos, schema=leitor.schema)
+    del blocos
+    # split_blocks evita consolidar as colunas em um bloco único (cópia) e
+    # self_destruct libera a memória do Arrow à medida que a conversão avança
+    df = tabela.to_pandas(split_blocks=True, self_destruct=True)
+    return df, linhas_lidas
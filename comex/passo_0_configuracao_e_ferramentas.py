@@ -10,9 +10,11 @@ definições de funções (ferramentas) para os outros scripts.
 # IMPORTS E CONFIGURAÇÕES
 # ===============================================================================
 import os
+import re
+import sys
+import time
 import requests
-import pandas as pd
-import gc
+from contextvars import ContextVar
 from dotenv import load_dotenv
 
 # LlamaIndex Imports
@@ -22,6 +24,19 @@ from llama_index.core.agent import ReActAgent
 from llama_index.llms.groq import Groq
 from llama_index.embeddings.nvidia import NVIDIAEmbedding
 
+# Componentes compartilhados (pacote 'comum' na raiz do repositório)
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from comum.artefatos import ArmazemArtefatos
+from comum.instrumentacao import em_thread, rastreador, span_atual
+from comum.intencoes import Intencao, PreRoteador
+from comum.memoria import GovernadorMemoria, dataframe_em_disco
+from comum.rede import cliente_http
+from comum.roteamento import MODELO_FORTE, MODELO_RAPIDO, RoteadorModelos
+from comum.sessao import SessaoPersistente
+from comum.streaming import transmitir_resposta
+from indice_comex import IndiceComex, filtrar_sem_indice
+from ingestao_comex import ler_csv_comex
+
 # ===============================================================================
 # CARREGAMENTO DE CHAVES DE API
 # ===============================================================================
@@ -35,19 +50,71 @@ if not all([groq_key, nvidia_key]):
 # ===============================================================================
 # CONFIGURAÇÃO GLOBAL DE MODELOS
 # ===============================================================================
-llm_groq = Groq(model="llama-3.1-8b-instant", api_key=groq_key)
-Settings.llm = llm_groq
+# Modelo rápido para os passos do agente e forte para síntese
+# (configuráveis pelas variáveis MODELO_RAPIDO e MODELO_FORTE)
+llm_groq = Groq(model=MODELO_RAPIDO, api_key=groq_key)
+llm_groq_forte = Groq(model=MODELO_FORTE, api_key=groq_key)
+roteador = RoteadorModelos({"rapido": llm_groq, "forte": llm_groq_forte}).instrumentar()
+Settings.llm = roteador.llm("sintese")
 Settings.embed_model = NVIDIAEmbedding(
     model="nv-embed-qa-e4", api_key=nvidia_key, truncate="END"
 )
-gc.set_threshold(700, 10, 10)
+
+# Governador de memória: acompanha o RSS e os dados carregados e, acima de
+# LIMITE_MEMORIA_MB, descarta índices e move DataFrames para o disco sozinho,
+# sem depender de uma ferramenta de limpeza chamada pelo agente
+governador = GovernadorMemoria().configurar_gc().iniciar()
+
+# Rastreamento de ferramentas e LLMs em JSONL.
+# RASTREAR_MEMORIA=1 mede o pico de memória de cada span (mais lento).
+rastreador.ativar(
+    arquivo=os.getenv("ARQUIVO_RASTREAMENTO", "rastros/rastreamento.jsonl"),
+    medir_memoria=os.getenv("RASTREAR_MEMORIA") == "1",
+)
+
+# Endereço dos arquivos anuais da ComexStat. Pode apontar para um servidor
+# local ou diretório com arquivos de mesmo nome (ex.: nos benchmarks).
+COMEX_URL_BASE = os.getenv(
+    "COMEX_URL_BASE", "https://balanca.economia.gov.br/balanca/bd/comexstat-bd/mun"
+)
 
 # Variável global para armazenar o DataFrame dos dados
 df_comex = None
 
+# Dados carregados pela pergunta atual. No lote, cada pergunta chama
+# 'novo_contexto_dados' e passa a consultar só o que ela mesma carregou, em vez
+# do último 'df_comex' global, que pode ser de outra pergunta em paralelo.
+# O valor é um dicionário mutável para que o handle gravado por uma ferramenta
+# em outra thread (asyncio.to_thread copia o contexto) seja visto pelas seguintes.
+_dados_da_consulta: ContextVar = ContextVar("dados_da_consulta", default=None)
+
+# Índices secundários (UF, país, SH4, município) de cada conjunto carregado,
+# por handle: filtros da 'resumo_dados_comex' viram fatias pré-calculadas
+indices_comex = {}
+
+UFS = {
+    "AC", "AL", "AM", "AP", "BA", "CE", "DF", "ES", "GO", "MA", "MG", "MS", "MT", "PA",
+    "PB", "PE", "PI", "PR", "RJ", "RN", "RO", "RR", "RS", "SC", "SE", "SP", "TO",
+}
+
+MESES = {
+    'janeiro': 1, 'fevereiro': 2, 'março': 3, 'abril': 4,
+    'maio': 5, 'junho': 6, 'julho': 7, 'agosto': 8,
+    'setembro': 9, 'outubro': 10, 'novembro': 11, 'dezembro': 12
+}
+
+# Armazém de artefatos: cada carga de dados recebe um handle que pode ser
+# passado às consultas, sem reenviar os dados pelo prompt
+armazem_artefatos = ArmazemArtefatos()
+
+# Sessão gravada em disco (artefatos e dados carregados), retomada pelos
+# próximos scripts. O nome pode ser trocado pela variável SESSAO.
+sessao = SessaoPersistente(os.getenv("SESSAO", "comex"))
+
 # ===============================================================================
 # DEFINIÇÕES DE FUNÇÕES (FERRAMENTAS)
 # ===============================================================================
+@rastreador.rastrear()
 def obter_dados_comex(ano: str, mes: str, tipo_operacao: str) -> str:
     """
     Baixa e carrega os dados de comércio exterior (EXP ou IMP) para um
@@ -65,12 +132,7 @@ def obter_dados_comex(ano: str, mes: str, tipo_operacao: str) -> str:
     print("\n================ INÍCIO obter_dados_comex ================")
     print(f"Parâmetros recebidos: ano={ano}, mes={mes}, tipo_operacao={tipo_operacao}")
     tipo_operacao = tipo_operacao.upper()
-    meses = {
-        'janeiro': 1, 'fevereiro': 2, 'março': 3, 'abril': 4,
-        'maio': 5, 'junho': 6, 'julho': 7, 'agosto': 8,
-        'setembro': 9, 'outubro': 10, 'novembro': 11, 'dezembro': 12
-    }
-    mes_num = meses.get(mes.lower())
+    mes_num = MESES.get(mes.lower())
 
     if not mes_num:
         print("[ERRO] Mês inválido!")
@@ -81,19 +143,40 @@ def obter_dados_comex(ano: str, mes: str, tipo_operacao: str) -> str:
         print("================ FIM obter_dados_comex ================\n")
         return "Tipo de operação inválido. Use 'EXP' ou 'IMP'."
 
-    url = f"https://balanca.economia.gov.br/balanca/bd/comexstat-bd/mun/{tipo_operacao}_{ano}_MUN.csv"
+    url = f"{COMEX_URL_BASE}/{tipo_operacao}_{ano}_MUN.csv"
     try:
         print(f"[DOWNLOAD] Baixando dados anuais de {tipo_operacao} para {ano}...")
-        df_anual = pd.read_csv(url, sep=';', encoding='iso-8859-1')
-        print(f"[OK] Dados anuais de {tipo_operacao} carregados. Total de linhas: {len(df_anual)}")
-        df_comex = df_anual[df_anual['CO_MES'] == mes_num].copy()
-        if df_comex.empty:
+        # Leitura em fluxo com o Arrow: o filtro do mês é aplicado durante a
+        # leitura, sem carregar o arquivo anual inteiro no pandas
+        with governador.fase_pesada("carga_comex"):
+            if url.startswith(("http://", "https://")):
+                # Sessão compartilhada (keep-alive, timeout e novas tentativas)
+                with cliente_http.abrir(url) as resposta:
+                    dados, linhas_lidas = ler_csv_comex(resposta.raw, mes=mes_num)
+            else:
+                dados, linhas_lidas = ler_csv_comex(url, mes=mes_num)
+        print(f"[OK] Dados anuais de {tipo_operacao} lidos. Total de linhas: {linhas_lidas}")
+        span_atual().registrar(linhas_lidas=linhas_lidas, linhas_filtradas=len(dados))
+        if dados.empty:
             print(f"[AVISO] Nenhum dado encontrado para o mês de {mes}/{ano}!")
             print("================ FIM obter_dados_comex ================\n")
             return f"Nenhum dado de {tipo_operacao} encontrado para o mês de {mes}/{ano}. Verifique se a combinação de mês e ano possui dados."
-        print(f"[OK] Dados filtrados para o mês de {mes}/{ano}. Total de linhas: {len(df_comex)}")
+        print(f"[OK] Dados filtrados para o mês de {mes}/{ano}. Total de linhas: {len(dados)}")
+        # O despejo pode trocar 'df_comex' e os índices na thread do governador
+        with governador.trava:
+            df_comex = dados
+            handle = armazem_artefatos.salvar(dados, "dados_comex", f"{tipo_operacao} {mes}/{ano}")
+            print(f"[OK] Dados registrados com o handle {handle}")
+            governador.registrar(handle, dados, despejar=lambda: mover_dados_para_disco(handle))
+            indexar_dados_comex(handle, dados)
+        contexto = _dados_da_consulta.get()
+        if contexto is not None:
+            contexto["handle"] = handle
         print("================ FIM obter_dados_comex ================\n")
-        return f"Dados de {tipo_operacao} para {mes}/{ano} carregados com sucesso. Agora você pode fazer perguntas sobre eles."
+        return (
+            f"Dados de {tipo_operacao} para {mes}/{ano} carregados com sucesso ({len(dados)} linhas, handle: {handle}). "
+            "Agora você pode fazer perguntas sobre eles, informando o handle para consultar este conjunto específico."
+        )
     except requests.exceptions.HTTPError as e:
         print(f"[ERRO HTTP] {e}")
         if e.response is not None and e.response.status_code == 404:
@@ -106,40 +189,188 @@ def obter_dados_comex(ano: str, mes: str, tipo_operacao: str) -> str:
         print("================ FIM obter_dados_comex ================\n")
         return f"Ocorreu um erro ao processar os dados: {e}"
 
-def resumo_dados_comex(consulta: str) -> str:
+def indexar_dados_comex(handle: str, dados) -> IndiceComex:
+    """
+    Cria os índices secundários de um conjunto carregado (uma ordenação por
+    coluna, feita uma única vez).
+    """
+    inicio = time.perf_counter()
+    indice = IndiceComex(dados)
+    with governador.trava:
+        indices_comex[handle] = indice
+    duracao_ms = (time.perf_counter() - inicio) * 1000
+    span_atual().registrar(indexacao_ms=round(duracao_ms, 2))
+    print(f"[OK] Índices de {', '.join(indice.colunas)} criados em {duracao_ms:.1f} ms")
+    # Os índices são os primeiros a sair sob pressão: são recriados na próxima consulta filtrada
+    governador.registrar(f"indice_{handle}", indice, despejar=lambda: indices_comex.pop(handle, None), prioridade=-1)
+    return indice
+
+
+def mover_dados_para_disco(handle: str) -> None:
+    """
+    Troca o DataFrame de um handle pela versão em disco (Arrow IPC com
+    memory-map). Chamada pelo governador de memória quando o RSS passa do
+    limite; as consultas continuam funcionando sobre a nova versão.
+    """
+    global df_comex
+    # Já seguida pelo governador durante o despejo; explícita para chamadas diretas
+    with governador.trava:
+        dados = armazem_artefatos.obter(handle)
+        if dados is None:
+            return
+        em_disco = dataframe_em_disco(dados, os.path.join(governador.diretorio, f"{handle}.arrow"))
+        armazem_artefatos.substituir(handle, em_disco)
+        if df_comex is dados:
+            df_comex = em_disco
+        # O índice guarda arrays do DataFrame antigo: sai junto e é recriado sob demanda
+        indices_comex.pop(handle, None)
+        # As colunas de texto continuam na memória: a versão em disco também
+        # pode ser despejada, depois dos conjuntos que ainda estão inteiros na memória
+        governador.registrar(handle, em_disco, despejar=lambda: descartar_dados_comex(handle), prioridade=1)
+    print(f"[MEMÓRIA] Dados do handle {handle} movidos para o disco.")
+
+
+def descartar_dados_comex(handle: str) -> None:
+    """
+    Libera um conjunto de dados que já está em disco. Chamada pelo
+    governador quando mover para o disco não bastou; consultas ao handle
+    passam a pedir que os dados sejam obtidos de novo.
+    """
+    global df_comex
+    with governador.trava:
+        dados = armazem_artefatos.obter(handle)
+        if dados is None:
+            return
+        armazem_artefatos.remover(handle)
+        if df_comex is dados:
+            df_comex = None
+        indices_comex.pop(handle, None)
+    try:
+        os.remove(os.path.join(governador.diretorio, f"{handle}.arrow"))
+    except OSError:
+        pass
+    print(f"[MEMÓRIA] Dados do handle {handle} descartados; use 'obter_dados_comex' para carregá-los de novo.")
+
+
+def novo_contexto_dados() -> None:
+    """
+    Isola os dados da pergunta atual (usada pelo executor em lote): sem
+    handle, 'resumo_dados_comex' consulta apenas o que esta pergunta carregou.
+    """
+    _dados_da_consulta.set({})
+
+
+def _ultimo_handle_comex() -> str:
+    carregados = [h for h, tipo, _ in armazem_artefatos.listar() if tipo == "dados_comex"]
+    return carregados[-1] if carregados else ""
+
+
+def _criterio(texto: str):
+    """
+    Converte o texto de um filtro em critério do índice: 'SP', 'MT,GO'
+    (qualquer um) ou '1201-1208' (faixa).
+    """
+    partes = [p.strip() for p in str(texto).split(",") if p.strip()]
+    if len(partes) > 1:
+        return partes
+    inicio, separador, fim = partes[0].partition("-")
+    if separador and inicio.strip() and fim.strip():
+        return (inicio.strip(), fim.strip())
+    return partes[0]
+
+
+@rastreador.rastrear()
+def resumo_dados_comex(
+    consulta: str, handle: str = "", uf: str = "", sh4: str = "", pais: str = "", municipio: str = ""
+) -> str:
     """
-    Executa uma consulta específica nos dados de comércio exterior carregados.
+    Executa uma consulta específica nos dados de comércio exterior carregados,
+    opcionalmente restrita a um estado, produto, país ou município.
 
     Args:
         consulta (str): Uma pergunta em linguagem natural sobre os dados.
+        handle (str): Handle retornado por 'obter_dados_comex'. Se omitido,
+            usa os últimos dados carregados (no lote, os da própria pergunta).
+        uf (str): Sigla do estado (ex.: 'SP'), ou várias separadas por vírgula.
+        sh4 (str): Código SH4 do produto (ex.: '1201') ou faixa ('1201-1208').
+        pais (str): Código do país na ComexStat (ex.: '160').
+        municipio (str): Código do município (CO_MUN).
     
     Returns:
         str: A resposta à consulta ou uma mensagem de erro.
     """
     print("\n================ INÍCIO resumo_dados_comex ================")
     global df_comex
-    if df_comex is None:
+    with governador.trava:
+        dados = df_comex
+    handle = handle.strip()
+    contexto = _dados_da_consulta.get()
+    if not handle and contexto is not None:
+        handle = contexto.get("handle", "")
+        dados = None
+    if handle:
+        dados = armazem_artefatos.obter(handle)
+        if dados is None:
+            print(f"[ERRO] Handle {handle} não encontrado!")
+            print("================ FIM resumo_dados_comex ================\n")
+            return f"Nenhum dado encontrado para o handle '{handle}'. Use o handle retornado por 'obter_dados_comex'."
+    if dados is None:
         print("[ERRO] Nenhum dado carregado!")
         print("================ FIM resumo_dados_comex ================\n")
         return "Nenhum dado de comércio exterior foi carregado. Por favor, use a ferramenta 'obter_dados_comex' primeiro."
     consulta_lower = consulta.lower()
     print(f"Consulta recebida: {consulta}")
+
+    governador.usar(handle or _ultimo_handle_comex())
+    criterios = {
+        coluna: _criterio(valor)
+        for coluna, valor in (("SG_UF_NCM", uf.upper()), ("SH4", sh4), ("CO_PAIS", pais), ("CO_MUN", municipio))
+        if str(valor).strip()
+    }
+    filtro = ""
+    if criterios:
+        chave = handle or _ultimo_handle_comex()
+        with governador.trava:
+            indice = indices_comex.get(chave)
+        if indice is not None and indice.df is not dados:
+            indice = None
+        if indice is None and not governador.sob_pressao():
+            indice = indexar_dados_comex(chave, dados)
+        filtro = ", ".join(f"{coluna}={valor}" for coluna, valor in criterios.items())
+        try:
+            if indice is not None:
+                dados = indice.filtrar(**criterios)
+            else:
+                # Acima do limite, um índice recriado seria despejado logo em seguida:
+                # filtra com uma máscara, sem alocar os arrays do índice
+                print("[MEMÓRIA] Memória acima do limite; filtrando sem o índice.")
+                dados = filtrar_sem_indice(dados, **criterios)
+        except ValueError as e:
+            print(f"[ERRO] {e}")
+            print("================ FIM resumo_dados_comex ================\n")
+            return f"Não foi possível aplicar o filtro {filtro}: {e}"
+        span_atual().registrar(filtro=filtro, linhas_filtradas=len(dados))
+        print(f"[OK] Filtro {filtro}: {len(dados)} linhas")
+        if dados.empty:
+            print("================ FIM resumo_dados_comex ================\n")
+            return f"Nenhuma operação encontrada nos dados carregados com o filtro {filtro}."
+        filtro = f" (filtro: {filtro})"
     if "média do peso líquido" in consulta_lower:
-        if 'KG_LIQUIDO' in df_comex.columns:
-            media = df_comex['KG_LIQUIDO'].mean()
+        if 'KG_LIQUIDO' in dados.columns:
+            media = dados['KG_LIQUIDO'].mean()
             print(f"[OK] Média do peso líquido: {media:.2f} kg")
             print("================ FIM resumo_dados_comex ================\n")
-            return f"A média do peso líquido dos dados carregados é de {media:.2f} kg."
+            return f"A média do peso líquido dos dados carregados{filtro} é de {media:.2f} kg."
         else:
             print("[ERRO] Coluna 'KG_LIQUIDO' não encontrada!")
             print("================ FIM resumo_dados_comex ================\n")
             return "A coluna 'KG_LIQUIDO' não foi encontrada nos dados."
     elif "principais estados" in consulta_lower:
-        if 'SG_UF_NCM' in df_comex.columns:
-            top_estados = df_comex['SG_UF_NCM'].value_counts().head(5)
+        if 'SG_UF_NCM' in dados.columns:
+            top_estados = dados['SG_UF_NCM'].value_counts().head(5)
             print(f"[OK] Top 5 estados:\n{top_estados}")
             print("================ FIM resumo_dados_comex ================\n")
-            return f"Os 5 principais estados por número de operações são:\n{top_estados.to_string()}"
+            return f"Os 5 principais estados por número de operações{filtro} são:\n{top_estados.to_string()}"
         else:
             print("[ERRO] Coluna 'SG_UF_NCM' não encontrada!")
             print("================ FIM resumo_dados_comex ================\n")
@@ -149,9 +380,12 @@ def resumo_dados_comex(consulta: str) -> str:
         print("================ FIM resumo_dados_comex ================\n")
         return "Não foi possível processar a sua consulta. Tente perguntas sobre 'média do peso líquido' ou 'principais estados'."
 
+@rastreador.rastrear()
 def limpar_dados_comex() -> str:
     """
-    Libera os dados de comércio exterior da memória para economizar recursos computacionais.
+    Libera os dados de comércio exterior da memória. Não é mais uma
+    ferramenta do agente: o governador de memória move os dados para o disco
+    quando necessário; esta função fica para uso direto (ex.: benchmarks).
     """
     print("\n================ INÍCIO limpar_dados_comex ================")
     global df_comex
@@ -159,10 +393,124 @@ def limpar_dados_comex() -> str:
         print("[AVISO] Não há dados para limpar!")
         print("================ FIM limpar_dados_comex ================\n")
         return "Não há dados para limpar na memória."
-    df_comex = None
-    gc.collect()
+    with governador.trava:
+        df_comex = None
+        indices_comex.clear()
+        armazem_artefatos.limpar("dados_comex")
     print("[OK] Dados de comércio exterior foram limpos da memória.")
     print("================ FIM limpar_dados_comex ================\n")
     return "Os dados foram removidos da memória com sucesso."
 
+def restaurar_sessao() -> bool:
+    """
+    Restaura os artefatos da sessão gravada e volta a apontar 'df_comex'
+    para o último conjunto de dados carregado.
+    """
+    global df_comex
+    if not sessao.restaurar(armazem_artefatos):
+        return False
+    with governador.trava:
+        # Como em 'obter_dados_comex': o governador pode mover cada conjunto para o disco
+        for handle, tipo, _ in armazem_artefatos.listar():
+            if tipo == "dados_comex":
+                governador.registrar(
+                    handle, armazem_artefatos.obter(handle), despejar=lambda h=handle: mover_dados_para_disco(h)
+                )
+        handle = _ultimo_handle_comex()
+        if handle:
+            df_comex = armazem_artefatos.obter(handle)
+            print(f"[SESSÃO] Dados do handle {handle} disponíveis ({len(df_comex)} linhas).")
+            indexar_dados_comex(handle, df_comex)
+    return True
+
+# ===============================================================================
+# INTENÇÕES DA ROTA RÁPIDA (SEM LLM)
+# ===============================================================================
+_MESES_NO_TEXTO = r"\b(?:" + "|".join(MESES) + r")\b"
+_ANOS_NO_TEXTO = r"\b(?:19|20)\d{2}\b"
+_SH4_NO_TEXTO = r"\bsh4\s*(\d{2,4}(?:\s*-\s*\d{2,4})?)"
+_PAIS_NO_TEXTO = r"\bpa[íi]s\s*(\d{1,3})\b"
+_CONSULTAS_COMEX = ("média do peso líquido", "principais estados")
+
+
+def extrair_pedido_comex(texto: str):
+    """
+    Extrai ano, mês e tipo de operação de pedidos como
+    "importação de maio de 2024". Retorna None se faltar algum argumento ou
+    se o pedido citar mais de um mês ou ano ("compare com 2023").
+    """
+    texto_lower = texto.lower()
+    meses = set(re.findall(_MESES_NO_TEXTO, texto_lower))
+    anos = set(re.findall(_ANOS_NO_TEXTO, texto_lower))
+    importacao = re.search(r"\bimporta", texto_lower)
+    exportacao = re.search(r"\bexporta", texto_lower)
+    if len(meses) != 1 or len(anos) != 1 or bool(importacao) == bool(exportacao):
+        return None
+    tipo_operacao = "IMP" if importacao else "EXP"
+    return {"ano": anos.pop(), "mes": meses.pop(), "tipo_operacao": tipo_operacao}, 1.0
+
+
+# Siglas só contam depois de uma preposição ou de "estado"/"UF" ("em SP",
+# "de MT e GO", "no estado do PR", "UF MT,GO"): siglas soltas como "OK" ou "PA"
+# (de "pagamento antecipado") não viram filtro
+_UFS_NO_TEXTO = re.compile(
+    r"(?i:\b(?:em|de|do|da|no|na|para|pelo|pela|estados?|ufs?)\s+(?:(?:de|do|da)\s+)?)"
+    r"([A-Z]{2}(?:\s*(?:,|(?i:e|ou))\s*[A-Z]{2})*)\b"
+)
+
+
+def _ufs_citadas(texto: str):
+    ufs = []
+    for grupo in _UFS_NO_TEXTO.findall(texto):
+        ufs.extend(uf for uf in re.split(r"\s*(?:,|\be\b|\bou\b)\s*", grupo, flags=re.IGNORECASE) if uf in UFS)
+    return list(dict.fromkeys(ufs))
+
+
+def extrair_consulta_comex(texto: str):
+    """
+    Reconhece as consultas suportadas por 'resumo_dados_comex' e os filtros
+    de estado ('em SP'), produto ('SH4 1201') e país ('país 160'). Retorna
+    None se o pedido citar mais de uma consulta, produto ou país, pois a
+    rota rápida faz uma só chamada.
+    """
+    texto_lower = texto.lower()
+    consultas = [c for c in _CONSULTAS_COMEX if c in texto_lower]
+    sh4 = re.findall(_SH4_NO_TEXTO, texto_lower)
+    pais = re.findall(_PAIS_NO_TEXTO, texto_lower)
+    if len(consultas) != 1 or len(sh4) > 1 or len(pais) > 1:
+        return None
+    argumentos = {"consulta": consultas[0]}
+    ufs = _ufs_citadas(texto)
+    if ufs:
+        argumentos["uf"] = ",".join(ufs)
+    if sh4:
+        argumentos["sh4"] = sh4[0].replace(" ", "")
+    if pais:
+        argumentos["pais"] = pais[0]
+    return argumentos, 1.0
+
+
+pre_roteador = PreRoteador([
+    Intencao(
+        nome="obter_dados_comex",
+        extrair=extrair_pedido_comex,
+        executar=obter_dados_comex,
+        gatilhos=[r"\bbaix\w*", r"\bcarreg\w*", _ANOS_NO_TEXTO],
+        termos=[
+            _MESES_NO_TEXTO, r"\b(?:importa|exporta)\w*", r"\bdados\b", r"\bano\b", r"\bm[êe]s\b",
+            r"\bnecess[áa]rios?\b",
+        ],
+    ),
+    Intencao(
+        nome="resumo_dados_comex",
+        extrair=extrair_consulta_comex,
+        executar=resumo_dados_comex,
+        gatilhos=[r"m[ée]dia do peso l[íi]quido", r"principais estados"],
+        termos=[
+            _UFS_NO_TEXTO, _SH4_NO_TEXTO, _PAIS_NO_TEXTO, r"\b(?:importa|exporta)\w*", r"\bdados\b",
+            r"\bcargas?\b", r"\bopera[çc](?:ão|ões)\b", r"\b(?:5|cinco)\b",
+        ],
+    ),
+])
+
 print("Módulo de configuração de Comércio Exterior carregado.")
@@ -2,14 +2,15 @@
 import asyncio
 import passo_0_configuracao_e_ferramentas as config
 
-async def main():
-    print("\n" + "=" * 50)
-    print("PASSO 1: AGENTE DE ANÁLISE DE COMÉRCIO EXTERIOR")
-    print("=" * 50 + "\n")
-
-    # Criando ferramentas a partir das funções importadas
+def criar_agente(verbose: bool = True):
+    """
+    Cria o agente de comércio exterior (também usado por 'executar_lote.py').
+    """
+    # Criando ferramentas a partir das funções importadas. 'em_thread' mantém
+    # o contexto da pergunta (handle dos dados e span ativo) dentro da ferramenta
     ferramenta_obter_dados = config.FunctionTool.from_defaults(
         fn=config.obter_dados_comex,
+        async_fn=config.em_thread(config.obter_dados_comex),
         name="obter_dados_comex",
         description="""
         Esta ferramenta baixa os dados anuais brutos de exportação ou importação
@@ -20,47 +21,70 @@ async def main():
     
     ferramenta_resumo_dados = config.FunctionTool.from_defaults(
         fn=config.resumo_dados_comex,
+        async_fn=config.em_thread(config.resumo_dados_comex),
         name="resumo_dados_comex",
         description="""
         Esta ferramenta executa consultas específicas sobre os dados de comércio exterior
         já carregados na memória, como 'média do peso líquido' ou 'principais estados'.
-        Usa o parâmetro 'consulta'.
+        Usa o parâmetro 'consulta' e, opcionalmente, o 'handle' retornado por
+        'obter_dados_comex' para consultar um conjunto de dados específico.
+        Para restringir a consulta, use 'uf' (ex.: 'SP' ou 'MT,GO'), 'sh4'
+        (ex.: '1201' ou a faixa '1201-1208'), 'pais' e 'municipio' (códigos).
         """,
     )
 
-    ferramenta_limpar_dados = config.FunctionTool.from_defaults(
-        fn=config.limpar_dados_comex,
-        name="limpar_dados_comex",
-        description="""
-        Esta ferramenta remove os dados carregados da memória para liberar recursos.
-        Use-a quando a análise estiver completa.
-        """,
-    )
-
-    agent = config.ReActAgent(
-        tools=[ferramenta_obter_dados, ferramenta_resumo_dados, ferramenta_limpar_dados],
-        llm=config.llm_groq,
-        verbose=True,
+    # O laço ReAct roda no modelo rápido; a resposta final é reescrita pela
+    # rota 'sintese' (o 'sintese=' de transmitir_resposta e o 'llm_sintese' do ExecutorLote)
+    return config.ReActAgent(
+        tools=[ferramenta_obter_dados, ferramenta_resumo_dados],
+        llm=config.roteador.llm("selecao_ferramenta"),
+        verbose=verbose,
         max_steps=5  # Adiciona um limite de passos para evitar loops infinitos
     )
 
+
+async def main():
+    print("\n" + "=" * 50)
+    print("PASSO 1: AGENTE DE ANÁLISE DE COMÉRCIO EXTERIOR")
+    print("=" * 50 + "\n")
+
+    agent = criar_agente()
+
+    # Retoma os dados carregados por execuções anteriores, sem baixá-los de novo
+    config.restaurar_sessao()
+
+    # Pedidos reconhecidos pela rota rápida chamam as ferramentas diretamente;
+    # os demais seguem para o agente
+    async def perguntar(mensagem: str):
+        return await config.pre_roteador.responder(
+            mensagem, lambda m: config.transmitir_resposta(agent, m, sintese=config.roteador.llm("sintese"))
+        )
+
     print("\n--- Teste 1.1: Cenário para Agente de Cargas ---")
-    response1 = await agent.run(
-        "Baixe os dados de importação de maio de 2024. Depois, me diga qual a média do peso líquido das cargas. Por fim, limpe os dados da memória."
+    await perguntar(
+        "Baixe os dados de importação de maio de 2024. Depois, me diga qual a média do peso líquido das cargas."
     )
-    print("Resposta do Agente:", response1)
     
     print("\n--- Teste 1.2: Cenário para Exportadores ---")
-    response2 = await agent.run(
-        "Para o ano de 2024, no mês de abril, quais foram os 5 principais estados exportadores? Baixe os dados necessários e me dê essa informação. Depois, limpe a memória."
+    await perguntar(
+        "Para o ano de 2024, no mês de abril, quais foram os 5 principais estados exportadores? Baixe os dados necessários e me dê essa informação."
     )
-    print("Resposta do Agente:", response2)
 
     print("\n--- Teste 1.3: Tentativa de análise sem baixar os dados ---")
-    response3 = await agent.run(
+    await perguntar(
         "Qual a média do peso líquido das exportações? Não sei o mês ou ano, e não baixei os dados."
     )
-    print("Resposta do Agente:", response3)
+
+    config.sessao.salvar(config.armazem_artefatos)
+
+    print("\n--- Estatísticas por rota de modelo ---")
+    print(config.roteador.relatorio())
+
+    print("\n--- Memória ---")
+    print(config.governador.relatorio())
+
+    print("\n--- Resumo do rastreamento ---")
+    print(config.rastreador.resumo_chamas())
 
     print("\n" + "=" * 50)
     print("PASSO 1 CONCLUÍDO")
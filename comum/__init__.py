@@ -0,0 +1,10 @@
+# -*- coding: utf-8 -*-
+"""
+Componentes compartilhados entre os projetos 'exemplo' e 'comex'.
+Os scripts de passo a passo acessam este pacote através dos seus
+respectivos arquivos 'passo_0_configuracao_e_ferramentas.py'.
+
+Os módulos são importados individualmente (ex.: 'from comum.artefatos
+import ArmazemArtefatos') para que cada script carregue apenas as
+dependências que realmente usa.
+"""
@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+"""
+Converte os eventos de instrumentação do LlamaIndex (LLM, embedding e
+recuperação) em spans do rastreador de 'comum.instrumentacao'.
+"""
+
+from typing import Any, Dict
+
+from llama_index.core.instrumentation import get_dispatcher
+from llama_index.core.instrumentation.event_handlers import BaseEventHandler
+from llama_index.core.instrumentation.events.embedding import EmbeddingEndEvent, EmbeddingStartEvent
+from llama_index.core.instrumentation.events.llm import (
+    LLMChatEndEvent,
+    LLMChatStartEvent,
+    LLMCompletionEndEvent,
+    LLMCompletionStartEvent,
+)
+from llama_index.core.instrumentation.events.retrieval import RetrievalEndEvent, RetrievalStartEvent
+from pydantic import PrivateAttr
+
+from comum.instrumentacao import _span_atual
+from comum.roteamento import _uso_de_tokens
+
+_NOMES_INICIO = {
+    LLMChatStartEvent: "llm.chat",
+    LLMCompletionStartEvent: "llm.completion",
+    EmbeddingStartEvent: "embedding",
+    RetrievalStartEvent: "retrieval",
+}
+_EVENTOS_FIM = (LLMChatEndEvent, LLMCompletionEndEvent, EmbeddingEndEvent, RetrievalEndEvent)
+
+
+class _ColetorSpans(BaseEventHandler):
+    rastreador: Any = None
+    _abertos: Dict[str, Any] = PrivateAttr(default_factory=dict)
+
+    @classmethod
+    def class_name(cls) -> str:
+        return "ColetorSpans"
+
+    def handle(self, event, **kwargs) -> None:
+        nome = _NOMES_INICIO.get(type(event))
+        if nome is not None:
+            model_dict = getattr(event, "model_dict", None) or {}
+            modelo = model_dict.get("model") or model_dict.get("model_name")
+            atributos = {"modelo": modelo} if modelo else {}
+            self._abertos[event.span_id] = self.rastreador.iniciar(nome, _span_atual.get(), **atributos)
+            return
+        if not isinstance(event, _EVENTOS_FIM):
+            return
+        span = self._abertos.pop(event.span_id, None)
+        if span is None:
+            return
+        if isinstance(event, (LLMChatEndEvent, LLMCompletionEndEvent)):
+            tokens_entrada, tokens_saida = _uso_de_tokens(event.response)
+            span.registrar(tokens_entrada=tokens_entrada, tokens_saida=tokens_saida)
+            # Os spans ancestrais (agente, consulta do lote...) acumulam o total
+            ancestral = span._pai
+            while ancestral is not None:
+                ancestral.incrementar("tokens_entrada_total", tokens_entrada)
+                ancestral.incrementar("tokens_saida_total", tokens_saida)
+                ancestral = ancestral._pai
+        elif isinstance(event, EmbeddingEndEvent):
+            span.registrar(textos=len(event.chunks))
+        elif isinstance(event, RetrievalEndEvent):
+            span.registrar(nos=len(event.nodes))
+        self.rastreador.finalizar(span)
+
+
+def registrar_coletor(rastreador) -> None:
+    get_dispatcher().add_event_handler(_ColetorSpans(rastreador=rastreador))
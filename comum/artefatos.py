@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+"""
+Armazém de artefatos em memória do processo.
+
+As ferramentas guardam aqui seus resultados grandes (listas de artigos,
+DataFrames, textos longos) e devolvem ao LLM apenas um handle curto com uma
+prévia. Ferramentas seguintes recebem o handle e leem o valor diretamente,
+sem que o conteúdo passe novamente pelo prompt nem por arquivos em disco.
+"""
+
+import uuid
+from typing import Any, Dict, List, Optional, Tuple
+
+PREFIXO_HANDLE = "art_"
+
+
+class ArmazemArtefatos:
+    """
+    Dicionário de artefatos indexado por handles no formato 'art_xxxxxxxx'.
+    Um handle pode ser seguido de '#n' para referenciar o n-ésimo item
+    (começando em 1) de um artefato do tipo lista.
+    """
+
+    def __init__(self):
+        self._artefatos: Dict[str, Tuple[str, Any, str]] = {}
+
+    @staticmethod
+    def eh_handle(referencia: str) -> bool:
+        return isinstance(referencia, str) and referencia.strip().startswith(PREFIXO_HANDLE)
+
+    def salvar(self, valor: Any, tipo: str, descricao: str = "") -> str:
+        """
+        Guarda um valor e retorna o handle gerado para ele.
+        """
+        handle = f"{PREFIXO_HANDLE}{uuid.uuid4().hex[:8]}"
+        self._artefatos[handle] = (tipo, valor, descricao)
+        return handle
+
+    def obter(self, referencia: str, padrao: Any = None) -> Any:
+        """
+        Retorna o valor de um handle ('art_xxxxxxxx') ou de um item de lista
+        ('art_xxxxxxxx#n', com n a partir de 1). Retorna 'padrao' se a
+        referência não existir ou se n estiver fora da lista ('#0' e índices
+        negativos não contam a partir do fim).
+        """
+        handle, _, indice = referencia.strip().partition("#")
+        if handle not in self._artefatos:
+            return padrao
+        valor = self._artefatos[handle][1]
+        if not indice:
+            return valor
+        try:
+            posicao = int(indice)
+            if posicao < 1:
+                return padrao
+            return valor[posicao - 1]
+        except (ValueError, IndexError, TypeError, KeyError):
+            return padrao
+
+    def tipo(self, referencia: str) -> Optional[str]:
+        handle = referencia.strip().partition("#")[0]
+        item = self._artefatos.get(handle)
+        return item[0] if item else None
+
+    def substituir(self, handle: str, valor: Any) -> bool:
+        """
+        Troca o valor de um handle existente, mantendo tipo e descrição
+        (ex.: pela versão em disco de um DataFrame).
+        """
+        if handle not in self._artefatos:
+            return False
+        tipo, _, descricao = self._artefatos[handle]
+        self._artefatos[handle] = (tipo, valor, descricao)
+        return True
+
+    def remover(self, handle: str) -> bool:
+        return self._artefatos.pop(handle, None) is not None
+
+    def limpar(self, tipo: Optional[str] = None) -> int:
+        """
+        Remove todos os artefatos (ou apenas os de um tipo) e retorna quantos
+        foram removidos.
+        """
+        handles = [h for h, (t, _, _) in self._artefatos.items() if tipo is None or t == tipo]
+        for handle in handles:
+            del self._artefatos[handle]
+        return len(handles)
+
+    def registrar(self, handle: str, valor: Any, tipo: str, descricao: str = "") -> None:
+        """
+        Guarda um valor sob um handle já existente (ex.: ao restaurar uma sessão).
+        """
+        self._artefatos[handle] = (tipo, valor, descricao)
+
+    def itens(self) -> List[Tuple[str, str, Any, str]]:
+        """
+        Lista os artefatos com seus valores, na forma (handle, tipo, valor, descrição).
+        """
+        return [(h, t, v, d) for h, (t, v, d) in self._artefatos.items()]
+
+    def listar(self) -> List[Tuple[str, str, str]]:
+        """
+        Lista os artefatos guardados na forma (handle, tipo, descrição).
+        """
+        return [(h, t, d) for h, (t, _, d) in self._artefatos.items()]
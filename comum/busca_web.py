@@ -0,0 +1,285 @@
+# -*- coding: utf-8 -*-
+"""
+Pesquisa web (Tavily) com cache, compartilhada pelos agentes dos crews.
+
+Pesquisador e verificador costumam repetir a mesma busca com pequenas
+variações ("IA privacidade redes sociais" / "privacidade em redes sociais e
+IA"), e o crew hierárquico refaz as tarefas do sequencial. Aqui cada consulta
+é normalizada (minúsculas, sem acentos, sem palavras vazias, termos
+ordenados) e consultas iguais ou quase iguais (Jaccard dos termos acima de
+'similaridade_minima') reaproveitam o resultado guardado.
+
+O conteúdo de cada página vem junto no resultado da busca e fica em um mapa
+URL -> conteúdo, então verificar os links encontrados não gera novas
+chamadas. As URLs que ainda não estão no mapa são extraídas todas em uma
+única chamada ao Tavily Extract. Tudo expira após 'ttl' segundos e é gravado
+em 'cache_web/tavily.json', valendo também para as próximas execuções.
+
+Uso:
+    busca_web = BuscaWebCache(TavilyToolSpec(api_key=tavily_key))
+    ferramentas = busca_web.ferramentas()   # pesquisar_web e verificar_links
+"""
+
+import json
+import os
+import re
+import threading
+import time
+import unicodedata
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional, Tuple
+
+from llama_index.core.tools import FunctionTool
+
+from comum.instrumentacao import rastreador, span_atual
+
+DIR_CACHE_WEB = "cache_web"
+TTL_BUSCA_WEB = float(os.getenv("TTL_BUSCA_WEB", 24 * 3600))
+
+PALAVRAS_VAZIAS = {
+    # português
+    "a", "as", "o", "os", "um", "uma", "de", "da", "das", "do", "dos", "e", "em", "na", "nas",
+    "no", "nos", "para", "por", "com", "sobre", "que", "se", "ao", "aos", "pela", "pelo",
+    # inglês
+    "the", "an", "of", "and", "in", "on", "for", "to", "with", "about", "by",
+}
+
+
+def normalizar_consulta(consulta: str) -> Tuple[str, frozenset]:
+    """
+    Retorna a chave exata da consulta (termos ordenados) e o conjunto de
+    termos usado na comparação aproximada.
+    """
+    texto = unicodedata.normalize("NFKD", consulta.lower())
+    texto = "".join(c for c in texto if not unicodedata.combining(c))
+    termos = frozenset(t for t in re.findall(r"\w+", texto) if t not in PALAVRAS_VAZIAS)
+    return " ".join(sorted(termos)), termos
+
+
+def _jaccard(a: frozenset, b: frozenset) -> float:
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+class BuscaWebCache:
+    """
+    Args:
+        tool_spec (TavilyToolSpec): Cliente Tavily do LlamaIndex.
+        ttl (float): Validade, em segundos, de buscas e páginas guardadas.
+        similaridade_minima (float): Jaccard mínimo entre os termos para
+            duas consultas serem tratadas como a mesma.
+        arquivo (str): Onde o cache é gravado. None mantém só em memória.
+        max_caracteres (int): Tamanho do trecho de cada página devolvido
+            aos agentes.
+    """
+
+    def __init__(
+        self,
+        tool_spec,
+        ttl: float = TTL_BUSCA_WEB,
+        similaridade_minima: float = 0.8,
+        arquivo: Optional[str] = os.path.join(DIR_CACHE_WEB, "tavily.json"),
+        max_caracteres: int = 600,
+    ):
+        self.tool_spec = tool_spec
+        self.ttl = ttl
+        self.similaridade_minima = similaridade_minima
+        self.arquivo = arquivo
+        self.max_caracteres = max_caracteres
+        self._consultas: Dict[str, Dict[str, Any]] = {}
+        self._paginas: Dict[str, Dict[str, Any]] = {}
+        self._trava = threading.Lock()
+        # Uma gravação do arquivo por vez
+        self._trava_gravacao = threading.Lock()
+        # Trava e número de chamadas de cada consulta/lote em andamento: chamadas
+        # simultâneas iguais esperam a primeira; a entrada sai quando a última termina
+        self._em_andamento: Dict[str, List[Any]] = {}
+        self.estatisticas = {"buscas": 0, "acertos_exatos": 0, "acertos_similares": 0, "extracoes": 0, "paginas_do_cache": 0}
+        self._carregar()
+
+    # --------------------------------------------------------------------------
+    # Persistência
+    # --------------------------------------------------------------------------
+    def _valido(self, item: Dict[str, Any]) -> bool:
+        return time.time() - item["criado"] < self.ttl
+
+    def _carregar(self) -> None:
+        if not self.arquivo or not os.path.exists(self.arquivo):
+            return
+        try:
+            with open(self.arquivo, encoding="utf-8") as f:
+                dados = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"[BUSCA WEB] Cache ilegível ({e}); começando vazio.")
+            return
+        self._consultas = {k: v for k, v in dados.get("consultas", {}).items() if self._valido(v)}
+        self._paginas = {k: v for k, v in dados.get("paginas", {}).items() if self._valido(v)}
+
+    def _gravar(self) -> None:
+        if not self.arquivo:
+            return
+        os.makedirs(os.path.dirname(self.arquivo) or ".", exist_ok=True)
+        with self._trava_gravacao:
+            with self._trava:
+                dados = {"consultas": dict(self._consultas), "paginas": dict(self._paginas)}
+            # Nome temporário próprio do processo: outro script pode gravar o mesmo cache
+            temporario = f"{self.arquivo}.{os.getpid()}.tmp"
+            with open(temporario, "w", encoding="utf-8") as f:
+                json.dump(dados, f, ensure_ascii=False)
+            os.replace(temporario, self.arquivo)
+
+    @contextmanager
+    def _exclusivo(self, chave: str):
+        """Executa o bloco com exclusividade sobre a chave (consulta ou lote de URLs)."""
+        with self._trava:
+            entrada = self._em_andamento.setdefault(chave, [threading.Lock(), 0])
+            entrada[1] += 1
+        try:
+            with entrada[0]:
+                yield
+        finally:
+            with self._trava:
+                entrada[1] -= 1
+                if entrada[1] == 0:
+                    del self._em_andamento[chave]
+
+    # --------------------------------------------------------------------------
+    # Consultas
+    # --------------------------------------------------------------------------
+    def _procurar(self, chave: str, termos: frozenset, max_results: int) -> Tuple[Optional[Dict[str, Any]], str]:
+        with self._trava:
+            item = self._consultas.get(chave)
+            if item and self._valido(item) and item["max_results"] >= max_results:
+                return item, "exato"
+            melhor, maior = None, self.similaridade_minima
+            for item in self._consultas.values():
+                if item["max_results"] < max_results or not self._valido(item):
+                    continue
+                similaridade = _jaccard(termos, frozenset(item["termos"]))
+                if similaridade >= maior:
+                    melhor, maior = item, similaridade
+            return melhor, ("similar" if melhor else "")
+
+    def _formatar(self, urls: List[str]) -> str:
+        linhas = []
+        for i, url in enumerate(urls, start=1):
+            pagina = self._paginas.get(url)
+            trecho = pagina["conteudo"][: self.max_caracteres].strip() if pagina else ""
+            linhas.append(f"{i}. {url}\n   {trecho}")
+        return "\n".join(linhas) if linhas else "Nenhum resultado encontrado."
+
+    def pesquisar(self, consulta: str, max_results: int = 6) -> str:
+        """
+        Pesquisa na web e retorna os links encontrados, cada um com um trecho
+        do conteúdo da página.
+
+        Args:
+            consulta (str): O que pesquisar.
+            max_results (int): Quantidade máxima de resultados.
+        """
+        chave, termos = normalizar_consulta(consulta)
+        with rastreador.span("busca_web.pesquisar", consulta=consulta) as span:
+            with self._exclusivo(f"consulta:{chave}"):
+                item, tipo = self._procurar(chave, termos, max_results)
+                if item is None:
+                    documentos = self.tool_spec.search(consulta, max_results=max_results)
+                    agora = time.time()
+                    urls = []
+                    with self._trava:
+                        for doc in documentos:
+                            url = doc.metadata.get("url")
+                            if not url:
+                                continue
+                            urls.append(url)
+                            # Conteúdo já extraído (Tavily Extract) é mais completo que o da busca
+                            if url not in self._paginas or self._paginas[url]["origem"] != "extract":
+                                self._paginas[url] = {"conteudo": doc.text, "origem": "search", "criado": agora}
+                        item = {"consulta": consulta, "termos": sorted(termos), "max_results": max_results, "urls": urls, "criado": agora}
+                        self._consultas[chave] = item
+                        self.estatisticas["buscas"] += 1
+                    span_atual().incrementar("buscas_web")
+                    self._gravar()
+                else:
+                    with self._trava:
+                        self.estatisticas["acertos_exatos" if tipo == "exato" else "acertos_similares"] += 1
+                    print(f"[BUSCA WEB] '{consulta}' atendida pelo cache ({tipo}: '{item['consulta']}').")
+            span.registrar(cache=tipo or "falha", resultados=len(item["urls"][:max_results]))
+            return self._formatar(item["urls"][:max_results])
+
+    def verificar_urls(self, urls: List[str]) -> str:
+        """
+        Retorna o conteúdo de cada link para verificação. Links já vistos em
+        buscas anteriores vêm do cache; os demais são extraídos de uma vez.
+
+        Args:
+            urls (list): Lista de links a verificar.
+        """
+        urls = list(dict.fromkeys(u.strip() for u in urls if u and u.strip()))
+        with rastreador.span("busca_web.verificar", urls=len(urls)) as span:
+            with self._trava:
+                faltando = [u for u in urls if u not in self._paginas or not self._valido(self._paginas[u])]
+                self.estatisticas["paginas_do_cache"] += len(urls) - len(faltando)
+            if faltando:
+                with self._exclusivo("extracao:" + "|".join(sorted(faltando))):
+                    # Outra chamada pode ter extraído as mesmas páginas enquanto esperávamos
+                    with self._trava:
+                        faltando = [u for u in faltando if u not in self._paginas or not self._valido(self._paginas[u])]
+                    if faltando:
+                        if hasattr(self.tool_spec, "extract"):
+                            documentos = self.tool_spec.extract(faltando)
+                        else:
+                            # Versões antigas do TavilyToolSpec só têm 'search'
+                            documentos = [d for u in faltando for d in self.tool_spec.search(u, max_results=1)]
+                        agora = time.time()
+                        with self._trava:
+                            for doc in documentos:
+                                url = doc.metadata.get("url")
+                                if url:
+                                    self._paginas[url] = {"conteudo": doc.text, "origem": "extract", "criado": agora}
+                            self.estatisticas["extracoes"] += 1
+                        span_atual().incrementar("extracoes_web")
+                        self._gravar()
+            span.registrar(do_cache=len(urls) - len(faltando), extraidas=len(faltando))
+
+            linhas = []
+            for url in urls:
+                pagina = self._paginas.get(url)
+                if pagina and pagina["conteudo"].strip():
+                    linhas.append(f"{url}\n   {pagina['conteudo'][: self.max_caracteres].strip()}")
+                else:
+                    linhas.append(f"{url}\n   [INACESSÍVEL] Não foi possível obter o conteúdo.")
+            return "\n".join(linhas) if linhas else "Nenhum link informado."
+
+    # --------------------------------------------------------------------------
+    # Ferramentas e relatório
+    # --------------------------------------------------------------------------
+    def ferramentas(self) -> List[FunctionTool]:
+        """
+        Ferramentas LlamaIndex (convertíveis para o CrewAI com
+        'LlamaIndexTool.from_tool').
+        """
+        return [
+            FunctionTool.from_defaults(
+                fn=self.pesquisar,
+                name="pesquisar_web",
+                description="Pesquisa na web e retorna links com um trecho do conteúdo de cada página.",
+            ),
+            FunctionTool.from_defaults(
+                fn=self.verificar_urls,
+                name="verificar_links",
+                description=(
+                    "Recebe uma lista com TODOS os links a verificar e retorna o conteúdo de cada um. "
+                    "Chame uma única vez com a lista completa."
+                ),
+            ),
+        ]
+
+    def relatorio(self) -> str:
+        with self._trava:
+            e = dict(self.estatisticas)
+        return (
+            f"{e['buscas']} busca(s) no Tavily, {e['acertos_exatos']} repetida(s) e "
+            f"{e['acertos_similares']} semelhante(s) atendidas pelo cache; "
+            f"{e['extracoes']} extração(ões) em lote, {e['paginas_do_cache']} página(s) verificadas pelo cache"
+        )
@@ -0,0 +1,194 @@
+# -*- coding: utf-8 -*-
+"""
+Gerenciamento do orçamento de tokens das conversas dos agentes.
+
+Resultados grandes de ferramentas (ex.: os cinco resumos completos de
+'consulta_artigos') são limitados a um tamanho máximo e o conteúdo integral
+fica guardado sob um identificador que o agente pode consultar depois com a
+ferramenta 'recuperar_resultado'. Entre um turno e outro, as saídas antigas
+de ferramentas no histórico são reduzidas a uma prévia, mantendo o tamanho
+do prompt limitado em sessões longas.
+"""
+
+import functools
+from typing import Callable, List, Optional, Tuple
+
+from llama_index.core.llms import ChatMessage, MessageRole
+from llama_index.core.memory import ChatMemoryBuffer
+from llama_index.core.utils import get_tokenizer
+
+from comum.artefatos import ArmazemArtefatos
+
+MARCADOR_TRUNCADO = "[... resultado truncado"
+
+
+def contar_tokens(texto: str) -> int:
+    """
+    Conta os tokens de um texto usando o tokenizador global do LlamaIndex.
+    """
+    if not texto:
+        return 0
+    return len(get_tokenizer()(texto))
+
+
+def _cortar_em_tokens(texto: str, max_tokens: int) -> str:
+    """
+    Corta o texto para aproximadamente 'max_tokens' tokens, usando a
+    proporção média de caracteres por token do próprio texto.
+    """
+    total = contar_tokens(texto)
+    if total <= max_tokens:
+        return texto
+    caracteres = int(len(texto) * max_tokens / total)
+    return texto[:caracteres]
+
+
+class GerenciadorContexto:
+    """
+    Controla o tamanho do contexto enviado ao LLM a cada turno.
+
+    Args:
+        limite_resultado (int): Máximo de tokens de um resultado de ferramenta
+            inserido diretamente no prompt.
+        limite_historico (int): Máximo de tokens do histórico da conversa.
+        tokens_previa (int): Tamanho da prévia mantida para resultados
+            truncados e saídas antigas de ferramentas.
+        mensagens_recentes (int): Quantidade de mensagens finais do histórico
+            que nunca são compactadas.
+        armazem (ArmazemArtefatos): Onde os conteúdos completos são guardados.
+            Se omitido, um armazém próprio é criado.
+    """
+
+    def __init__(
+        self,
+        limite_resultado: int = 800,
+        limite_historico: int = 6000,
+        tokens_previa: int = 150,
+        mensagens_recentes: int = 4,
+        armazem: Optional[ArmazemArtefatos] = None,
+    ):
+        self.limite_resultado = limite_resultado
+        self.limite_historico = limite_historico
+        self.tokens_previa = tokens_previa
+        self.mensagens_recentes = mensagens_recentes
+        self.armazem = armazem if armazem is not None else ArmazemArtefatos()
+
+    # --------------------------------------------------------------------------
+    # Resultados de ferramentas
+    # --------------------------------------------------------------------------
+    def _resumir_com_handle(self, texto: str, total_tokens: int) -> str:
+        handle = self.armazem.salvar(texto, "texto", f"{total_tokens} tokens")
+        previa = _cortar_em_tokens(texto, self.tokens_previa)
+        return (
+            f"{previa}\n{MARCADOR_TRUNCADO} ({total_tokens} tokens). "
+            f"Use a ferramenta 'recuperar_resultado' com handle='{handle}' para ler o conteúdo completo.]"
+        )
+
+    def limitar_resultado(self, texto: str) -> str:
+        """
+        Retorna o texto intacto se couber no limite; caso contrário, guarda o
+        conteúdo completo e retorna uma prévia com o identificador.
+        """
+        total = contar_tokens(texto)
+        if total <= self.limite_resultado:
+            return texto
+        print(f"[CONTEXTO] Resultado com {total} tokens excede o limite de {self.limite_resultado}. Truncando.")
+        return self._resumir_com_handle(texto, total)
+
+    def envolver(self, fn: Callable[..., str]) -> Callable[..., str]:
+        """
+        Envolve uma função-ferramenta para limitar o tamanho do seu retorno.
+        A assinatura e a docstring são preservadas para o FunctionTool.
+        """
+        @functools.wraps(fn)
+        def ferramenta_limitada(*args, **kwargs):
+            return self.limitar_resultado(fn(*args, **kwargs))
+
+        return ferramenta_limitada
+
+    def recuperar(self, handle: str, parte: int = 1) -> str:
+        """
+        Retorna uma parte do conteúdo completo guardado sob 'handle'. Textos
+        são divididos em partes de até 'limite_resultado' tokens; em
+        artefatos do tipo lista, 'parte' é o número do item.
+        """
+        valor = self.armazem.obter(handle)
+        if valor is None:
+            return f"Nenhum resultado encontrado para o handle '{handle}'."
+        if isinstance(valor, list):
+            if parte < 1 or parte > len(valor):
+                return f"Item inválido. O artefato '{handle}' possui {len(valor)} item(ns)."
+            item = valor[parte - 1]
+            if isinstance(item, dict):
+                item = "\n".join(f"{chave}: {conteudo}" for chave, conteudo in item.items())
+            return self.limitar_resultado(str(item))
+        texto = str(valor)
+        total = contar_tokens(texto)
+        tamanho_parte = max(1, int(len(texto) * self.limite_resultado / max(total, 1)))
+        partes = [texto[i:i + tamanho_parte] for i in range(0, len(texto), tamanho_parte)]
+        if parte < 1 or parte > len(partes):
+            return f"Parte inválida. O resultado '{handle}' possui {len(partes)} parte(s)."
+        rodape = f"\n[parte {parte} de {len(partes)}]" if len(partes) > 1 else ""
+        return partes[parte - 1] + rodape
+
+    # --------------------------------------------------------------------------
+    # Histórico da conversa
+    # --------------------------------------------------------------------------
+    def criar_memoria(self) -> ChatMemoryBuffer:
+        """
+        Cria a memória de chat do agente já limitada a 'limite_historico' tokens.
+        """
+        return ChatMemoryBuffer.from_defaults(
+            token_limit=self.limite_historico, tokenizer_fn=get_tokenizer()
+        )
+
+    @staticmethod
+    def _eh_saida_de_ferramenta(mensagem: ChatMessage) -> bool:
+        conteudo = mensagem.content or ""
+        if MARCADOR_TRUNCADO in conteudo:
+            return False
+        return mensagem.role == MessageRole.TOOL or conteudo.startswith("Observation:")
+
+    def contabilizar(self, mensagens: List[ChatMessage]) -> List[Tuple[str, int]]:
+        """
+        Retorna a contagem de tokens de cada mensagem, na forma (papel, tokens).
+        """
+        return [(str(m.role.value), contar_tokens(m.content or "")) for m in mensagens]
+
+    def compactar(self, mensagens: List[ChatMessage]) -> List[ChatMessage]:
+        """
+        Reduz saídas antigas de ferramentas a uma prévia (com handle para o
+        conteúdo completo) e descarta as mensagens mais antigas até que o
+        histórico caiba em 'limite_historico' tokens.
+        """
+        corte = max(len(mensagens) - self.mensagens_recentes, 0)
+        compactadas = []
+        for i, mensagem in enumerate(mensagens):
+            conteudo = mensagem.content or ""
+            tokens = contar_tokens(conteudo)
+            if i < corte and self._eh_saida_de_ferramenta(mensagem) and tokens > self.tokens_previa:
+                mensagem = mensagem.model_copy(update={"content": self._resumir_com_handle(conteudo, tokens)})
+            compactadas.append(mensagem)
+
+        tokens_por_mensagem = [t for _, t in self.contabilizar(compactadas)]
+        total = sum(tokens_por_mensagem)
+        inicio = 0
+        while total > self.limite_historico and inicio < corte:
+            total -= tokens_por_mensagem[inicio]
+            inicio += 1
+        # Não inicia o histórico com uma resposta de ferramenta órfã
+        while inicio < corte and compactadas[inicio].role == MessageRole.TOOL:
+            total -= tokens_por_mensagem[inicio]
+            inicio += 1
+        return compactadas[inicio:]
+
+    def compactar_memoria(self, memoria: ChatMemoryBuffer) -> None:
+        """
+        Aplica 'compactar' ao conteúdo de uma memória de chat, no lugar.
+        """
+        mensagens = memoria.get_all()
+        antes = sum(t for _, t in self.contabilizar(mensagens))
+        compactadas = self.compactar(mensagens)
+        depois = sum(t for _, t in self.contabilizar(compactadas))
+        memoria.set(compactadas)
+        print(f"[CONTEXTO] Histórico: {len(mensagens)} -> {len(compactadas)} mensagens, {antes} -> {depois} tokens.")
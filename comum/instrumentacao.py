@@ -0,0 +1,297 @@
+# -*- coding: utf-8 -*-
+"""
+Rastreamento por spans das ferramentas, recuperações, embeddings e LLMs.
+
+Cada span registra o tempo de parede e atributos como bytes baixados,
+linhas lidas, tokens de entrada/saída, acertos de cache e pico de memória.
+Os spans finalizados são gravados em JSONL com campos compatíveis com o
+OpenTelemetry (trace_id, span_id, parent_span_id, start/end em nanossegundos)
+e podem ser resumidos em uma árvore de tempos ao fim da execução.
+
+Uso:
+    from comum.instrumentacao import rastreador, span_atual
+
+    rastreador.ativar(arquivo="rastreamento.jsonl")
+
+    @rastreador.rastrear()
+    def minha_ferramenta(...):
+        span_atual().registrar(linhas=123)
+"""
+
+import asyncio
+import functools
+import inspect
+import json
+import os
+import threading
+import time
+import tracemalloc
+import uuid
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+_span_atual: ContextVar[Optional["Span"]] = ContextVar("span_atual", default=None)
+
+
+class Span:
+    def __init__(self, nome: str, trace_id: str, pai: Optional["Span"], atributos: Dict[str, Any]):
+        self.nome = nome
+        self.trace_id = trace_id
+        self.span_id = uuid.uuid4().hex[:16]
+        self.pai_id = pai.span_id if pai else None
+        self.caminho: Tuple[str, ...] = (pai.caminho if pai else ()) + (nome,)
+        self.atributos = dict(atributos)
+        self.inicio_ns = time.time_ns()
+        self.fim_ns: Optional[int] = None
+        self.erro: Optional[str] = None
+        self.pico_memoria = 0
+        # Outro span independente esteve aberto ao mesmo tempo: o pico não é só deste
+        self.memoria_concorrente = False
+        self._pai = pai
+
+    @property
+    def duracao_ms(self) -> float:
+        fim = self.fim_ns if self.fim_ns is not None else time.time_ns()
+        return (fim - self.inicio_ns) / 1e6
+
+    def registrar(self, **atributos) -> None:
+        self.atributos.update(atributos)
+
+    def incrementar(self, chave: str, valor: float = 1) -> None:
+        self.atributos[chave] = self.atributos.get(chave, 0) + valor
+
+    def para_dict(self) -> Dict[str, Any]:
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_span_id": self.pai_id,
+            "name": self.nome,
+            "start_time_unix_nano": self.inicio_ns,
+            "end_time_unix_nano": self.fim_ns,
+            "duration_ms": round(self.duracao_ms, 3),
+            "attributes": self.atributos,
+            "status": {"code": "ERROR", "message": self.erro} if self.erro else {"code": "OK"},
+        }
+
+
+class _SpanNulo:
+    """
+    Span usado quando não há span ativo: os registros são descartados.
+    """
+
+    def registrar(self, **atributos) -> None:
+        pass
+
+    def incrementar(self, chave: str, valor: float = 1) -> None:
+        pass
+
+
+def span_atual():
+    """
+    Retorna o span ativo no contexto atual (ou um span nulo).
+    """
+    return _span_atual.get() or _SpanNulo()
+
+
+def em_thread(fn):
+    """
+    Versão assíncrona de uma ferramenta síncrona que roda em uma thread com
+    'asyncio.to_thread', que copia o contexto atual (span ativo e demais
+    ContextVars). Use como 'async_fn' do FunctionTool: sem ela, o agente
+    executa a ferramenta com 'loop.run_in_executor', que não copia o
+    contexto, e os spans da ferramenta ficam sem pai.
+    """
+    @functools.wraps(fn)
+    async def envolvida(*args, **kwargs):
+        return await asyncio.to_thread(fn, *args, **kwargs)
+
+    return envolvida
+
+
+class Rastreador:
+    """
+    Coleta os spans de uma execução e os exporta para um arquivo JSONL.
+    """
+
+    def __init__(self):
+        self.trace_id = uuid.uuid4().hex
+        self.spans: List[Span] = []
+        self.arquivo: Optional[str] = None
+        self.medir_memoria = False
+        self._coletor_registrado = False
+        self._trava = threading.Lock()
+        # Spans abertos enquanto a memória é medida
+        self._abertos: set = set()
+
+    def ativar(self, arquivo: Optional[str] = None, medir_memoria: bool = False, llama_index: bool = True) -> "Rastreador":
+        """
+        Configura a exportação e, opcionalmente, a medição de memória com
+        'tracemalloc' (mais precisa, porém mais lenta) e a captura dos
+        eventos de LLM, embedding e recuperação do LlamaIndex.
+
+        O pico do 'tracemalloc' é um só para o processo, então ele só é
+        atribuído a spans executados em sequência (aninhados ou não). Se um
+        span abre enquanto outro independente está aberto (threads, tarefas
+        assíncronas em paralelo, o executor em lote), nenhum dos dois recebe
+        'pico_memoria_bytes'; ficam marcados com 'pico_memoria_concorrente'.
+        """
+        self.arquivo = arquivo
+        self.medir_memoria = medir_memoria
+        if medir_memoria and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        if arquivo:
+            os.makedirs(os.path.dirname(os.path.abspath(arquivo)), exist_ok=True)
+        if llama_index and not self._coletor_registrado:
+            from comum._eventos_llama_index import registrar_coletor
+
+            registrar_coletor(self)
+            self._coletor_registrado = True
+        return self
+
+    # --------------------------------------------------------------------------
+    # Ciclo de vida dos spans
+    # --------------------------------------------------------------------------
+    def iniciar(self, nome: str, pai: Optional[Span] = None, **atributos) -> Span:
+        span = Span(nome, self.trace_id, pai, atributos)
+        if self.medir_memoria and tracemalloc.is_tracing():
+            with self._trava:
+                ancestrais = set()
+                no = pai
+                while no is not None:
+                    ancestrais.add(no)
+                    no = no._pai
+                independentes = self._abertos - ancestrais
+                if independentes:
+                    span.memoria_concorrente = True
+                    for aberto in independentes | ancestrais:
+                        aberto.memoria_concorrente = True
+                self._abertos.add(span)
+                # O pico até aqui pertence ao pai; o novo span mede a partir de agora
+                if pai is not None:
+                    pai.pico_memoria = max(pai.pico_memoria, tracemalloc.get_traced_memory()[1])
+                tracemalloc.reset_peak()
+        return span
+
+    def finalizar(self, span: Span, erro: Optional[BaseException] = None) -> None:
+        span.fim_ns = time.time_ns()
+        if erro is not None:
+            span.erro = f"{type(erro).__name__}: {erro}"
+        if self.medir_memoria and tracemalloc.is_tracing():
+            with self._trava:
+                self._abertos.discard(span)
+                span.pico_memoria = max(span.pico_memoria, tracemalloc.get_traced_memory()[1])
+                if span._pai is not None:
+                    span._pai.pico_memoria = max(span._pai.pico_memoria, span.pico_memoria)
+            if span.memoria_concorrente:
+                span.atributos["pico_memoria_concorrente"] = True
+            else:
+                span.atributos["pico_memoria_bytes"] = span.pico_memoria
+        elif resource is not None:
+            # ru_maxrss é dado em KB no Linux
+            span.atributos["pico_rss_processo_bytes"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+        with self._trava:
+            self.spans.append(span)
+            if self.arquivo:
+                with open(self.arquivo, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(span.para_dict(), ensure_ascii=False, default=str) + "\n")
+
+    @contextmanager
+    def span(self, nome: str, **atributos):
+        """
+        Abre um span filho do span ativo e o torna ativo dentro do bloco.
+        """
+        span = self.iniciar(nome, _span_atual.get(), **atributos)
+        token = _span_atual.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            self.finalizar(span, e)
+            raise
+        else:
+            self.finalizar(span)
+        finally:
+            _span_atual.reset(token)
+
+    def rastrear(self, nome: Optional[str] = None):
+        """
+        Decorador que executa a função (síncrona ou assíncrona) dentro de um
+        span. A assinatura é preservada para o FunctionTool.
+        """
+        def decorador(fn):
+            nome_span = nome or fn.__name__
+
+            if inspect.iscoroutinefunction(fn):
+                @functools.wraps(fn)
+                async def envolvida_async(*args, **kwargs):
+                    with self.span(nome_span):
+                        return await fn(*args, **kwargs)
+
+                return envolvida_async
+
+            @functools.wraps(fn)
+            def envolvida(*args, **kwargs):
+                with self.span(nome_span):
+                    return fn(*args, **kwargs)
+
+            return envolvida
+
+        return decorador
+
+    # --------------------------------------------------------------------------
+    # Resumo da execução
+    # --------------------------------------------------------------------------
+    def _agregar(self) -> Dict[Tuple[str, ...], List[float]]:
+        agregado: Dict[Tuple[str, ...], List[float]] = defaultdict(lambda: [0.0, 0])
+        with self._trava:
+            for span in self.spans:
+                agregado[span.caminho][0] += span.duracao_ms
+                agregado[span.caminho][1] += 1
+        return agregado
+
+    def resumo_chamas(self, minimo_pct: float = 0.5) -> str:
+        """
+        Retorna a árvore de tempos da execução (tempo total, % e número de
+        chamadas por caminho de spans), omitindo ramos abaixo de 'minimo_pct'.
+        """
+        agregado = self._agregar()
+        total = sum(ms for caminho, (ms, _) in agregado.items() if len(caminho) == 1)
+        if not total:
+            return "Nenhum span registrado."
+        linhas = [f"Total rastreado: {total / 1000:.2f}s"]
+
+        def desenhar(prefixo: Tuple[str, ...]):
+            filhos = [c for c in agregado if len(c) == len(prefixo) + 1 and c[:len(prefixo)] == prefixo]
+            for caminho in sorted(filhos, key=lambda c: -agregado[c][0]):
+                ms, chamadas = agregado[caminho]
+                pct = 100 * ms / total
+                if pct < minimo_pct:
+                    continue
+                recuo = "  " * (len(caminho) - 1)
+                linhas.append(f"{recuo}{caminho[-1]:<{40 - len(recuo)}} {ms / 1000:>8.2f}s {pct:>5.1f}%  ({int(chamadas)}x)")
+                desenhar(caminho)
+
+        desenhar(())
+        return "\n".join(linhas)
+
+    def salvar_pilhas(self, caminho_arquivo: str) -> None:
+        """
+        Grava as pilhas no formato 'folded' (a;b;c <microssegundos próprios>),
+        aceito por ferramentas de flame graph como flamegraph.pl e speedscope.
+        """
+        agregado = self._agregar()
+        with open(caminho_arquivo, "w", encoding="utf-8") as f:
+            for caminho, (ms, _) in agregado.items():
+                filhos = sum(v[0] for c, v in agregado.items() if len(c) == len(caminho) + 1 and c[:-1] == caminho)
+                proprio_us = max(int((ms - filhos) * 1000), 0)
+                f.write(f"{';'.join(caminho)} {proprio_us}\n")
+
+
+# Instância única usada pelos scripts e módulos compartilhados
+rastreador = Rastreador()
@@ -0,0 +1,153 @@
+# -*- coding: utf-8 -*-
+"""
+Rota rápida por intenções: atende pedidos conhecidos sem passar pelo LLM.
+
+Cada intenção tem um extrator por regras que devolve os argumentos da
+ferramenta e uma confiança. Se as intenções reconhecidas cobrem todas as
+frases do pedido com confiança suficiente, as ferramentas são chamadas
+diretamente, na ordem em que as intenções foram registradas. Caso contrário,
+o pedido segue para o agente normalmente.
+
+Uma frase só é coberta se, depois de retirados os trechos que as intenções
+entendem (gatilhos e termos) e as palavras de ligação, não sobra nada: em
+"média do peso líquido das exportações para a China", "china" sobra e o
+pedido vai para o agente, em vez de ser respondido sem o filtro do país.
+Frases com negação ("não limpe os dados") também ficam com o agente. Os
+extratores devolvem None quando um argumento aparece mais de uma vez
+("compare maio de 2024 com 2023"), já que cada intenção faz uma só chamada.
+"""
+
+import re
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Pattern, Tuple, Union
+
+from llama_index.core.llms import ChatMessage, MessageRole
+
+from comum.instrumentacao import rastreador
+
+# Frases negadas ("não limpe os dados", "não baixei") nunca são atendidas pela rota rápida
+NEGACAO = re.compile(r"\b(?:n[ãa]o|nunca|jamais)\b", re.IGNORECASE)
+
+# Palavras de ligação e formas de pedido que podem sobrar em uma frase atendida
+PALAVRAS_LIVRES = {
+    "a", "as", "o", "os", "um", "uma", "de", "da", "das", "do", "dos", "e", "em", "no", "na", "nos",
+    "nas", "para", "por", "pelo", "pela", "com", "ao", "aos", "à", "me", "qual", "quais", "quanto",
+    "é", "foi", "foram", "são", "seu", "sua", "que", "depois", "então", "agora", "favor", "diga",
+    "dê", "mostre", "informe", "calcule", "essa", "esta", "isso", "informação",
+}
+
+
+@dataclass
+class Intencao:
+    """
+    Args:
+        nome (str): Nome da ferramenta associada.
+        extrair (callable): Recebe o pedido e retorna (argumentos, confiança)
+            ou None se a intenção não estiver presente.
+        executar (callable): Função-ferramenta chamada com os argumentos.
+        gatilhos (list): Expressões regulares que indicam que uma frase do
+            pedido é atendida por esta intenção.
+        termos (list): Expressões regulares (texto, sem distinção de
+            maiúsculas, ou já compiladas) de tudo o mais que a intenção
+            entende (argumentos, verbos e nomes do pedido). O que sobra da
+            frase fora dos gatilhos, dos termos e de PALAVRAS_LIVRES impede
+            a rota rápida.
+    """
+
+    nome: str
+    extrair: Callable[[str], Optional[Tuple[Dict[str, Any], float]]]
+    executar: Callable[..., str]
+    gatilhos: List[str] = field(default_factory=list)
+    termos: List[Union[str, Pattern]] = field(default_factory=list)
+
+    def reconhece(self, frase: str) -> bool:
+        return any(re.search(gatilho, frase, re.IGNORECASE) for gatilho in self.gatilhos)
+
+
+def _sobra(frase: str, intencoes: List[Intencao]) -> List[str]:
+    """Palavras da frase que nenhuma das intenções entende."""
+    # Termos antes dos gatilhos: "150 curtidas" sai inteiro, sem sobrar o número
+    padroes = [p for i in intencoes for p in i.termos] + [p for i in intencoes for p in i.gatilhos]
+    for padrao in padroes:
+        if isinstance(padrao, str):
+            padrao = re.compile(padrao, re.IGNORECASE)
+        frase = padrao.sub(" ", frase)
+    return [p for p in re.findall(r"\w+", frase.lower()) if p not in PALAVRAS_LIVRES]
+
+
+def cobre(frase: str, intencoes: List[Intencao]) -> bool:
+    """
+    Indica se as intenções atendem a frase inteira: sem negação, com ao
+    menos um gatilho e sem palavras que nenhuma delas entende.
+    """
+    if NEGACAO.search(frase) or not any(i.reconhece(frase) for i in intencoes):
+        return False
+    return not _sobra(frase, intencoes)
+
+
+def _dividir_frases(texto: str) -> List[str]:
+    frases = re.split(r"(?<=[.?!;])\s+|\n+", texto.strip())
+    return [f for f in frases if f.strip(" .?!;")]
+
+
+class PreRoteador:
+    """
+    Classifica o pedido do usuário e executa as ferramentas diretamente
+    quando a confiança atinge 'confianca_minima'.
+    """
+
+    def __init__(self, intencoes: List[Intencao], confianca_minima: float = 0.8):
+        self.intencoes = intencoes
+        self.confianca_minima = confianca_minima
+
+    def planejar(self, texto: str) -> Tuple[List[Tuple[Intencao, Dict[str, Any]]], float]:
+        """
+        Retorna o plano de chamadas [(intenção, argumentos)] e a confiança do
+        plano: a menor confiança entre as intenções multiplicada pela fração
+        de frases do pedido cobertas por elas.
+        """
+        plano = []
+        confiancas = []
+        for intencao in self.intencoes:
+            resultado = intencao.extrair(texto)
+            if resultado is not None:
+                argumentos, confianca = resultado
+                plano.append((intencao, argumentos))
+                confiancas.append(confianca)
+        if not plano:
+            return [], 0.0
+        frases = _dividir_frases(texto)
+        intencoes = [i for i, _ in plano]
+        cobertas = sum(1 for frase in frases if cobre(frase, intencoes))
+        cobertura = cobertas / len(frases) if frases else 0.0
+        return plano, min(confiancas) * cobertura
+
+    async def responder(
+        self,
+        texto: str,
+        fallback: Callable[[str], Awaitable[Any]],
+        memoria=None,
+    ):
+        """
+        Executa o plano da rota rápida ou, se a confiança for baixa, chama
+        'fallback(texto)' (normalmente o agente). Quando 'memoria' é
+        informada, o pedido e a resposta da rota rápida são registrados nela
+        para manter o histórico do agente coerente.
+        """
+        plano, confianca = self.planejar(texto)
+        if confianca < self.confianca_minima:
+            print(f"[ROTA RÁPIDA] Confiança {confianca:.2f} abaixo de {self.confianca_minima:.2f}. Usando o agente.")
+            return await fallback(texto)
+
+        print(f"[ROTA RÁPIDA] Confiança {confianca:.2f}. Executando {[i.nome for i, _ in plano]} sem o LLM.")
+        respostas = []
+        with rastreador.span("rota_rapida", intencoes=[i.nome for i, _ in plano]):
+            for intencao, argumentos in plano:
+                print(f"[ROTA RÁPIDA] {intencao.nome}({argumentos})")
+                respostas.append(intencao.executar(**argumentos))
+        resposta = "\n".join(respostas)
+        print("Resposta (rota rápida):", resposta)
+        if memoria is not None:
+            memoria.put(ChatMessage(role=MessageRole.USER, content=texto))
+            memoria.put(ChatMessage(role=MessageRole.ASSISTANT, content=resposta))
+        return resposta
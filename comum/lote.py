@@ -0,0 +1,289 @@
+# -*- coding: utf-8 -*-
+"""
+Execução em lote: muitas perguntas, vários agentes em paralelo.
+
+As perguntas vêm de um arquivo JSONL (uma por linha, com os campos 'id' e
+'pergunta') e são distribuídas entre um conjunto de instâncias do agente. A
+concorrência se adapta aos limites de taxa do provedor: um erro 429 reduz
+pela metade o número de perguntas simultâneas e a pergunta é repetida após
+uma espera exponencial; uma sequência de sucessos volta a aumentá-lo. Um
+limite opcional de perguntas por minuto espaça o início das execuções.
+
+Cada resultado é gravado no JSONL de saída assim que termina, com latência,
+ferramentas chamadas, tokens e a resposta, e o resumo final traz a vazão.
+
+Uso:
+    executor = ExecutorLote(criar_agente, concorrencia=4, consultas_por_minuto=30)
+    resumo = asyncio.run(executor.executar(ler_consultas("consultas.jsonl"), "resultados.jsonl"))
+"""
+
+import asyncio
+import json
+import os
+import statistics
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from comum.instrumentacao import rastreador
+from comum.streaming import eventos_agente
+
+
+def ler_consultas(caminho: str) -> List[Dict[str, Any]]:
+    """
+    Lê as perguntas de um JSONL. Linhas vazias e iniciadas por '#' são
+    ignoradas; sem 'id', a posição da linha é usada.
+    """
+    consultas = []
+    with open(caminho, encoding="utf-8") as f:
+        for numero, linha in enumerate(f, start=1):
+            linha = linha.strip()
+            if not linha or linha.startswith("#"):
+                continue
+            consulta = json.loads(linha)
+            consulta.setdefault("id", str(numero))
+            consultas.append(consulta)
+    return consultas
+
+
+def _eh_limite_de_taxa(erro: BaseException) -> bool:
+    """
+    Verifica o código HTTP 429 ou o tipo RateLimitError (Groq, OpenAI) no
+    erro e nas suas causas: agentes de workflow repassam a exceção original
+    encadeada. O texto da mensagem não é usado, já que respostas e
+    argumentos podem conter '429'.
+    """
+    vistos = set()
+    while erro is not None and id(erro) not in vistos:
+        vistos.add(id(erro))
+        status = getattr(erro, "status_code", None) or getattr(getattr(erro, "response", None), "status_code", None)
+        if status == 429 or type(erro).__name__ == "RateLimitError":
+            return True
+        erro = erro.__cause__ or erro.__context__
+    return False
+
+
+class _ConcorrenciaAdaptativa:
+    """
+    Semáforo com limite ajustável: diminui multiplicativamente em erros de
+    limite de taxa e aumenta de um em um após 'sucessos_para_aumentar'.
+    """
+
+    def __init__(self, maximo: int, sucessos_para_aumentar: int = 5):
+        self.maximo = maximo
+        self.limite = maximo
+        self.sucessos_para_aumentar = sucessos_para_aumentar
+        self._em_uso = 0
+        self._sucessos = 0
+        self._condicao = asyncio.Condition()
+
+    async def __aenter__(self):
+        async with self._condicao:
+            await self._condicao.wait_for(lambda: self._em_uso < self.limite)
+            self._em_uso += 1
+
+    async def __aexit__(self, *exc):
+        async with self._condicao:
+            self._em_uso -= 1
+            self._condicao.notify_all()
+
+    def sucesso(self) -> None:
+        self._sucessos += 1
+        if self._sucessos >= self.sucessos_para_aumentar and self.limite < self.maximo:
+            self.limite += 1
+            self._sucessos = 0
+
+    def limite_atingido(self) -> None:
+        self._sucessos = 0
+        self.limite = max(1, self.limite // 2)
+
+
+class _LimitadorTaxa:
+    """
+    Espaça o início das execuções para no máximo 'por_minuto' por minuto.
+    """
+
+    def __init__(self, por_minuto: Optional[float]):
+        self.intervalo = 60.0 / por_minuto if por_minuto else 0.0
+        self._proximo = 0.0
+        self._trava = asyncio.Lock()
+
+    async def aguardar(self) -> None:
+        if not self.intervalo:
+            return
+        async with self._trava:
+            agora = time.monotonic()
+            espera = self._proximo - agora
+            self._proximo = max(agora, self._proximo) + self.intervalo
+        if espera > 0:
+            await asyncio.sleep(espera)
+
+
+class ExecutorLote:
+    """
+    Args:
+        fabrica_agente (callable): Cria uma instância do agente. É chamada
+            'concorrencia' vezes; cada instância atende uma pergunta por vez.
+        concorrencia (int): Máximo de perguntas simultâneas.
+        consultas_por_minuto (float): Limite de perguntas iniciadas por minuto.
+        tentativas (int): Tentativas por pergunta em erros de limite de taxa.
+        espera_base (float): Espera, em segundos, antes da primeira repetição
+            (dobra a cada tentativa).
+        criar_memoria (callable): Cria uma memória vazia por pergunta
+            (ex.: gerenciador_contexto.criar_memoria).
+        pre_roteador (PreRoteador): Se informado, perguntas reconhecidas com
+            confiança são atendidas pela rota rápida, sem o LLM.
+        preparar_consulta (callable): Chamada no início de cada pergunta, já
+            no contexto (contextvars) da sua tarefa; serve para isolar o
+            estado das ferramentas entre perguntas simultâneas
+            (ex.: novo_contexto_dados, no comex).
+        llm_sintese: LLM que reescreve a resposta final dos agentes de
+            workflow a partir dos resultados das ferramentas
+            (ex.: roteador.llm("sintese")).
+    """
+
+    def __init__(
+        self,
+        fabrica_agente: Callable[[], Any],
+        concorrencia: int = 4,
+        consultas_por_minuto: Optional[float] = None,
+        tentativas: int = 4,
+        espera_base: float = 2.0,
+        criar_memoria: Optional[Callable[[], Any]] = None,
+        pre_roteador=None,
+        preparar_consulta: Optional[Callable[[], None]] = None,
+        llm_sintese=None,
+    ):
+        self.fabrica_agente = fabrica_agente
+        self.concorrencia = concorrencia
+        self.consultas_por_minuto = consultas_por_minuto
+        self.tentativas = tentativas
+        self.espera_base = espera_base
+        self.criar_memoria = criar_memoria
+        self.pre_roteador = pre_roteador
+        self.preparar_consulta = preparar_consulta
+        self.llm_sintese = llm_sintese
+
+    async def _perguntar_agente(self, agente, pergunta: str, resultado: Dict[str, Any]):
+        kwargs = {"memory": self.criar_memoria()} if self.criar_memoria else {}
+        if hasattr(agente, "achat"):
+            # Agentes do tipo AgentRunner guardam a memória na instância, que é
+            # reaproveitada entre perguntas: cada pergunta começa do zero
+            if self.criar_memoria:
+                agente.memory = kwargs["memory"]
+            else:
+                agente.reset()
+            resposta = await agente.achat(pergunta)
+            resultado["ferramentas"].extend(fonte.tool_name for fonte in resposta.sources)
+            return resposta
+        resposta = None
+        async for tipo, valor in eventos_agente(agente, pergunta, sintese=self.llm_sintese, **kwargs):
+            if tipo == "token" and resultado["primeiro_token_s"] is None:
+                resultado["primeiro_token_s"] = round(time.perf_counter() - resultado["_inicio"], 3)
+            elif tipo == "ferramenta_inicio":
+                resultado["ferramentas"].append(valor.tool_name)
+            elif tipo == "resposta":
+                resposta = valor
+        return resposta
+
+    async def _executar_uma(self, consulta, agentes: asyncio.Queue, concorrencia, limitador, saida) -> Dict[str, Any]:
+        pergunta = consulta["pergunta"]
+        if self.preparar_consulta is not None:
+            # Cada pergunta é uma tarefa do asyncio.gather, com sua própria cópia do contexto
+            self.preparar_consulta()
+        for tentativa in range(1, self.tentativas + 1):
+            await limitador.aguardar()
+            espera = None
+            async with concorrencia:
+                agente = await agentes.get()
+                resultado = {
+                    "id": consulta["id"], "pergunta": pergunta, "rota": "agente", "tentativas": tentativa,
+                    "ferramentas": [], "primeiro_token_s": None, "_inicio": time.perf_counter(),
+                }
+                try:
+                    with rastreador.span("lote.consulta", id=consulta["id"]) as span:
+                        plano, confianca = [], 0.0
+                        if self.pre_roteador is not None:
+                            plano, confianca = self.pre_roteador.planejar(pergunta)
+                        if plano and confianca >= self.pre_roteador.confianca_minima:
+                            resultado["rota"] = "rapida"
+                            resultado["ferramentas"] = [i.nome for i, _ in plano]
+                            # As ferramentas são síncronas (download, leitura de CSV): rodam
+                            # em uma thread para não bloquear as outras perguntas do lote
+                            respostas = []
+                            for intencao, argumentos in plano:
+                                respostas.append(await asyncio.to_thread(intencao.executar, **argumentos))
+                            resposta = "\n".join(respostas)
+                        else:
+                            resposta = await self._perguntar_agente(agente, pergunta, resultado)
+                    resultado["resposta"] = str(resposta)
+                    resultado["erro"] = None
+                    resultado["tokens_entrada"] = span.atributos.get("tokens_entrada_total", 0)
+                    resultado["tokens_saida"] = span.atributos.get("tokens_saida_total", 0)
+                    concorrencia.sucesso()
+                except Exception as e:
+                    resultado["resposta"] = None
+                    resultado["erro"] = f"{type(e).__name__}: {e}"
+                    if _eh_limite_de_taxa(e) and tentativa < self.tentativas:
+                        concorrencia.limite_atingido()
+                        espera = self.espera_base * 2 ** (tentativa - 1)
+                finally:
+                    resultado["latencia_s"] = round(time.perf_counter() - resultado.pop("_inicio"), 3)
+                    agentes.put_nowait(agente)
+
+            if espera is not None:
+                # A espera acontece fora da vaga de concorrência
+                print(f"[LOTE] {consulta['id']}: limite de taxa; concorrência {concorrencia.limite}, nova tentativa em {espera:.0f}s.")
+                await asyncio.sleep(espera)
+                continue
+            resultado["chamadas_ferramentas"] = len(resultado["ferramentas"])
+            saida.write(json.dumps(resultado, ensure_ascii=False, default=str) + "\n")
+            saida.flush()
+            estado = "ERRO" if resultado["erro"] else "OK"
+            print(f"[LOTE] {consulta['id']} [{estado}] {resultado['latencia_s']:.2f}s, {resultado['chamadas_ferramentas']} ferramenta(s).")
+            return resultado
+
+    async def executar(self, consultas: List[Dict[str, Any]], arquivo_saida: str) -> Dict[str, Any]:
+        """
+        Executa todas as perguntas e grava um resultado por linha em
+        'arquivo_saida'. Retorna o resumo da execução.
+        """
+        agentes: asyncio.Queue = asyncio.Queue()
+        for _ in range(min(self.concorrencia, len(consultas)) or 1):
+            agentes.put_nowait(self.fabrica_agente())
+        concorrencia = _ConcorrenciaAdaptativa(self.concorrencia)
+        limitador = _LimitadorTaxa(self.consultas_por_minuto)
+
+        os.makedirs(os.path.dirname(os.path.abspath(arquivo_saida)), exist_ok=True)
+        print(f"[LOTE] {len(consultas)} pergunta(s), até {self.concorrencia} em paralelo.")
+        inicio = time.perf_counter()
+        with open(arquivo_saida, "w", encoding="utf-8") as saida:
+            resultados = await asyncio.gather(
+                *(self._executar_uma(c, agentes, concorrencia, limitador, saida) for c in consultas)
+            )
+        duracao = time.perf_counter() - inicio
+
+        latencias = sorted(r["latencia_s"] for r in resultados)
+        sucessos = [r for r in resultados if not r["erro"]]
+        resumo = {
+            "perguntas": len(resultados),
+            "sucessos": len(sucessos),
+            "falhas": len(resultados) - len(sucessos),
+            "duracao_s": round(duracao, 2),
+            "vazao_por_minuto": round(len(resultados) / duracao * 60, 2) if duracao else 0.0,
+            "latencia_p50_s": round(statistics.median(latencias), 3) if latencias else 0.0,
+            "latencia_p95_s": latencias[min(len(latencias) - 1, int(len(latencias) * 0.95))] if latencias else 0.0,
+            "tokens_entrada": sum(r.get("tokens_entrada", 0) for r in sucessos),
+            "tokens_saida": sum(r.get("tokens_saida", 0) for r in sucessos),
+            "chamadas_ferramentas": sum(r["chamadas_ferramentas"] for r in resultados),
+        }
+        return resumo
+
+
+def formatar_resumo(resumo: Dict[str, Any]) -> str:
+    return (
+        f"{resumo['perguntas']} pergunta(s) em {resumo['duracao_s']:.1f}s "
+        f"({resumo['vazao_por_minuto']:.1f}/min): {resumo['sucessos']} ok, {resumo['falhas']} com erro\n"
+        f"Latência p50 {resumo['latencia_p50_s']:.2f}s, p95 {resumo['latencia_p95_s']:.2f}s\n"
+        f"Tokens: {resumo['tokens_entrada']} de entrada, {resumo['tokens_saida']} de saída; "
+        f"{resumo['chamadas_ferramentas']} chamada(s) de ferramentas"
+    )
@@ -0,0 +1,335 @@
+# -*- coding: utf-8 -*-
+"""
+Governador de memória do processo.
+
+Substitui as chamadas manuais a 'gc.collect()' e as ferramentas de limpeza
+acionadas pelo LLM. Os objetos grandes (DataFrames, índices, agentes) são
+registrados com seu tamanho e, opcionalmente, uma função de despejo. Quando o
+RSS do processo passa do limite, os registros são despejados em ordem
+(menor prioridade primeiro, depois os usados há mais tempo) até o RSS voltar
+a 'alvo' do limite. Despejar pode liberar o objeto (ex.: um índice que é
+recriado na próxima consulta) ou movê-lo para o disco: 'dataframe_em_disco'
+grava o DataFrame em Arrow IPC e devolve uma versão aberta por memory-map,
+cujas páginas o sistema operacional pode descartar e reler sob demanda.
+
+A verificação roda a cada registro, ao fim de cada fase pesada e, com
+'iniciar()', periodicamente em segundo plano. Como o despejo pode então
+rodar na thread do monitor, ele acontece com 'governador.trava' seguro, e o
+código que lê ou troca os objetos despejáveis deve segurar a mesma trava. O coletor de lixo também é
+ajustado: objetos criados na configuração vão para a geração permanente
+('gc.freeze') e, durante as fases pesadas (carga de CSV, criação de índices),
+a coleta automática fica suspensa, já que ali quase nada vira lixo.
+
+O limite vem de LIMITE_MEMORIA_MB; sem ela, 70% da memória física.
+
+Uso:
+    governador = GovernadorMemoria().configurar_gc().iniciar()
+    with governador.fase_pesada("carga"):
+        df = ler_csv(...)
+    governador.registrar("dados", df, despejar=lambda: mover_para_disco())
+"""
+
+import gc
+import os
+import sys
+import threading
+import time
+import weakref
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, List, Optional
+
+from comum.instrumentacao import rastreador, span_atual
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+DIR_DESPEJO = "cache_memoria"
+MB = 1 << 20
+
+
+def rss_atual() -> int:
+    """
+    Memória residente do processo, em bytes.
+    """
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        pass
+    if psutil is not None:
+        return psutil.Process().memory_info().rss
+    if resource is not None:
+        # Sem /proc nem psutil, o pico é a melhor aproximação disponível (KB no Linux, bytes no macOS)
+        pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return pico if sys.platform == "darwin" else pico * 1024
+    return 0
+
+
+def _memoria_fisica() -> int:
+    try:
+        return os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES")
+    except (ValueError, OSError, AttributeError):
+        return psutil.virtual_memory().total if psutil is not None else 0
+
+
+def estimar_tamanho(objeto: Any) -> int:
+    """
+    Bytes ocupados por DataFrames, arrays (NumPy/Arrow) e objetos com um
+    atributo 'nbytes'; para os demais, o tamanho raso do Python.
+    """
+    if hasattr(objeto, "memory_usage") and hasattr(objeto, "columns"):
+        return int(objeto.memory_usage(index=True).sum())
+    if hasattr(objeto, "nbytes"):
+        return int(objeto.nbytes)
+    return sys.getsizeof(objeto)
+
+
+def dataframe_em_disco(df, caminho: str):
+    """
+    Grava o DataFrame em Arrow IPC e o devolve aberto por memory-map. As
+    colunas numéricas passam a ser lidas do arquivo (sem cópia), então a
+    memória que ocupavam pode ser devolvida ao sistema.
+    """
+    import pyarrow as pa
+
+    os.makedirs(os.path.dirname(caminho) or ".", exist_ok=True)
+    tabela = pa.Table.from_pandas(df, preserve_index=False)
+    temporario = f"{caminho}.tmp"
+    with pa.OSFile(temporario, "wb") as f, pa.ipc.new_file(f, tabela.schema) as escritor:
+        escritor.write_table(tabela)
+    os.replace(temporario, caminho)
+    del tabela
+    return pa.ipc.open_file(pa.memory_map(caminho, "r")).read_all().to_pandas(split_blocks=True)
+
+
+class _Registro:
+    def __init__(self, nome: str, objeto: Any, tamanho: int, despejar: Optional[Callable[[], None]], prioridade: int):
+        self.nome = nome
+        self.tamanho = tamanho
+        self.despejar = despejar
+        self.prioridade = prioridade
+        self.ultimo_uso = time.monotonic()
+        try:
+            self.referencia = weakref.ref(objeto)
+        except TypeError:
+            self.referencia = None
+
+
+class GovernadorMemoria:
+    """
+    Args:
+        limite_mb (float): Limite de RSS do processo. Padrão: LIMITE_MEMORIA_MB
+            ou 70% da memória física.
+        alvo (float): Fração do limite a atingir ao despejar.
+        intervalo (float): Segundos entre as verificações em segundo plano.
+        diretorio (str): Pasta para os objetos movidos para o disco.
+    """
+
+    def __init__(
+        self,
+        limite_mb: Optional[float] = None,
+        alvo: float = 0.8,
+        intervalo: float = 2.0,
+        diretorio: str = DIR_DESPEJO,
+    ):
+        if limite_mb is None and os.getenv("LIMITE_MEMORIA_MB"):
+            limite_mb = float(os.getenv("LIMITE_MEMORIA_MB"))
+        self.limite = int(limite_mb * MB) if limite_mb else int(_memoria_fisica() * 0.7)
+        self.alvo = alvo
+        self.intervalo = intervalo
+        self.diretorio = diretorio
+        self._registros: Dict[str, _Registro] = {}
+        self._trava = threading.RLock()
+        self._fases = 0
+        self._despejando = False
+        self._gc_ativo = gc.isenabled()
+        self._parar = threading.Event()
+        self._monitor: Optional[threading.Thread] = None
+        self.despejos: List[str] = []
+
+    # --------------------------------------------------------------------------
+    # Coletor de lixo
+    # --------------------------------------------------------------------------
+    def configurar_gc(self, limiar_geracao0: int = 10_000) -> "GovernadorMemoria":
+        """
+        Move os objetos já criados (módulos, modelos, configuração) para a
+        geração permanente, que as coletas completas deixam de percorrer, e
+        aumenta o limiar da geração 0: agentes e respostas JSON criam muitos
+        objetos de vida curta que o contador de referências já libera.
+        """
+        gc.collect()
+        gc.freeze()
+        _, limiar1, limiar2 = gc.get_threshold()
+        gc.set_threshold(limiar_geracao0, limiar1, limiar2)
+        return self
+
+    @contextmanager
+    def fase_pesada(self, nome: str):
+        """
+        Suspende a coleta automática durante uma fase que aloca muitos
+        objetos duradouros e verifica o limite de memória ao final.
+        """
+        with self._trava:
+            if self._fases == 0:
+                self._gc_ativo = gc.isenabled()
+                gc.disable()
+            self._fases += 1
+        inicio = rss_atual()
+        try:
+            yield
+        finally:
+            with self._trava:
+                self._fases -= 1
+                if self._fases == 0 and self._gc_ativo:
+                    gc.enable()
+            span_atual().registrar(fase=nome, rss_delta_bytes=rss_atual() - inicio)
+            self.verificar()
+
+    # --------------------------------------------------------------------------
+    # Registro dos objetos grandes
+    # --------------------------------------------------------------------------
+    def registrar(
+        self,
+        nome: str,
+        objeto: Any,
+        despejar: Optional[Callable[[], None]] = None,
+        tamanho: Optional[int] = None,
+        prioridade: int = 0,
+    ) -> None:
+        """
+        Acompanha um objeto grande.
+
+        Args:
+            nome (str): Identificador único (ex.: o handle do artefato).
+            objeto: O objeto. Sai do registro sozinho quando é liberado.
+            despejar (callable): Libera o objeto ou o move para o disco.
+                Sem ela, o objeto só entra na contagem.
+            tamanho (int): Bytes ocupados. Padrão: 'estimar_tamanho(objeto)'.
+            prioridade (int): Menor prioridade é despejada primeiro.
+        """
+        registro = _Registro(nome, objeto, tamanho if tamanho is not None else estimar_tamanho(objeto), despejar, prioridade)
+        if registro.referencia is not None:
+            registro.referencia = weakref.ref(objeto, lambda _, nome=nome, registro=registro: self._esquecer(nome, registro))
+        with self._trava:
+            self._registros[nome] = registro
+        self.verificar()
+
+    def _esquecer(self, nome: str, registro: _Registro) -> None:
+        with self._trava:
+            if self._registros.get(nome) is registro:
+                del self._registros[nome]
+
+    def remover(self, nome: str) -> None:
+        with self._trava:
+            self._registros.pop(nome, None)
+
+    def usar(self, nome: str) -> None:
+        """Marca o objeto como usado agora (fica por último na fila de despejo)."""
+        registro = self._registros.get(nome)
+        if registro is not None:
+            registro.ultimo_uso = time.monotonic()
+
+    @property
+    def trava(self) -> threading.RLock:
+        """
+        Trava mantida durante os despejos. Quem lê ou troca os objetos que as
+        funções de despejo alteram (ex.: variáveis globais) deve segurá-la.
+        """
+        return self._trava
+
+    def sob_pressao(self) -> bool:
+        """Indica se o RSS está acima do limite (útil para evitar alocações opcionais)."""
+        return rss_atual() > self.limite
+
+    def total_registrado(self) -> int:
+        with self._trava:
+            return sum(r.tamanho for r in self._registros.values())
+
+    # --------------------------------------------------------------------------
+    # Verificação do limite
+    # --------------------------------------------------------------------------
+    def verificar(self) -> int:
+        """
+        Despeja objetos registrados enquanto o RSS estiver acima do limite.
+
+        Returns:
+            int: Quantidade de objetos despejados.
+        """
+        rss = rss_atual()
+        if rss <= self.limite or self._fases or self._despejando:
+            return 0
+        with self._trava, rastreador.span("memoria.despejo", rss_bytes=rss, limite_bytes=self.limite) as span:
+            # Despejos podem registrar a nova versão do objeto (ex.: o DataFrame em disco)
+            self._despejando = True
+            try:
+                return self._despejar(span)
+            finally:
+                self._despejando = False
+
+    def _despejar(self, span) -> int:
+        # Ciclos pendentes podem bastar
+        gc.collect()
+        rss = rss_atual()
+        candidatos = sorted(
+            (r for r in self._registros.values() if r.despejar is not None),
+            key=lambda r: (r.prioridade, r.ultimo_uso),
+        )
+        despejados = 0
+        for registro in candidatos:
+            if rss <= self.limite * self.alvo:
+                break
+            try:
+                registro.despejar()
+            except Exception as e:
+                print(f"[MEMÓRIA] Falha ao despejar '{registro.nome}': {e}")
+                continue
+            if self._registros.get(registro.nome) is registro:
+                del self._registros[registro.nome]
+            gc.collect()
+            antes, rss = rss, rss_atual()
+            despejados += 1
+            self.despejos.append(registro.nome)
+            print(
+                f"[MEMÓRIA] '{registro.nome}' despejado ({registro.tamanho / MB:.1f} MB estimados); "
+                f"RSS {antes / MB:.0f} -> {rss / MB:.0f} MB (limite {self.limite / MB:.0f} MB)."
+            )
+        span.registrar(despejados=despejados, rss_final_bytes=rss)
+        if rss > self.limite:
+            print(f"[MEMÓRIA] RSS de {rss / MB:.0f} MB continua acima do limite; nada mais a despejar.")
+        return despejados
+
+    def _monitorar(self) -> None:
+        while not self._parar.wait(self.intervalo):
+            try:
+                self.verificar()
+            except Exception as e:
+                print(f"[MEMÓRIA] Erro na verificação: {e}")
+
+    def iniciar(self) -> "GovernadorMemoria":
+        """Verifica o limite periodicamente em uma thread de segundo plano."""
+        if self._monitor is None or not self._monitor.is_alive():
+            self._parar.clear()
+            self._monitor = threading.Thread(target=self._monitorar, name="governador-memoria", daemon=True)
+            self._monitor.start()
+        return self
+
+    def parar(self) -> None:
+        self._parar.set()
+
+    def relatorio(self) -> str:
+        with self._trava:
+            registros = sorted(self._registros.values(), key=lambda r: -r.tamanho)
+        linhas = [
+            f"RSS {rss_atual() / MB:.0f} MB de {self.limite / MB:.0f} MB; "
+            f"{len(registros)} objeto(s) registrados ({self.total_registrado() / MB:.1f} MB); "
+            f"{len(self.despejos)} despejo(s)"
+        ]
+        linhas.extend(f"  {r.nome}: {r.tamanho / MB:.1f} MB" for r in registros[:10])
+        return "\n".join(linhas)
@@ -0,0 +1,146 @@
+# -*- coding: utf-8 -*-
+"""
+Camada HTTP compartilhada pelas ferramentas (downloads do arXiv, arquivos da
+ComexStat).
+
+Uma única sessão 'requests' mantém as conexões abertas (keep-alive) em um pool
+por host, então downloads em sequência não repetem o handshake TCP/TLS. Toda
+requisição tem timeout de conexão e de leitura, é repetida com espera
+exponencial em falhas de conexão e nas respostas 429/5xx (respeitando o
+cabeçalho Retry-After) e passa por um semáforo que limita as requisições
+simultâneas a cada host. Respostas gzip/deflate são descomprimidas de forma
+transparente, inclusive quando lidas como fluxo.
+
+Limitação: 'requests'/urllib3 só falam HTTP/1.1, então não há HTTP/2 nem
+multiplexação de requisições em uma mesma conexão. Paralelismo para um host
+vem do pool (até 'conexoes_por_host' conexões abertas). Para os downloads
+daqui (poucos arquivos grandes, lidos em sequência ou em fluxo) o ganho do
+HTTP/2 seria pequeno; trocar por httpx(http2=True) mudaria a interface de
+fluxo ('resposta.raw', 'iter_content') usada pelos leitores de CSV.
+
+Uso:
+    from comum.rede import cliente_http
+    resposta = cliente_http.get(url)
+    with cliente_http.abrir(url) as resposta:   # fluxo, sem carregar tudo na memória
+        df = pd.read_csv(resposta.raw, sep=";")
+    tamanho = cliente_http.baixar(url, "downloads/arquivo.pdf")
+"""
+
+import os
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterator, Tuple, Union
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from comum.instrumentacao import span_atual
+
+Timeout = Union[float, Tuple[float, float]]
+
+
+class ClienteHTTP:
+    """
+    Args:
+        timeout (float | tuple): Timeout padrão em segundos, ou (conexão, leitura).
+        tentativas (int): Número máximo de novas tentativas por requisição.
+        espera_base (float): Fator da espera exponencial entre as tentativas
+            (espera_base * 2 ** (tentativa - 1) segundos).
+        conexoes_por_host (int): Requisições simultâneas permitidas por host.
+        tamanho_pool (int): Conexões mantidas abertas por host.
+    """
+
+    STATUS_REPETIR = (429, 500, 502, 503, 504)
+
+    def __init__(
+        self,
+        timeout: Timeout = (10, 60),
+        tentativas: int = 4,
+        espera_base: float = 0.5,
+        conexoes_por_host: int = 4,
+        tamanho_pool: int = 16,
+    ):
+        self.timeout = timeout
+        self.conexoes_por_host = conexoes_por_host
+        politica = Retry(
+            total=tentativas,
+            backoff_factor=espera_base,
+            status_forcelist=self.STATUS_REPETIR,
+            allowed_methods=frozenset({"GET", "HEAD"}),
+            respect_retry_after_header=True,
+            raise_on_status=False,
+        )
+        adaptador = HTTPAdapter(pool_connections=tamanho_pool, pool_maxsize=tamanho_pool, max_retries=politica)
+        self.sessao = requests.Session()
+        self.sessao.mount("http://", adaptador)
+        self.sessao.mount("https://", adaptador)
+        self.sessao.headers["Accept-Encoding"] = "gzip, deflate"
+        self._semaforos: Dict[str, threading.BoundedSemaphore] = {}
+        self._trava = threading.Lock()
+
+    def _semaforo(self, url: str) -> threading.BoundedSemaphore:
+        host = urlsplit(url).netloc
+        with self._trava:
+            if host not in self._semaforos:
+                self._semaforos[host] = threading.BoundedSemaphore(self.conexoes_por_host)
+            return self._semaforos[host]
+
+    @contextmanager
+    def abrir(self, url: str, **kwargs) -> Iterator[requests.Response]:
+        """
+        Abre a resposta como fluxo. A vaga do host e a conexão só são
+        liberadas ao sair do bloco. Erros HTTP (4xx/5xx) levantam
+        'requests.exceptions.HTTPError'. 'resposta.raw' já entrega o
+        conteúdo descomprimido.
+        """
+        kwargs.setdefault("timeout", self.timeout)
+        with self._semaforo(url):
+            resposta = self.sessao.get(url, stream=True, **kwargs)
+            try:
+                span_atual().incrementar("requisicoes_http")
+                resposta.raise_for_status()
+                resposta.raw.decode_content = True
+                yield resposta
+            finally:
+                resposta.close()
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        """
+        GET com o conteúdo já lido. Não levanta erro para status HTTP;
+        use 'resposta.raise_for_status()' quando necessário.
+        """
+        kwargs.setdefault("timeout", self.timeout)
+        with self._semaforo(url):
+            resposta = self.sessao.get(url, **kwargs)
+            span_atual().incrementar("requisicoes_http")
+            return resposta
+
+    def baixar(self, url: str, destino: str, tamanho_bloco: int = 1 << 16) -> int:
+        """
+        Baixa 'url' para 'destino' em blocos. O arquivo é gravado com outro
+        nome e renomeado no final, então quem observa a pasta nunca vê um
+        download pela metade.
+
+        Returns:
+            int: Quantidade de bytes gravados.
+        """
+        os.makedirs(os.path.dirname(destino) or ".", exist_ok=True)
+        temporario = f"{destino}.parcial"
+        total = 0
+        try:
+            with self.abrir(url) as resposta, open(temporario, "wb") as f:
+                for bloco in resposta.iter_content(tamanho_bloco):
+                    f.write(bloco)
+                    total += len(bloco)
+            os.replace(temporario, destino)
+        finally:
+            if os.path.exists(temporario):
+                os.remove(temporario)
+        span_atual().incrementar("bytes_baixados", total)
+        return total
+
+
+# Cliente compartilhado por todas as ferramentas do processo
+cliente_http = ClienteHTTP()
@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+"""
+Reordenação dos trechos recuperados com um cross-encoder local (CPU).
+
+A busca vetorial é barata, então os motores recuperam mais candidatos do que
+o necessário ('similarity_top_k' maior). O cross-encoder pontua cada par
+(pergunta, trecho) em lotes e só os trechos acima do corte seguem para a
+síntese, até 'top_k_max'. Perguntas com poucos trechos relevantes geram
+prompts menores; perguntas amplas aproveitam mais contexto.
+
+Uso:
+    reordenador = ReordenadorCruzado()
+    motor = indice.as_query_engine(similarity_top_k=10, node_postprocessors=[reordenador])
+
+Requer o pacote 'sentence-transformers'.
+"""
+
+import inspect
+import math
+import os
+from typing import Dict, List, Optional
+
+from llama_index.core.postprocessor.types import BaseNodePostprocessor
+from llama_index.core.schema import MetadataMode, NodeWithScore, QueryBundle
+from pydantic import Field
+
+from comum.instrumentacao import rastreador
+
+# Multilíngue (treinado no mMARCO, que inclui português): os documentos e as perguntas são em português
+MODELO_REORDENACAO = os.getenv("MODELO_REORDENACAO", "cross-encoder/mmarco-mMiniLMv2-L12-H384-v1")
+
+# Corte absoluto padrão por modelo. O mMARCO multilíngue dá pontuações mais
+# baixas e menos espalhadas que o ms-marco em inglês, então o corte é menor e
+# o relativo ('fracao_do_melhor') faz a maior parte da seleção.
+CORTES_POR_MODELO = {
+    "cross-encoder/mmarco-mMiniLMv2-L12-H384-v1": 0.1,
+    "cross-encoder/ms-marco-MiniLM-L-6-v2": 0.3,
+}
+CORTE_PADRAO = 0.1
+
+# Modelos já carregados, compartilhados entre os motores de consulta
+_modelos: Dict[str, object] = {}
+
+
+def _carregar_modelo(nome: str):
+    if nome not in _modelos:
+        try:
+            from sentence_transformers import CrossEncoder
+        except ImportError as e:
+            raise ImportError(
+                "A reordenação requer o pacote 'sentence-transformers' (pip install sentence-transformers)."
+            ) from e
+        _modelos[nome] = CrossEncoder(nome, device="cpu")
+    return _modelos[nome]
+
+
+def _logits(modelo, pares, tamanho_lote: int):
+    """
+    Pontuações brutas do cross-encoder. O 'predict' aplica a ativação padrão
+    do modelo, que varia (Sigmoid no mMARCO, identidade nos ms-marco mais
+    novos); com a identidade explícita, '_sigmoide' é aplicada uma vez só.
+    """
+    import torch
+
+    # 'activation_fn' a partir do sentence-transformers 4; 'activation_fct' antes dele
+    parametros = inspect.signature(modelo.predict).parameters
+    ativacao = "activation_fn" if "activation_fn" in parametros else "activation_fct"
+    return modelo.predict(
+        pares, batch_size=tamanho_lote, show_progress_bar=False, **{ativacao: torch.nn.Identity()}
+    )
+
+
+def _sigmoide(x: float) -> float:
+    return 1.0 / (1.0 + math.exp(-x))
+
+
+class ReordenadorCruzado(BaseNodePostprocessor):
+    """
+    Pós-processador que reordena os nós com um cross-encoder e escolhe
+    quantos manter pelo corte de pontuação.
+
+    Args:
+        modelo (str): Nome do cross-encoder (Hugging Face).
+        tamanho_lote (int): Pares (pergunta, trecho) por lote de inferência.
+        pontuacao_minima (float): Corte absoluto, entre 0 e 1. Padrão: o de
+            CORTES_POR_MODELO para o modelo escolhido.
+        fracao_do_melhor (float): Corte relativo: descarta trechos com
+            pontuação abaixo desta fração da melhor.
+        top_k_min (int): Trechos mantidos mesmo abaixo do corte.
+        top_k_max (int): Limite de trechos enviados à síntese.
+    """
+
+    modelo: str = Field(default=MODELO_REORDENACAO)
+    tamanho_lote: int = Field(default=16)
+    pontuacao_minima: Optional[float] = Field(default=None)
+    fracao_do_melhor: float = Field(default=0.5)
+    top_k_min: int = Field(default=1)
+    top_k_max: int = Field(default=5)
+
+    @classmethod
+    def class_name(cls) -> str:
+        return "ReordenadorCruzado"
+
+    def _postprocess_nodes(
+        self,
+        nodes: List[NodeWithScore],
+        query_bundle: Optional[QueryBundle] = None,
+    ) -> List[NodeWithScore]:
+        if query_bundle is None or not nodes:
+            return nodes
+
+        with rastreador.span("reordenacao", candidatos=len(nodes)) as span:
+            pares = [(query_bundle.query_str, no.node.get_content(metadata_mode=MetadataMode.EMBED)) for no in nodes]
+            logits = _logits(_carregar_modelo(self.modelo), pares, self.tamanho_lote)
+            pontuados = sorted(
+                (NodeWithScore(node=no.node, score=_sigmoide(float(logit))) for no, logit in zip(nodes, logits)),
+                key=lambda no: no.score,
+                reverse=True,
+            )
+
+            minima = self.pontuacao_minima
+            if minima is None:
+                minima = CORTES_POR_MODELO.get(self.modelo, CORTE_PADRAO)
+            corte = max(minima, pontuados[0].score * self.fracao_do_melhor)
+            mantidos = [no for no in pontuados[: self.top_k_max] if no.score >= corte]
+            if len(mantidos) < self.top_k_min:
+                mantidos = pontuados[: self.top_k_min]
+
+            span.registrar(mantidos=len(mantidos), corte=round(corte, 3), melhor=round(pontuados[0].score, 3))
+            print(f"[REORDENAÇÃO] {len(mantidos)} de {len(nodes)} trecho(s) acima do corte {corte:.2f}.")
+            return mantidos
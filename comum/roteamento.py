@@ -0,0 +1,268 @@
+# -*- coding: utf-8 -*-
+"""
+Roteamento de modelos por etapa do agente.
+
+Etapas baratas (escolha de ferramenta, verificação, pesquisa) vão para um
+modelo pequeno e rápido; a síntese final e o gerente da crew
+hierárquica vão para um modelo grande. A política é configurável e cada rota
+acumula estatísticas de latência, tokens e custo estimado. As chamadas são
+atribuídas à rota pela instância do LLM que as fez, então duas rotas com o
+mesmo modelo continuam separadas.
+
+O ReActAgent usa um único LLM para o laço inteiro, e a resposta final sai da
+mesma chamada que decide não usar mais ferramentas. Os agentes ReAct rodam
+então com 'llm("selecao_ferramenta")' e a resposta que chega ao usuário é
+reescrita pela rota 'sintese' a partir da pergunta, dos resultados das
+ferramentas e do rascunho do agente ('mensagens_sintese'; no streaming,
+'eventos_agente(..., sintese=...)' em comum/streaming.py).
+"""
+
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+from llama_index.core.instrumentation import get_dispatcher
+from llama_index.core.llms import ChatMessage, MessageRole
+from llama_index.core.instrumentation.event_handlers import BaseEventHandler
+from llama_index.core.instrumentation.span_handlers import BaseSpanHandler
+from llama_index.core.instrumentation.events.llm import (
+    LLMChatEndEvent,
+    LLMChatStartEvent,
+    LLMCompletionEndEvent,
+    LLMCompletionStartEvent,
+)
+from pydantic import PrivateAttr
+
+NIVEL_RAPIDO = "rapido"
+NIVEL_FORTE = "forte"
+
+MODELO_RAPIDO = os.getenv("MODELO_RAPIDO", "llama-3.1-8b-instant")
+MODELO_FORTE = os.getenv("MODELO_FORTE", "llama-3.3-70b-versatile")
+
+# Etapa do agente -> nível do modelo
+POLITICA_PADRAO = {
+    "selecao_ferramenta": NIVEL_RAPIDO,
+    "verificacao": NIVEL_RAPIDO,
+    "pesquisa": NIVEL_RAPIDO,
+    "sintese": NIVEL_FORTE,
+    "gerente": NIVEL_FORTE,
+}
+
+# Preço em US$ por milhão de tokens (entrada, saída), conforme tabela da Groq
+PRECOS_PADRAO = {
+    NIVEL_RAPIDO: (0.05, 0.08),
+    NIVEL_FORTE: (0.59, 0.79),
+}
+
+
+PROMPT_SINTESE = (
+    "Responda à pergunta do usuário usando os resultados das ferramentas abaixo. O rascunho foi "
+    "escrito por um modelo menor: corrija-o se ele contradisser os resultados e diga o que falta "
+    "se os resultados não bastarem.\n\n"
+    "Pergunta: {pergunta}\n\nResultados das ferramentas:\n{resultados}\n\nRascunho:\n{rascunho}"
+)
+
+
+def mensagens_sintese(pergunta: str, resultados: List[Tuple[str, str]], rascunho: str) -> List[ChatMessage]:
+    """
+    Monta o pedido da resposta final para a rota 'sintese' a partir dos
+    resultados [(ferramenta, saída)] que o agente obteve.
+    """
+    texto_resultados = "\n\n".join(f"[{nome}]\n{saida}" for nome, saida in resultados) or "(nenhuma ferramenta usada)"
+    return [
+        ChatMessage(
+            role=MessageRole.USER,
+            content=PROMPT_SINTESE.format(pergunta=pergunta, resultados=texto_resultados, rascunho=rascunho),
+        )
+    ]
+
+
+@dataclass
+class EstatisticasRota:
+    chamadas: int = 0
+    segundos: float = 0.0
+    tokens_entrada: int = 0
+    tokens_saida: int = 0
+    custo: float = 0.0
+
+    @property
+    def latencia_media(self) -> float:
+        return self.segundos / self.chamadas if self.chamadas else 0.0
+
+
+class RoteadorModelos:
+    """
+    Seleciona o LLM de cada etapa segundo uma política configurável.
+
+    Args:
+        modelos (dict): Nível -> instância de LLM do LlamaIndex.
+        politica (dict): Etapa -> nível. Etapas desconhecidas usam 'nivel_padrao'.
+        precos (dict): Nível -> (US$ por milhão de tokens de entrada, de saída).
+        modelos_crewai (dict): Nível -> nome do modelo no formato do CrewAI
+            (ex.: 'groq/llama-3.1-8b-instant').
+        nivel_padrao (str): Nível usado para etapas fora da política.
+    """
+
+    def __init__(
+        self,
+        modelos: Dict[str, Any],
+        politica: Optional[Dict[str, str]] = None,
+        precos: Optional[Dict[str, Tuple[float, float]]] = None,
+        modelos_crewai: Optional[Dict[str, str]] = None,
+        nivel_padrao: str = NIVEL_RAPIDO,
+    ):
+        self.modelos = modelos
+        self.politica = dict(POLITICA_PADRAO if politica is None else politica)
+        self.precos = dict(PRECOS_PADRAO if precos is None else precos)
+        self.modelos_crewai = modelos_crewai or {}
+        self.nivel_padrao = nivel_padrao
+        self.estatisticas: Dict[str, EstatisticasRota] = {nivel: EstatisticasRota() for nivel in modelos}
+        # Span do LlamaIndex aberto por um dos LLMs -> nível (preenchido por _SpansRotas)
+        self._nivel_por_span: Dict[str, str] = {}
+        self._llms_crewai: Dict[str, Any] = {}
+        self._trava = threading.Lock()
+
+    def nivel(self, etapa: str) -> str:
+        return self.politica.get(etapa, self.nivel_padrao)
+
+    def llm(self, etapa: str):
+        """
+        Retorna o LLM do LlamaIndex configurado para a etapa.
+        """
+        return self.modelos[self.nivel(etapa)]
+
+    def llm_crewai(self, etapa: str):
+        """
+        Retorna (e guarda em cache) o LLM do CrewAI configurado para a etapa.
+        O CrewAI é importado apenas quando esta função é usada.
+        """
+        nivel = self.nivel(etapa)
+        if nivel not in self._llms_crewai:
+            from crewai import LLM
+
+            self._llms_crewai[nivel] = LLM(model=self.modelos_crewai[nivel])
+        return self._llms_crewai[nivel]
+
+    # --------------------------------------------------------------------------
+    # Estatísticas por rota
+    # --------------------------------------------------------------------------
+    def nivel_da_instancia(self, llm: Any) -> Optional[str]:
+        """Nível cujo LLM é exatamente esta instância (ou None)."""
+        for nivel, modelo in self.modelos.items():
+            if modelo is llm:
+                return nivel
+        return None
+
+    def nivel_do_span(self, span_id: Optional[str]) -> Optional[str]:
+        return self._nivel_por_span.get(span_id) if span_id else None
+
+    def registrar(self, nivel: Optional[str], segundos: float, tokens_entrada: int, tokens_saida: int) -> None:
+        if nivel not in self.estatisticas:
+            return
+        preco_entrada, preco_saida = self.precos.get(nivel, (0.0, 0.0))
+        with self._trava:
+            estatistica = self.estatisticas[nivel]
+            estatistica.chamadas += 1
+            estatistica.segundos += segundos
+            estatistica.tokens_entrada += tokens_entrada
+            estatistica.tokens_saida += tokens_saida
+            estatistica.custo += (tokens_entrada * preco_entrada + tokens_saida * preco_saida) / 1_000_000
+
+    def instrumentar(self) -> "RoteadorModelos":
+        """
+        Registra no sistema de instrumentação do LlamaIndex um observador de
+        spans (que identifica a rota pela instância do LLM) e um coletor que
+        mede cada chamada. Retorna o próprio roteador.
+        """
+        dispatcher = get_dispatcher()
+        dispatcher.add_span_handler(_SpansRotas(roteador=self))
+        dispatcher.add_event_handler(_ColetorRotas(roteador=self))
+        return self
+
+    def relatorio(self) -> str:
+        linhas = ["Rota     | Modelo                    | Chamadas | Lat. média | Tokens (in/out) | Custo (US$)"]
+        for nivel, estatistica in self.estatisticas.items():
+            modelo = getattr(self.modelos[nivel], "model", "?")
+            linhas.append(
+                f"{nivel:<8} | {modelo:<25} | {estatistica.chamadas:>8} | {estatistica.latencia_media:>9.2f}s | "
+                f"{estatistica.tokens_entrada:>7}/{estatistica.tokens_saida:<7} | {estatistica.custo:>10.5f}"
+            )
+        return "\n".join(linhas)
+
+
+def _uso_de_tokens(resposta) -> Tuple[int, int]:
+    """
+    Extrai (tokens de entrada, tokens de saída) da resposta bruta do provedor.
+    """
+    bruto = getattr(resposta, "raw", None)
+    uso = bruto.get("usage") if isinstance(bruto, dict) else getattr(bruto, "usage", None)
+    if uso is None:
+        return 0, 0
+    if isinstance(uso, dict):
+        return uso.get("prompt_tokens", 0) or 0, uso.get("completion_tokens", 0) or 0
+    return getattr(uso, "prompt_tokens", 0) or 0, getattr(uso, "completion_tokens", 0) or 0
+
+
+class _SpansRotas(BaseSpanHandler[Any]):
+    """
+    Anota a rota dos spans abertos pelos LLMs do roteador. Os eventos de
+    início de chamada carregam o id do span, mas só o span conhece a instância.
+    """
+
+    roteador: Any = None
+
+    @classmethod
+    def class_name(cls) -> str:
+        return "SpansRotas"
+
+    def new_span(
+        self,
+        id_: str,
+        bound_args,
+        instance: Optional[Any] = None,
+        parent_span_id: Optional[str] = None,
+        tags: Optional[Dict[str, Any]] = None,
+        **kwargs,
+    ) -> None:
+        nivel = self.roteador.nivel_da_instancia(instance)
+        if nivel is not None:
+            self.roteador._nivel_por_span[id_] = nivel
+        return None
+
+    def prepare_to_exit_span(self, id_: str, bound_args, instance: Optional[Any] = None, result: Any = None, **kwargs) -> None:
+        self.roteador._nivel_por_span.pop(id_, None)
+        return None
+
+    def prepare_to_drop_span(self, id_: str, bound_args, instance: Optional[Any] = None, err: Any = None, **kwargs) -> None:
+        self.roteador._nivel_por_span.pop(id_, None)
+        return None
+
+
+class _ColetorRotas(BaseEventHandler):
+    """
+    Mede a duração e o uso de tokens de cada chamada de LLM e repassa ao
+    roteador. A rota é lida no início da chamada: em streaming, o evento de
+    fim chega depois de o span já ter sido fechado.
+    """
+
+    roteador: Any = None
+    _inicios: Dict[str, Tuple[str, float]] = PrivateAttr(default_factory=dict)
+
+    @classmethod
+    def class_name(cls) -> str:
+        return "ColetorRotas"
+
+    def handle(self, event, **kwargs) -> None:
+        if isinstance(event, (LLMChatStartEvent, LLMCompletionStartEvent)):
+            nivel = self.roteador.nivel_do_span(event.span_id)
+            if nivel is not None:
+                self._inicios[event.span_id] = (nivel, time.perf_counter())
+        elif isinstance(event, (LLMChatEndEvent, LLMCompletionEndEvent)):
+            inicio = self._inicios.pop(event.span_id, None)
+            if inicio is None:
+                return
+            nivel, instante = inicio
+            tokens_entrada, tokens_saida = _uso_de_tokens(event.response)
+            self.roteador.registrar(nivel, time.perf_counter() - instante, tokens_entrada, tokens_saida)
@@ -0,0 +1,176 @@
+# -*- coding: utf-8 -*-
+"""
+Persistência da sessão entre os scripts: histórico dos agentes, artefatos das
+ferramentas e conjuntos de dados carregados.
+
+Cada sessão é uma pasta em 'sessoes/<nome>/':
+    historico.msgpack   mensagens de cada memória de chat (cada script grava
+                        só as suas; as dos demais são preservadas)
+    artefatos.msgpack   índice dos artefatos (handle, tipo, descrição) e os
+                        valores pequenos (listas, textos)
+    dados/<handle>.arrow   DataFrames em Arrow IPC, sem compressão
+
+Os DataFrames são abertos por memory-map e convertidos para o pandas sem
+cópia das colunas numéricas, então restaurar uma sessão não relê o CSV nem
+repete chamadas de ferramentas. Como os handles não mudam de conteúdo, cada
+DataFrame é gravado uma única vez.
+
+Uso:
+    sessao = SessaoPersistente("aula")
+    sessao.restaurar(armazem, {"agente": memoria})
+    ...
+    sessao.salvar(armazem, {"agente": memoria})
+"""
+
+import os
+import time
+from typing import Any, Dict, Optional
+
+import msgpack
+from llama_index.core.llms import ChatMessage
+from llama_index.core.memory import ChatMemoryBuffer
+
+from comum.artefatos import ArmazemArtefatos
+from comum.instrumentacao import rastreador
+
+DIR_SESSOES = "sessoes"
+
+
+def _gravar_msgpack(caminho: str, valor: Any) -> None:
+    temporario = f"{caminho}.tmp"
+    with open(temporario, "wb") as f:
+        f.write(msgpack.packb(valor, use_bin_type=True))
+    os.replace(temporario, caminho)
+
+
+def _ler_msgpack(caminho: str) -> Any:
+    with open(caminho, "rb") as f:
+        return msgpack.unpackb(f.read(), raw=False)
+
+
+class SessaoPersistente:
+    """
+    Args:
+        nome (str): Nome da sessão (subpasta de 'diretorio').
+        diretorio (str): Pasta onde as sessões são guardadas.
+    """
+
+    def __init__(self, nome: str = "padrao", diretorio: str = DIR_SESSOES):
+        self.nome = nome
+        self.pasta = os.path.join(diretorio, nome)
+        self.pasta_dados = os.path.join(self.pasta, "dados")
+
+    def existe(self) -> bool:
+        return os.path.exists(os.path.join(self.pasta, "artefatos.msgpack"))
+
+    # --------------------------------------------------------------------------
+    # Gravação
+    # --------------------------------------------------------------------------
+    def _gravar_dataframe(self, handle: str, df) -> str:
+        import pyarrow as pa
+
+        arquivo = f"{handle}.arrow"
+        caminho = os.path.join(self.pasta_dados, arquivo)
+        if not os.path.exists(caminho):
+            tabela = pa.Table.from_pandas(df, preserve_index=False)
+            temporario = f"{caminho}.tmp"
+            with pa.OSFile(temporario, "wb") as f, pa.ipc.new_file(f, tabela.schema) as escritor:
+                escritor.write_table(tabela)
+            os.replace(temporario, caminho)
+        return arquivo
+
+    def salvar(
+        self,
+        armazem: Optional[ArmazemArtefatos] = None,
+        memorias: Optional[Dict[str, ChatMemoryBuffer]] = None,
+    ) -> None:
+        """
+        Grava o estado atual da sessão. Artefatos que não podem ser
+        serializados são ignorados com um aviso.
+        """
+        with rastreador.span("sessao.salvar", sessao=self.nome) as span:
+            inicio = time.perf_counter()
+            os.makedirs(self.pasta_dados, exist_ok=True)
+
+            if armazem is not None:
+                indice = []
+                arquivos_em_uso = set()
+                for handle, tipo, valor, descricao in armazem.itens():
+                    item = {"handle": handle, "tipo": tipo, "descricao": descricao}
+                    if hasattr(valor, "to_numpy") and hasattr(valor, "columns"):
+                        item["arquivo"] = self._gravar_dataframe(handle, valor)
+                        arquivos_em_uso.add(item["arquivo"])
+                    else:
+                        try:
+                            msgpack.packb(valor, use_bin_type=True)
+                        except TypeError:
+                            print(f"[SESSÃO] Artefato {handle} ({tipo}) não serializável; ignorado.")
+                            continue
+                        item["valor"] = valor
+                    indice.append(item)
+                _gravar_msgpack(os.path.join(self.pasta, "artefatos.msgpack"), indice)
+                # DataFrames de handles removidos (ex.: limpar_dados_comex)
+                for arquivo in os.listdir(self.pasta_dados):
+                    if arquivo.endswith(".arrow") and arquivo not in arquivos_em_uso:
+                        try:
+                            os.remove(os.path.join(self.pasta_dados, arquivo))
+                        except OSError:
+                            pass
+                span.registrar(artefatos=len(indice))
+
+            if memorias:
+                # Mantém o histórico das memórias de outros scripts (ex.: passo_1 e passo_3)
+                caminho_historico = os.path.join(self.pasta, "historico.msgpack")
+                historico = _ler_msgpack(caminho_historico) if os.path.exists(caminho_historico) else {}
+                historico.update({
+                    nome: [m.model_dump(mode="json") for m in memoria.get_all()]
+                    for nome, memoria in memorias.items()
+                })
+                _gravar_msgpack(caminho_historico, historico)
+                span.registrar(mensagens=sum(len(m) for m in historico.values()))
+
+            print(f"[SESSÃO] Sessão '{self.nome}' salva em {(time.perf_counter() - inicio) * 1000:.1f} ms.")
+
+    # --------------------------------------------------------------------------
+    # Restauração
+    # --------------------------------------------------------------------------
+    def _ler_dataframe(self, arquivo: str):
+        import pyarrow as pa
+
+        fonte = pa.memory_map(os.path.join(self.pasta_dados, arquivo), "r")
+        return pa.ipc.open_file(fonte).read_all().to_pandas(split_blocks=True)
+
+    def restaurar(
+        self,
+        armazem: Optional[ArmazemArtefatos] = None,
+        memorias: Optional[Dict[str, ChatMemoryBuffer]] = None,
+    ) -> bool:
+        """
+        Carrega a sessão gravada no armazém e nas memórias informadas.
+
+        Returns:
+            bool: False se a sessão ainda não existe.
+        """
+        if not self.existe():
+            return False
+        with rastreador.span("sessao.restaurar", sessao=self.nome) as span:
+            inicio = time.perf_counter()
+            if armazem is not None:
+                indice = _ler_msgpack(os.path.join(self.pasta, "artefatos.msgpack"))
+                for item in indice:
+                    if "arquivo" in item:
+                        valor = self._ler_dataframe(item["arquivo"])
+                    else:
+                        valor = item["valor"]
+                    armazem.registrar(item["handle"], valor, item["tipo"], item["descricao"])
+                span.registrar(artefatos=len(indice))
+
+            caminho_historico = os.path.join(self.pasta, "historico.msgpack")
+            if memorias and os.path.exists(caminho_historico):
+                historico = _ler_msgpack(caminho_historico)
+                for nome, memoria in memorias.items():
+                    if nome in historico:
+                        memoria.set([ChatMessage.model_validate(m) for m in historico[nome]])
+
+            print(f"[SESSÃO] Sessão '{self.nome}' restaurada em {(time.perf_counter() - inicio) * 1000:.1f} ms.")
+            return True
@@ -0,0 +1,141 @@
+# -*- coding: utf-8 -*-
+"""
+Respostas em streaming para agentes e motores de consulta.
+
+Em vez de esperar a resposta completa, os tokens do LLM são exibidos à
+medida que chegam, junto com eventos de progresso das chamadas de
+ferramentas. A latência percebida passa a ser o tempo até o primeiro token.
+"""
+
+import time
+from typing import Any, AsyncIterator, Optional, Tuple
+
+from llama_index.core.agent.workflow import AgentStream, ToolCall, ToolCallResult
+from llama_index.core.llms import ChatMessage, MessageRole
+
+from comum.instrumentacao import rastreador
+from comum.roteamento import mensagens_sintese
+
+
+async def eventos_agente(agent, mensagem: str, sintese=None, **kwargs) -> AsyncIterator[Tuple[str, Any]]:
+    """
+    Executa um agente de workflow (ex.: ReActAgent) e produz seus eventos:
+
+    - ("token", delta): trecho de texto gerado pelo LLM;
+    - ("ferramenta_inicio", ToolCall): uma ferramenta vai ser chamada;
+    - ("ferramenta_fim", ToolCallResult): uma ferramenta terminou;
+    - ("resposta", resposta): resposta final do agente (último evento).
+
+    Com 'sintese' (um LLM, normalmente roteador.llm("sintese")), o texto do
+    agente vira só um rascunho: os tokens emitidos e a resposta final (um
+    texto) vêm da síntese feita por esse LLM a partir dos resultados das
+    ferramentas. Argumentos extras (ex.: memory=...) são repassados para
+    'agent.run'.
+    """
+    handler = agent.run(mensagem, **kwargs)
+    resultados = []
+    async for evento in handler.stream_events():
+        if isinstance(evento, AgentStream):
+            if evento.delta and sintese is None:
+                yield "token", evento.delta
+        elif isinstance(evento, ToolCallResult):
+            resultados.append((evento.tool_name, str(evento.tool_output)))
+            yield "ferramenta_fim", evento
+        elif isinstance(evento, ToolCall):
+            yield "ferramenta_inicio", evento
+    resposta = await handler
+    if sintese is None:
+        yield "resposta", resposta
+        return
+
+    partes = []
+    with rastreador.span("sintese", ferramentas=len(resultados)):
+        async for parcial in await sintese.astream_chat(mensagens_sintese(mensagem, resultados, str(resposta))):
+            if parcial.delta:
+                partes.append(parcial.delta)
+                yield "token", parcial.delta
+    texto = "".join(partes)
+    memoria = kwargs.get("memory")
+    if memoria is not None:
+        # O histórico fica com a resposta que o usuário recebeu, não com o rascunho
+        mensagens = memoria.get_all()
+        if mensagens and mensagens[-1].role == MessageRole.ASSISTANT:
+            mensagens[-1] = ChatMessage(role=MessageRole.ASSISTANT, content=texto)
+            memoria.set(mensagens)
+    yield "resposta", texto
+
+
+def _imprimir_tempos(inicio: float, primeiro_token: Optional[float]) -> None:
+    total = time.perf_counter() - inicio
+    if primeiro_token is None:
+        print(f"\n[STREAM] Nenhum token recebido. Tempo total: {total:.2f}s")
+    else:
+        print(f"\n[STREAM] Primeiro token em {primeiro_token - inicio:.2f}s. Tempo total: {total:.2f}s")
+
+
+async def transmitir_resposta(agent, mensagem: str, prefixo: str = "Resposta do Agente: ", **kwargs):
+    """
+    Executa um agente de workflow imprimindo os tokens conforme chegam e o
+    progresso das ferramentas. Retorna a resposta final do agente (com
+    'sintese=llm', a resposta reescrita por esse LLM; veja 'eventos_agente').
+    """
+    inicio = time.perf_counter()
+    primeiro_token = None
+    resposta = None
+    print(prefixo, end="", flush=True)
+    with rastreador.span("agente", mensagem=mensagem[:200]) as span:
+        async for tipo, valor in eventos_agente(agent, mensagem, **kwargs):
+            if tipo == "token":
+                if primeiro_token is None:
+                    primeiro_token = time.perf_counter()
+                print(valor, end="", flush=True)
+            elif tipo == "ferramenta_inicio":
+                span.incrementar("chamadas_ferramentas")
+                print(f"\n[FERRAMENTA] Chamando {valor.tool_name} com {valor.tool_kwargs}", flush=True)
+            elif tipo == "ferramenta_fim":
+                print(f"[FERRAMENTA] {valor.tool_name} concluída.", flush=True)
+            elif tipo == "resposta":
+                resposta = valor
+        if primeiro_token is not None:
+            span.registrar(primeiro_token_ms=round((primeiro_token - inicio) * 1000, 1))
+    _imprimir_tempos(inicio, primeiro_token)
+    return resposta
+
+
+def transmitir_chat(agent, mensagem: str, prefixo: str = "Resposta do Agente: "):
+    """
+    Versão para agentes do tipo AgentRunner: usa 'stream_chat' e imprime os
+    tokens conforme chegam. As chamadas de ferramentas são exibidas pelo
+    próprio agente quando 'verbose=True'. Retorna a resposta completa.
+    """
+    inicio = time.perf_counter()
+    primeiro_token = None
+    with rastreador.span("agente", mensagem=mensagem[:200]):
+        resposta = agent.stream_chat(mensagem)
+        print(prefixo, end="", flush=True)
+        for token in resposta.response_gen:
+            if primeiro_token is None:
+                primeiro_token = time.perf_counter()
+            print(token, end="", flush=True)
+    _imprimir_tempos(inicio, primeiro_token)
+    return resposta
+
+
+def transmitir_consulta(query_engine, pergunta: str, prefixo: str = "Resposta: "):
+    """
+    Consulta um motor criado com 'as_query_engine(streaming=True)' e imprime
+    a síntese conforme é gerada. Retorna o texto completo da resposta.
+    """
+    inicio = time.perf_counter()
+    primeiro_token = None
+    tokens = []
+    with rastreador.span("consulta", pergunta=pergunta[:200]):
+        resposta = query_engine.query(pergunta)
+        print(prefixo, end="", flush=True)
+        for token in resposta.response_gen:
+            if primeiro_token is None:
+                primeiro_token = time.perf_counter()
+            tokens.append(token)
+            print(token, end="", flush=True)
+    _imprimir_tempos(inicio, primeiro_token)
+    return "".join(tokens)
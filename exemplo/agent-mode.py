@@ -26,15 +26,15 @@ Instructions for local execution:
 # ==============================================================================
 # 1. INSTALL DEPENDENCIES
 # ==============================================================================
-# !pip install python-dotenv llama-index llama_index.embeddings.huggingface llama-index-readers-file llama-index-llms-groq arxiv llama-index-tools-tavily-research crewai crewai-tools requests
+# !pip install python-dotenv llama-index llama_index.embeddings.huggingface llama-index-readers-file llama-index-llms-groq arxiv llama-index-tools-tavily-research crewai crewai-tools requests sentence-transformers
 
 # ==============================================================================
 # 2. IMPORTS
 # ==============================================================================
 import os
+import sys
 import requests
 import arxiv
-import gc  # <-- MUDANÇA: Importado o garbage collector para limpeza de memória
 from dotenv import load_dotenv
 
 # LlamaIndex Imports
@@ -60,15 +60,20 @@ from crewai import Agent, Task, Crew, Process
 from crewai.llms import LLM as CrewAI_LLM # Renamed to avoid conflict with LlamaIndex's llm variable
 from crewai_tools import LlamaIndexTool
 
+# Shared components (the 'comum' package lives at the repository root)
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from comum.contexto import GerenciadorContexto
+from comum.memoria import GovernadorMemoria
+from comum.rede import cliente_http
+from comum.reordenacao import ReordenadorCruzado
+from comum.roteamento import MODELO_FORTE, MODELO_RAPIDO, RoteadorModelos, mensagens_sintese
+
 # ==============================================================================
 # 3. API KEY AND SETTINGS CONFIGURATION
 # ==============================================================================
 # Load environment variables from a .env file
 load_dotenv()
 
-# <-- MUDANÇA: Configurações de otimização de memória
-# Configura o garbage collector para ser mais agressivo
-gc.set_threshold(700, 10, 10)  # Valores mais baixos para coleta mais frequente
 
 groq_key = os.getenv('GROQ_API_KEY')
 tavily_key = os.getenv('TAVILY_API_KEY')
@@ -80,12 +85,20 @@ if not all([groq_key, tavily_key, nvidia_key]):
 
 
 # --- LlamaIndex LLM and Embedding Model Configuration ---
+# Model routing: the small model handles tool selection in the agents and the
+# large one synthesizes answers in the query engines (Settings.llm) and
+# rewrites the final answer of the ReAct agent.
+# Override the model names with the MODELO_RAPIDO / MODELO_FORTE variables.
+roteador = RoteadorModelos(
+    {"rapido": Groq(model=MODELO_RAPIDO, api_key=groq_key), "forte": Groq(model=MODELO_FORTE, api_key=groq_key)}
+).instrumentar()
+
 # LLM for LlamaIndex Agents
-llm_groq = Groq(model="llama-3.1-70b-versatile", api_key=groq_key)
+llm_groq = roteador.llm("selecao_ferramenta")
 
 
 # Global settings for LlamaIndex
-Settings.llm = llm_groq
+Settings.llm = roteador.llm("sintese")
 # <-- MUDANÇA PRINCIPAL: Troca do embedding local por um via API
 # O modelo 'nv-embed-qa-e4' é otimizado para tarefas de busca e resposta.
 Settings.embed_model = NVIDIAEmbedding(
@@ -105,16 +118,26 @@ llm_crewai = CrewAI_LLM(
 )
 
 
+# --- Context budget ---
+# Caps large tool outputs and compacts agent chat history between turns
+gerenciador_contexto = GerenciadorContexto(limite_resultado=800, limite_historico=6000)
+
+# --- Reranking ---
+# Query engines over-retrieve and a local CPU cross-encoder keeps only the
+# chunks above the score cutoff for synthesis
+reordenador = ReordenadorCruzado(top_k_max=5)
+
+
 # ==============================================================================
 # 4. UTILITY FUNCTIONS
 # ==============================================================================
+# --- Memory governor ---
+# Replaces the manual gc.collect() calls between lessons: tunes the garbage
+# collector and tracks RSS. Nothing is registered for eviction here: indexes
+# and agents stay referenced by their query engines and tools, so dropping
+# them would not free memory (eviction is used by the comex project)
+governador = GovernadorMemoria().configurar_gc().iniciar()
 
-def limpar_memoria():
-    """
-    Função utilitária para forçar a limpeza de memória.
-    """
-    gc.collect()
-    
 # ==============================================================================
 # 5. FUNCTION DEFINITIONS
 # ==============================================================================
@@ -159,14 +182,12 @@ def baixar_pdf_arxiv(link: str) -> str:
             return "O link fornecido não é um link válido do arXiv."
         artigo_id = link.split("/")[-1]
         pdf_url = f"https://arxiv.org/pdf/{artigo_id}.pdf"
-        response = requests.get(pdf_url, stream=True)
-        if response.status_code == 200:
-            nome_arquivo = f"artigo_{artigo_id}.pdf"
-            with open(nome_arquivo, "wb") as f:
-                f.write(response.content)
-            return f"PDF salvo como {nome_arquivo}"
-        else:
-            return f"Erro ao baixar o PDF. Código de status: {response.status_code}"
+        nome_arquivo = f"artigo_{artigo_id}.pdf"
+        # Pooled keep-alive session with timeouts and retries (comum/rede.py)
+        cliente_http.baixar(pdf_url, nome_arquivo)
+        return f"PDF salvo como {nome_arquivo}"
+    except requests.exceptions.HTTPError as e:
+        return f"Erro ao baixar o PDF. Código de status: {e.response.status_code}"
     except Exception as e:
         return f"Ocorreu um erro: {e}"
 
@@ -194,15 +215,23 @@ if __name__ == '__main__':
     )
 
     # Vídeo 1.4: Consultando artigos
-    ferramenta_consulta_arxiv = FunctionTool.from_defaults(fn=consulta_artigos, name="Consultar_Artigos_Arxiv")
+    ferramenta_consulta_arxiv = FunctionTool.from_defaults(
+        fn=gerenciador_contexto.envolver(consulta_artigos), name="Consultar_Artigos_Arxiv"
+    )
+    ferramenta_recuperar = FunctionTool.from_defaults(
+        fn=gerenciador_contexto.recuperar,
+        name="recuperar_resultado",
+        description="Recupera o conteúdo completo de um resultado truncado a partir do seu handle.",
+    )
 
     agent_worker_aula1 = FunctionCallingAgentWorker.from_tools(
-        tools=[ferramenta_calculo, ferramenta_consulta_arxiv],
+        tools=[ferramenta_calculo, ferramenta_consulta_arxiv, ferramenta_recuperar],
         verbose=True,
         allow_parallel_tool_calls=False, # Set to False for simpler, sequential execution
         llm=llm_groq,
     )
-    agent_aula1 = AgentRunner(agent_worker_aula1)
+    memoria_aula1 = gerenciador_contexto.criar_memoria()
+    agent_aula1 = AgentRunner(agent_worker_aula1, memory=memoria_aula1)
 
     print("\n--- Teste 1.1: Calculando engajamento ---")
     response1 = agent_aula1.chat(
@@ -210,18 +239,18 @@ if __name__ == '__main__':
         "35 comentários, 20 compartilhamentos, e o perfil tem 2000 seguidores?"
     )
     print("Resposta do Agente:", response1)
+    gerenciador_contexto.compactar_memoria(memoria_aula1)
 
     print("\n--- Teste 1.2: Conhecimento geral (sem ferramenta) ---")
     response2 = agent_aula1.chat("Quem é Albert Einstein?")
     print("Resposta do Agente:", response2)
+    gerenciador_contexto.compactar_memoria(memoria_aula1)
 
     print("\n--- Teste 1.3: Consultando artigos no Arxiv ---")
     response3 = agent_aula1.chat("Me retorne artigos sobre o uso da inteligência artificial nas redes sociais")
     print("Resposta do Agente:", response3)
 
-    # <-- MUDANÇA: Limpeza de memória após uso do agente da Aula 1
-    del agent_worker_aula1, agent_aula1
-    limpar_memoria()
+    del agent_worker_aula1, agent_aula1, memoria_aula1
 
 
     # --------------------------------------------------------------------------
@@ -244,9 +273,7 @@ if __name__ == '__main__':
     )
     print("Resposta do Agente:", response4)
 
-    # <-- MUDANÇA: Limpeza de memória após uso do agente Tavily
     del agent_worker_tavily, agent_tavily
-    limpar_memoria()
 
     # Vídeo 2.2 & 2.3: Base de dados vetorial e engines de busca
     print("\n--- Criando e carregando base de dados vetorial ---")
@@ -266,23 +293,23 @@ if __name__ == '__main__':
         artigo_docs = SimpleDirectoryReader(input_files=["data/artigo1.txt"]).load_data()
         livro_docs = SimpleDirectoryReader(input_files=["data/livro1.txt"]).load_data()
 
-        artigo_index = VectorStoreIndex.from_documents(artigo_docs)
-        artigo_index.storage_context.persist(persist_dir="storage/artigo")
-        
-        livro_index = VectorStoreIndex.from_documents(livro_docs)
-        livro_index.storage_context.persist(persist_dir="storage/livro")
+        # Heavy allocation phase: GC paused while nodes and embeddings are built
+        with governador.fase_pesada("indices"):
+            artigo_index = VectorStoreIndex.from_documents(artigo_docs)
+            artigo_index.storage_context.persist(persist_dir="storage/artigo")
+
+            livro_index = VectorStoreIndex.from_documents(livro_docs)
+            livro_index.storage_context.persist(persist_dir="storage/livro")
 
-        # <-- MUDANÇA: Limpeza de memória após indexação
         del artigo_docs, livro_docs, artigo_index, livro_index
-        limpar_memoria()
 
         artigo_storage = StorageContext.from_defaults(persist_dir="storage/artigo")
         loaded_artigo_index = load_index_from_storage(artigo_storage)
         livro_storage = StorageContext.from_defaults(persist_dir="storage/livro")
         loaded_livro_index = load_index_from_storage(livro_storage)
 
-        artigo_engine = loaded_artigo_index.as_query_engine(similarity_top_k=3)
-        livro_engine = loaded_livro_index.as_query_engine(similarity_top_k=3)
+        artigo_engine = loaded_artigo_index.as_query_engine(similarity_top_k=10, node_postprocessors=[reordenador])
+        livro_engine = loaded_livro_index.as_query_engine(similarity_top_k=10, node_postprocessors=[reordenador])
 
         query_engine_tools = [
             QueryEngineTool(query_engine=artigo_engine, metadata=ToolMetadata(name="artigo_engine", description="Fornece informações sobre algoritmos de IA em redes sociais a partir de um artigo específico.")),
@@ -316,20 +343,23 @@ if __name__ == '__main__':
         response6 = agent_documentos.chat("Quais as principais tendências de IA que eu deveria estudar?")
         print("Resposta do Agente:", response6)
 
-        # <-- MUDANÇA: Limpeza de memória após uso dos agentes de documentos
         del agent_worker_docs, agent_documentos
-        limpar_memoria()
 
         # Vídeo 3.2: Usando um agente ReAct
         agent_react = ReActAgent.from_tools(query_engine_tools, llm=llm_groq, verbose=True)
 
         print("\n--- Teste 3.3: Consultando artigo com ReActAgent ---")
-        response7 = agent_react.chat("Quais os principais algoritmos de IA usados nas redes sociais?")
+        pergunta_react = "Quais os principais algoritmos de IA usados nas redes sociais?"
+        rascunho_react = agent_react.chat(pergunta_react)
+        # The ReAct loop runs on the fast model; the final answer is rewritten by the 'sintese' route
+        response7 = roteador.llm("sintese").chat(
+            mensagens_sintese(
+                pergunta_react, [(fonte.tool_name, fonte.content) for fonte in rascunho_react.sources], str(rascunho_react)
+            )
+        ).message.content
         print("Resposta do Agente:", response7)
         
-        # <-- MUDANÇA: Limpeza de memória após uso do agente ReAct
-        del agent_react
-        limpar_memoria()
+        del agent_react, rascunho_react
         
     # Vídeo 3.3: Configurando o CrewAI
     print("\n--- Configurando CrewAI para pesquisa no Arxiv ---")
@@ -362,9 +392,7 @@ if __name__ == '__main__':
     print(result_crew1)
     print("############################################################\n")
 
-    # <-- MUDANÇA: Limpeza de memória após uso do primeiro crew
     del crew_arxiv, result_crew1
-    limpar_memoria()
 
     # --------------------------------------------------------------------------
     # AULA 4: MÚLTIPLAS TAREFAS E AGENTES
@@ -405,9 +433,7 @@ if __name__ == '__main__':
     print(result_crew2)
     print("############################################################\n")
     
-    # <-- MUDANÇA: Limpeza de memória após uso do segundo crew
     del crew_download, result_crew2
-    limpar_memoria()
     
     # Vídeo 4.2: Combinando agentes (Pesquisa na Web e Verificação)
     print("\n--- Configurando CrewAI com múltiplos agentes (Pesquisador Web e Verificador) ---")
@@ -455,9 +481,7 @@ if __name__ == '__main__':
     print(result_crew3)
     print("############################################################\n")
     
-    # <-- MUDANÇA: Limpeza de memória após uso do terceiro crew
     del crew_verificacao, result_crew3
-    limpar_memoria()
     
     # Vídeo 4.3: Trabalhando com Hierarquia
     print("\n--- Configurando CrewAI com processo hierárquico ---")
@@ -485,8 +509,12 @@ if __name__ == '__main__':
     print(result_crew4)
     print("#########################################################################\n")
     
-    # <-- MUDANÇA: Limpeza final de memória
     del crew_hierarquica, result_crew4
-    limpar_memoria()
     
+    print("\n--- Memory ---")
+    print(governador.relatorio())
+
+    print("\n--- Model routing stats (LlamaIndex calls) ---")
+    print(roteador.relatorio())
+
     print("\n=== EXECUÇÃO COMPLETA - TODAS AS AULAS FINALIZADAS ===")
\ No newline at end of file
@@ -0,0 +1,183 @@
+# analise_engajamento.py
+# -*- coding: utf-8 -*-
+"""
+Engajamento de muitas postagens de uma vez, a partir de um CSV ou Parquet.
+
+Aplica a mesma conta de 'calcular_engajamento' (curtidas + comentários +
+compartilhamentos, e a taxa sobre os seguidores) a todas as linhas em uma
+única passada vetorizada com NumPy, e resume o resultado em percentis,
+melhores postagens e totais por período.
+
+Colunas esperadas: curtidas, comentarios, compartilhamentos, seguidores e,
+opcionalmente, data e id (também aceitas em inglês: likes, comments, shares,
+followers, date).
+"""
+
+import os
+from typing import Dict, Optional
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+
+COLUNAS = ["curtidas", "comentarios", "compartilhamentos", "seguidores"]
+SINONIMOS = {
+    "likes": "curtidas",
+    "comments": "comentarios",
+    "comentários": "comentarios",
+    "shares": "compartilhamentos",
+    "followers": "seguidores",
+    "date": "data",
+    "post_id": "id",
+}
+PERCENTIS = [10, 25, 50, 75, 90, 99]
+PERIODOS = {"dia": "D", "semana": "W", "mes": "M", "ano": "Y"}
+
+
+def carregar_postagens(caminho: str) -> pa.Table:
+    """
+    Lê o arquivo de postagens (CSV ou Parquet) como tabela Arrow, com os
+    nomes das colunas normalizados.
+    """
+    if caminho.lower().endswith((".parquet", ".pq")):
+        import pyarrow.parquet as pq
+
+        tabela = pq.read_table(caminho)
+    else:
+        from pyarrow import csv
+
+        tabela = csv.read_csv(caminho)
+    nomes = [SINONIMOS.get(n.strip().lower(), n.strip().lower()) for n in tabela.column_names]
+    tabela = tabela.rename_columns(nomes)
+    faltando = [c for c in COLUNAS if c not in nomes]
+    if faltando:
+        raise ValueError(f"Colunas ausentes no arquivo {os.path.basename(caminho)}: {', '.join(faltando)}")
+    return tabela
+
+
+def _inteiros(tabela: pa.Table, coluna: str) -> np.ndarray:
+    # Sem nulos, a conversão para NumPy não copia os dados
+    return pc.fill_null(tabela.column(coluna), 0).to_numpy().astype(np.int64, copy=False)
+
+
+def _inicio_do_periodo(datas: np.ndarray, periodo: str) -> np.ndarray:
+    if periodo == "semana":
+        dias = datas.astype("datetime64[D]")
+        # 1970-01-01 foi uma quinta-feira: desloca para a segunda-feira anterior
+        return dias - ((dias.astype(np.int64) + 3) % 7).astype("timedelta64[D]")
+    return datas.astype(f"datetime64[{PERIODOS[periodo]}]")
+
+
+def _datas(tabela: pa.Table) -> Optional[np.ndarray]:
+    # Datas nulas viram NaT
+    if "data" not in tabela.column_names:
+        return None
+    coluna = tabela.column("data")
+    if not pa.types.is_timestamp(coluna.type) and not pa.types.is_date(coluna.type):
+        coluna = pc.cast(coluna, pa.timestamp("s"))
+    return coluna.to_numpy(zero_copy_only=False).astype("datetime64[s]")
+
+
+def resumir_engajamento(tabela: pa.Table, top_n: int = 5, periodo: str = "mes") -> Dict:
+    """
+    Calcula engajamento e taxa de todas as postagens e retorna os agregados.
+
+    Args:
+        tabela (pa.Table): Postagens, como retornadas por 'carregar_postagens'.
+        top_n (int): Quantidade de postagens com maior taxa a listar.
+        periodo (str): 'dia', 'semana', 'mes' ou 'ano' para os totais por período.
+
+    Returns:
+        dict: 'postagens', 'totais', 'percentis_taxa', 'melhores' e 'por_periodo'.
+            Taxas sem nenhuma postagem com seguidores ficam como None.
+    """
+    if periodo not in PERIODOS:
+        raise ValueError(f"Período inválido: {periodo}. Use {', '.join(PERIODOS)}.")
+    engajamento = _inteiros(tabela, "curtidas") + _inteiros(tabela, "comentarios") + _inteiros(tabela, "compartilhamentos")
+    seguidores = _inteiros(tabela, "seguidores")
+    validas = seguidores > 0
+    taxa = np.full(len(engajamento), np.nan)
+    np.divide(engajamento * 100.0, seguidores, out=taxa, where=validas)
+
+    resumo = {
+        "postagens": int(len(engajamento)),
+        "sem_seguidores": int((~validas).sum()),
+        "totais": {
+            "engajamento": int(engajamento.sum()),
+            "taxa_media": float(np.nanmean(taxa)) if validas.any() else None,
+            # Taxa agregada: todo o engajamento sobre todos os seguidores
+            "taxa_ponderada": float(engajamento[validas].sum() * 100.0 / seguidores[validas].sum()) if validas.any() else None,
+        },
+        "percentis_taxa": {},
+        "melhores": [],
+        "por_periodo": [],
+    }
+    if not validas.any():
+        return resumo
+
+    resumo["percentis_taxa"] = dict(zip(PERCENTIS, np.nanpercentile(taxa, PERCENTIS).round(2).tolist()))
+
+    # Melhores postagens: argpartition evita ordenar todas as linhas
+    indices_validos = np.flatnonzero(validas)
+    n = min(top_n, len(indices_validos))
+    candidatos = indices_validos[np.argpartition(-taxa[indices_validos], n - 1)[:n]]
+    melhores = candidatos[np.argsort(-taxa[candidatos])]
+    ids = tabela.column("id").take(pa.array(melhores)).to_pylist() if "id" in tabela.column_names else (melhores + 1).tolist()
+    resumo["melhores"] = [
+        {"id": ident, "engajamento": int(engajamento[i]), "seguidores": int(seguidores[i]), "taxa": round(float(taxa[i]), 2)}
+        for ident, i in zip(ids, melhores)
+    ]
+
+    datas = _datas(tabela)
+    if datas is not None:
+        # Postagens sem data ficam fora dos totais por período
+        com_data = ~np.isnat(datas)
+        resumo["sem_data"] = int((~com_data).sum())
+        periodos, grupo = np.unique(_inicio_do_periodo(datas[com_data], periodo), return_inverse=True)
+        validas_com_data = validas[com_data]
+        taxa_com_data = taxa[com_data]
+        quantidade = np.bincount(grupo, minlength=len(periodos))
+        soma_engajamento = np.bincount(grupo, weights=engajamento[com_data], minlength=len(periodos))
+        soma_taxa = np.bincount(grupo[validas_com_data], weights=taxa_com_data[validas_com_data], minlength=len(periodos))
+        validas_por_periodo = np.bincount(grupo[validas_com_data], minlength=len(periodos))
+        # Período em que nenhuma postagem tem seguidores: taxa indefinida (NaN), não 0%
+        taxa_media = np.divide(soma_taxa, validas_por_periodo, out=np.full(len(periodos), np.nan), where=validas_por_periodo > 0)
+        resumo["por_periodo"] = [
+            {
+                "periodo": str(p),
+                "postagens": int(q),
+                "engajamento": int(e),
+                "taxa_media": None if np.isnan(t) else round(float(t), 2),
+            }
+            for p, q, e, t in zip(periodos, quantidade, soma_engajamento, taxa_media)
+        ]
+    return resumo
+
+
+def _percentual(taxa: Optional[float]) -> str:
+    return "n/a" if taxa is None else f"{taxa:.2f}%"
+
+
+def formatar_resumo(resumo: Dict, periodo: str = "mes", max_periodos: int = 12) -> str:
+    """
+    Texto curto com os agregados, próprio para a resposta de uma ferramenta.
+    """
+    linhas = [
+        f"{resumo['postagens']} postagens analisadas ({resumo['sem_seguidores']} sem seguidores, ignoradas nas taxas).",
+        f"Engajamento total: {resumo['totais']['engajamento']}. Taxa média: {_percentual(resumo['totais']['taxa_media'])}. "
+        f"Taxa ponderada pelos seguidores: {_percentual(resumo['totais']['taxa_ponderada'])}.",
+    ]
+    if resumo["percentis_taxa"]:
+        linhas.append("Percentis da taxa: " + ", ".join(f"p{p}={v:.2f}%" for p, v in resumo["percentis_taxa"].items()) + ".")
+    if resumo["melhores"]:
+        linhas.append("Maiores taxas:")
+        linhas.extend(f"  {m['id']}: {m['taxa']:.2f}% ({m['engajamento']} interações, {m['seguidores']} seguidores)" for m in resumo["melhores"])
+    if resumo["por_periodo"]:
+        ultimos = resumo["por_periodo"][-max_periodos:]
+        sem_data = f"; {resumo['sem_data']} postagem(ns) sem data ignorada(s)" if resumo.get("sem_data") else ""
+        linhas.append(f"Por {periodo} (últimos {len(ultimos)}{sem_data}):")
+        linhas.extend(
+            f"  {p['periodo']}: {p['postagens']} postagens, {p['engajamento']} interações, taxa média {_percentual(p['taxa_media'])}"
+            for p in ultimos
+        )
+    return "\n".join(linhas)
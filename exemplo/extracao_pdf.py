@@ -0,0 +1,162 @@
+# extracao_pdf.py
+# -*- coding: utf-8 -*-
+"""
+Etapa de extração de texto dos PDFs baixados (downloads/artigo_*.pdf).
+
+Os PDFs são lidos página a página em um pool de processos e divididos em
+trechos prontos para o índice vetorial. O texto e os limites dos trechos de
+cada arquivo ficam em cache, indexados pelo hash do conteúdo, então uma
+nova ingestão do mesmo PDF não é reprocessada.
+
+Uso:
+    from extracao_pdf import ExtratorPDF
+    nos = ExtratorPDF().extrair(["downloads/artigo_1706.03762v7.pdf"])
+    indice = VectorStoreIndex(nos)
+"""
+
+import hashlib
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, List, Optional
+
+from llama_index.core.schema import NodeRelationship, RelatedNodeInfo, TextNode
+
+from comum.instrumentacao import rastreador
+
+DIR_CACHE = "cache_pdf"
+
+
+def hash_arquivo(caminho: str, tamanho_bloco: int = 1 << 20) -> str:
+    """
+    Calcula o SHA-256 do arquivo lendo-o em blocos.
+    """
+    resumo = hashlib.sha256()
+    with open(caminho, "rb") as f:
+        for bloco in iter(lambda: f.read(tamanho_bloco), b""):
+            resumo.update(bloco)
+    return resumo.hexdigest()
+
+
+def _processar_pdf(caminho: str, chunk_size: int, chunk_overlap: int) -> List[Dict]:
+    """
+    Extrai o texto página a página e o divide em trechos. Executada nos
+    processos do pool, por isso as importações ficam aqui dentro.
+    """
+    from llama_index.core.node_parser import SentenceSplitter
+    from pypdf import PdfReader
+
+    divisor = SentenceSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+    trechos = []
+    for numero, pagina in enumerate(PdfReader(caminho).pages, start=1):
+        texto = pagina.extract_text() or ""
+        if texto.strip():
+            trechos.extend({"texto": trecho, "pagina": numero} for trecho in divisor.split_text(texto))
+    return trechos
+
+
+class ExtratorPDF:
+    """
+    Args:
+        dir_cache (str): Diretório do cache de extração.
+        chunk_size (int): Tamanho máximo dos trechos, em tokens.
+        chunk_overlap (int): Sobreposição entre trechos consecutivos, em tokens.
+        processos (int): Processos do pool. Padrão: número de CPUs.
+    """
+
+    def __init__(
+        self,
+        dir_cache: str = DIR_CACHE,
+        chunk_size: int = 1024,
+        chunk_overlap: int = 200,
+        processos: Optional[int] = None,
+    ):
+        self.dir_cache = dir_cache
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+        self.processos = processos
+
+    def _caminho_cache(self, hash_pdf: str) -> str:
+        return os.path.join(self.dir_cache, f"{hash_pdf}_{self.chunk_size}_{self.chunk_overlap}.json")
+
+    def _ler_cache(self, hash_pdf: str) -> Optional[List[Dict]]:
+        caminho = self._caminho_cache(hash_pdf)
+        if not os.path.exists(caminho):
+            return None
+        with open(caminho, encoding="utf-8") as f:
+            return json.load(f)
+
+    def _gravar_cache(self, hash_pdf: str, trechos: List[Dict]) -> None:
+        os.makedirs(self.dir_cache, exist_ok=True)
+        caminho = self._caminho_cache(hash_pdf)
+        temporario = f"{caminho}.tmp"
+        with open(temporario, "w", encoding="utf-8") as f:
+            json.dump(trechos, f, ensure_ascii=False)
+        os.replace(temporario, caminho)
+
+    @staticmethod
+    def _criar_nos(caminho: str, hash_pdf: str, trechos: List[Dict]) -> List[TextNode]:
+        nos = []
+        for i, trecho in enumerate(trechos):
+            no = TextNode(
+                id_=f"{hash_pdf[:16]}_{i}",
+                text=trecho["texto"],
+                metadata={
+                    "file_name": os.path.basename(caminho),
+                    "page_label": str(trecho["pagina"]),
+                    "hash_arquivo": hash_pdf,
+                },
+                excluded_embed_metadata_keys=["hash_arquivo"],
+                excluded_llm_metadata_keys=["hash_arquivo"],
+            )
+            no.relationships[NodeRelationship.SOURCE] = RelatedNodeInfo(node_id=hash_pdf)
+            nos.append(no)
+        return nos
+
+    def extrair(self, arquivos: List[str]) -> List[TextNode]:
+        """
+        Retorna os trechos de todos os PDFs como nós do LlamaIndex. Arquivos
+        já vistos vêm do cache; os demais são processados em paralelo.
+        """
+        with rastreador.span("extracao_pdf", arquivos=len(arquivos)) as span:
+            hashes = {caminho: hash_arquivo(caminho) for caminho in arquivos}
+            trechos_por_arquivo = {}
+            pendentes = []
+            for caminho, hash_pdf in hashes.items():
+                em_cache = self._ler_cache(hash_pdf)
+                if em_cache is None:
+                    pendentes.append(caminho)
+                else:
+                    trechos_por_arquivo[caminho] = em_cache
+            span.registrar(cache_acertos=len(trechos_por_arquivo), cache_falhas=len(pendentes))
+            print(f"[EXTRAÇÃO] {len(trechos_por_arquivo)} PDF(s) no cache, {len(pendentes)} para processar.")
+
+            if len(pendentes) == 1:
+                # Um único arquivo não compensa o custo de iniciar o pool
+                caminho = pendentes[0]
+                try:
+                    trechos_por_arquivo[caminho] = _processar_pdf(caminho, self.chunk_size, self.chunk_overlap)
+                    self._gravar_cache(hashes[caminho], trechos_por_arquivo[caminho])
+                except Exception as e:
+                    print(f"[ERRO] Falha ao extrair {caminho}: {e}")
+            elif pendentes:
+                with ProcessPoolExecutor(max_workers=self.processos) as pool:
+                    futuros = {
+                        pool.submit(_processar_pdf, caminho, self.chunk_size, self.chunk_overlap): caminho
+                        for caminho in pendentes
+                    }
+                    for futuro in as_completed(futuros):
+                        caminho = futuros[futuro]
+                        try:
+                            trechos_por_arquivo[caminho] = futuro.result()
+                        except Exception as e:
+                            print(f"[ERRO] Falha ao extrair {caminho}: {e}")
+                            continue
+                        self._gravar_cache(hashes[caminho], trechos_por_arquivo[caminho])
+
+            nos = []
+            for caminho in arquivos:
+                if caminho in trechos_por_arquivo:
+                    nos.extend(self._criar_nos(caminho, hashes[caminho], trechos_por_arquivo[caminho]))
+            span.registrar(trechos=len(nos))
+            return nos
@@ -0,0 +1,211 @@
+# indexacao_continua.py
+# -*- coding: utf-8 -*-
+"""
+Indexação contínua dos PDFs baixados do arXiv.
+
+Uma thread observa a pasta 'downloads/' e uma fila recebe os arquivos novos
+(também avisados diretamente por 'baixar_pdf_arxiv'). Em segundo plano, os
+PDFs são extraídos com o ExtratorPDF, os trechos são convertidos em
+embeddings e inseridos no índice já carregado, que é persistido em seguida.
+Os motores de consulta criados a partir do índice passam a enxergar os
+artigos novos sem reconstruir a base.
+
+Uso:
+    indexador = IndexadorContinuo()
+    indexador.iniciar()
+    config.ouvintes_download.append(indexador.enfileirar)
+    motor = indexador.motor_consulta(similarity_top_k=10, node_postprocessors=[reordenador], llm=llm)
+"""
+
+import glob
+import os
+import queue
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from llama_index.core import Settings, StorageContext, VectorStoreIndex, load_index_from_storage
+from llama_index.core.query_engine import RetrieverQueryEngine
+from llama_index.core.retrievers import BaseRetriever
+from llama_index.core.schema import MetadataMode, NodeWithScore, QueryBundle
+
+from comum.instrumentacao import rastreador
+from extracao_pdf import ExtratorPDF
+
+
+class _RetrieverTravado(BaseRetriever):
+    """
+    Retriever que consulta o índice sob a mesma trava usada nas inserções,
+    evitando ler o armazenamento vetorial enquanto ele é alterado.
+    """
+
+    def __init__(self, base: BaseRetriever, trava: threading.Lock):
+        super().__init__()
+        self._base = base
+        self._trava = trava
+
+    def _retrieve(self, query_bundle: QueryBundle) -> List[NodeWithScore]:
+        with self._trava:
+            return self._base.retrieve(query_bundle)
+
+
+class IndexadorContinuo:
+    """
+    Args:
+        persist_dir (str): Pasta do índice dos artigos baixados.
+        diretorio (str): Pasta observada em busca de PDFs novos.
+        intervalo (float): Intervalo, em segundos, entre as varreduras da pasta.
+        extrator (ExtratorPDF): Extrator usado nos PDFs. Padrão: ExtratorPDF().
+    """
+
+    def __init__(
+        self,
+        persist_dir: str = "storage/artigos_baixados",
+        diretorio: str = "downloads",
+        intervalo: float = 2.0,
+        extrator: Optional[ExtratorPDF] = None,
+    ):
+        self.persist_dir = persist_dir
+        self.diretorio = diretorio
+        self.intervalo = intervalo
+        self.extrator = extrator or ExtratorPDF()
+        self._fila: "queue.Queue[str]" = queue.Queue()
+        self._trava = threading.Lock()
+        self._parar = threading.Event()
+        self._threads: List[threading.Thread] = []
+        # Assinatura (tamanho, mtime) vista por arquivo na última varredura
+        self._assinaturas: Dict[str, Tuple[int, float]] = {}
+        self._enfileirados: Dict[str, Tuple[int, float]] = {}
+        self.indice = self._carregar_indice()
+        self._hash_por_arquivo = {
+            no.metadata["file_name"]: no.metadata["hash_arquivo"]
+            for no in self.indice.docstore.docs.values()
+            if "hash_arquivo" in no.metadata
+        }
+
+    def _carregar_indice(self) -> VectorStoreIndex:
+        if os.path.exists(self.persist_dir):
+            contexto = StorageContext.from_defaults(persist_dir=self.persist_dir)
+            return load_index_from_storage(contexto)
+        return VectorStoreIndex(nodes=[])
+
+    def motor_consulta(self, **kwargs) -> RetrieverQueryEngine:
+        """
+        Cria um motor de consulta sobre o índice vivo. 'similarity_top_k' vai
+        para o retriever; os demais argumentos (llm, streaming...) vão para o motor.
+        """
+        retriever = self.indice.as_retriever(similarity_top_k=kwargs.pop("similarity_top_k", 3))
+        return RetrieverQueryEngine.from_args(_RetrieverTravado(retriever, self._trava), **kwargs)
+
+    # --------------------------------------------------------------------------
+    # Fila e threads
+    # --------------------------------------------------------------------------
+    def enfileirar(self, caminho: str) -> None:
+        """
+        Agenda um PDF para indexação. Usado como ouvinte de 'baixar_pdf_arxiv'.
+        """
+        self._fila.put(caminho)
+
+    def iniciar(self) -> "IndexadorContinuo":
+        if self._threads:
+            return self
+        self._parar.clear()
+        self._threads = [
+            threading.Thread(target=self._observar, name="observador_downloads", daemon=True),
+            threading.Thread(target=self._trabalhar, name="indexador_pdfs", daemon=True),
+        ]
+        for thread in self._threads:
+            thread.start()
+        print(f"[INDEXAÇÃO] Observando '{self.diretorio}' a cada {self.intervalo:.0f}s.")
+        return self
+
+    def parar(self) -> None:
+        self._parar.set()
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+
+    def aguardar(self) -> None:
+        """
+        Bloqueia até que todos os PDFs enfileirados tenham sido indexados.
+        """
+        self._fila.join()
+
+    def _observar(self) -> None:
+        while not self._parar.is_set():
+            for caminho in glob.glob(os.path.join(self.diretorio, "*.pdf")):
+                try:
+                    estado = os.stat(caminho)
+                except OSError:
+                    continue
+                assinatura = (estado.st_size, estado.st_mtime)
+                anterior = self._assinaturas.get(caminho)
+                self._assinaturas[caminho] = assinatura
+                # Só enfileira arquivos que não mudaram desde a última varredura
+                # (o download terminou); arquivos já indexados são descartados pelo hash
+                if anterior == assinatura and self._enfileirados.get(caminho) != assinatura:
+                    self._enfileirados[caminho] = assinatura
+                    self._fila.put(caminho)
+            self._parar.wait(self.intervalo)
+
+    def _trabalhar(self) -> None:
+        while not self._parar.is_set():
+            try:
+                lote = [self._fila.get(timeout=0.5)]
+            except queue.Empty:
+                continue
+            while True:
+                try:
+                    lote.append(self._fila.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                self.indexar([c for c in dict.fromkeys(lote) if os.path.exists(c)])
+            except Exception as e:
+                print(f"[ERRO] Falha na indexação contínua: {e}")
+            finally:
+                for _ in lote:
+                    self._fila.task_done()
+
+    # --------------------------------------------------------------------------
+    # Inserção no índice
+    # --------------------------------------------------------------------------
+    def indexar(self, arquivos: List[str]) -> int:
+        """
+        Extrai os PDFs e insere no índice os que ainda não estão nele. Se um
+        arquivo já indexado mudou de conteúdo, a versão antiga é substituída.
+
+        Returns:
+            int: Quantidade de trechos inseridos.
+        """
+        if not arquivos:
+            return 0
+        with rastreador.span("indexacao_continua", arquivos=len(arquivos)) as span:
+            nos = self.extrator.extrair(arquivos)
+            indexados = self.indice.ref_doc_info
+            novos = [no for no in nos if no.ref_doc_id not in indexados]
+            if not novos:
+                span.registrar(trechos=0)
+                return 0
+
+            # Os embeddings são calculados fora da trava; as consultas só
+            # esperam pela inserção em si
+            embeddings = Settings.embed_model.get_text_embedding_batch(
+                [no.get_content(metadata_mode=MetadataMode.EMBED) for no in novos]
+            )
+            for no, embedding in zip(novos, embeddings):
+                no.embedding = embedding
+
+            with self._trava:
+                for no in novos:
+                    nome = no.metadata["file_name"]
+                    anterior = self._hash_por_arquivo.get(nome)
+                    if anterior and anterior != no.ref_doc_id and anterior in self.indice.ref_doc_info:
+                        self.indice.delete_ref_doc(anterior, delete_from_docstore=True)
+                    self._hash_por_arquivo[nome] = no.ref_doc_id
+                self.indice.insert_nodes(novos)
+                self.indice.storage_context.persist(persist_dir=self.persist_dir)
+
+            span.registrar(trechos=len(novos))
+            arquivos_novos = sorted({no.metadata["file_name"] for no in novos})
+            print(f"[INDEXAÇÃO] {len(novos)} trecho(s) de {len(arquivos_novos)} PDF(s) adicionados: {', '.join(arquivos_novos)}")
+            return len(novos)
@@ -11,10 +11,10 @@ reutilizados pelos outros scripts de passo a passo.
 # IMPORTS E CONFIGURAÇÕES
 # ==============================================================================
 import os
+import re
+import sys
 import requests
 import arxiv
-import gc
-import json  # Usaremos para salvar e carregar resultados
 from dotenv import load_dotenv
 
 # LlamaIndex Imports
@@ -26,11 +26,30 @@ from llama_index.core import (
     load_index_from_storage,
 )
 from llama_index.core.tools import FunctionTool, QueryEngineTool, ToolMetadata
-from llama_index.core.agent import ReActAgent
+from llama_index.core.agent import (
+    FunctionCallingAgentWorker,
+    AgentRunner,
+    ReActAgent
+)
 from llama_index.llms.groq import Groq
 from llama_index.embeddings.nvidia import NVIDIAEmbedding
 from llama_index.tools.tavily_research import TavilyToolSpec
 
+# Componentes compartilhados (pacote 'comum' na raiz do repositório)
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from comum.artefatos import ArmazemArtefatos
+from comum.busca_web import BuscaWebCache
+from comum.contexto import GerenciadorContexto
+from comum.instrumentacao import em_thread, rastreador, span_atual
+from comum.intencoes import Intencao, PreRoteador
+from comum.memoria import GovernadorMemoria
+from comum.rede import cliente_http
+from comum.reordenacao import ReordenadorCruzado
+from comum.roteamento import MODELO_FORTE, MODELO_RAPIDO, RoteadorModelos
+from comum.sessao import SessaoPersistente
+from comum.streaming import transmitir_chat, transmitir_consulta, transmitir_resposta
+from analise_engajamento import carregar_postagens, formatar_resumo, resumir_engajamento
+
 # CrewAI Imports (serão importados quando necessário nos passos específicos)
 # from crewai import Agent, Task, Crew, Process
 # from crewai_tools import LlamaIndexTool
@@ -49,24 +68,70 @@ if not all([groq_key, tavily_key, nvidia_key]):
 # ==============================================================================
 # CONFIGURAÇÃO GLOBAL DE MODELOS
 # ==============================================================================
-# LLM para LlamaIndex (rápido para agentes)
-llm_groq = Groq(model="llama-3.1-8b-instant", api_key=groq_key)
+# LLM rápido (escolha de ferramentas e argumentos) e LLM forte (síntese final).
+# Os nomes podem ser trocados pelas variáveis MODELO_RAPIDO e MODELO_FORTE.
+llm_groq = Groq(model=MODELO_RAPIDO, api_key=groq_key)
+llm_groq_forte = Groq(model=MODELO_FORTE, api_key=groq_key)
 
-# LLM para CrewAI será configurado quando necessário nos outros passos
+# Roteador: decide qual modelo atende cada etapa e mede latência/custo por rota.
+# Os LLMs do CrewAI são criados sob demanda com 'roteador.llm_crewai(etapa)'.
+roteador = RoteadorModelos(
+    {"rapido": llm_groq, "forte": llm_groq_forte},
+    modelos_crewai={"rapido": f"groq/{MODELO_RAPIDO}", "forte": f"groq/{MODELO_FORTE}"},
+).instrumentar()
 
-# Configurações globais do LlamaIndex
-Settings.llm = llm_groq
+# Configurações globais do LlamaIndex (síntese das respostas dos motores de consulta)
+Settings.llm = roteador.llm("sintese")
 Settings.embed_model = NVIDIAEmbedding(
     model="nv-embed-qa-e4", api_key=nvidia_key, truncate="END"
 )
 
-# Configuração otimizada do garbage collector
-gc.set_threshold(700, 10, 10)
+# Governador de memória: ajusta o coletor de lixo, pausa a coleta nas fases
+# pesadas e acompanha o RSS. Aqui nada é registrado para despejo: os índices
+# vetoriais e os agentes ficam referenciados pelos motores de consulta e pelas
+# ferramentas até o fim do script, então liberá-los não devolveria memória.
+# O despejo (mover para o disco) vale para os dados do projeto comex.
+governador = GovernadorMemoria().configurar_gc().iniciar()
+
+# Rastreamento de ferramentas, recuperações, embeddings e LLMs em JSONL.
+# RASTREAR_MEMORIA=1 mede o pico de memória de cada span (mais lento).
+rastreador.ativar(
+    arquivo=os.getenv("ARQUIVO_RASTREAMENTO", "rastros/rastreamento.jsonl"),
+    medir_memoria=os.getenv("RASTREAR_MEMORIA") == "1",
+)
+
+# Armazém de artefatos: ferramentas devolvem handles curtos em vez de
+# inserir resultados grandes no prompt
+armazem_artefatos = ArmazemArtefatos()
+
+# Sessão gravada em disco (histórico dos agentes e artefatos), retomada pelos
+# próximos passos. O nome pode ser trocado pela variável SESSAO.
+sessao = SessaoPersistente(os.getenv("SESSAO", "exemplo"))
+
+# Orçamento de tokens das conversas: limita resultados grandes de ferramentas
+# e compacta o histórico dos agentes entre os turnos
+gerenciador_contexto = GerenciadorContexto(
+    limite_resultado=800, limite_historico=6000, armazem=armazem_artefatos
+)
+
+# Reordenação dos trechos recuperados: os motores buscam CANDIDATOS_RECUPERACAO
+# trechos e o cross-encoder local mantém só os relevantes (no máximo 5)
+CANDIDATOS_RECUPERACAO = 10
+reordenador = ReordenadorCruzado(top_k_max=5)
+
+# Funções chamadas com o caminho de cada PDF salvo por 'baixar_pdf_arxiv'
+# (ex.: IndexadorContinuo.enfileirar, que indexa o artigo em segundo plano)
+ouvintes_download = []
+
+# Pesquisa web (Tavily) com cache compartilhado pelos agentes: buscas iguais ou
+# quase iguais e links já vistos não geram novas chamadas (validade: TTL_BUSCA_WEB)
+busca_web = BuscaWebCache(TavilyToolSpec(api_key=tavily_key))
 
 
 # ==============================================================================
 # DEFINIÇÕES DE FUNÇÕES (FERRAMENTAS)
 # ==============================================================================
+@rastreador.rastrear()
 def calcular_engajamento(
     curtidas: int, comentarios: int, compartilhamentos: int, seguidores: int
 ) -> str:
@@ -77,45 +142,179 @@ def calcular_engajamento(
     return f"O engajamento total é {engajamento_total} e a taxa de engajamento é {taxa_engajamento:.2f}%."
 
 
+@rastreador.rastrear()
+def analisar_engajamento_lote(arquivo: str, top_n: int = 5, periodo: str = "mes") -> str:
+    """
+    Calcula o engajamento de todas as postagens de um arquivo CSV ou Parquet
+    (colunas curtidas, comentarios, compartilhamentos, seguidores e,
+    opcionalmente, data e id) em uma única chamada. Retorna percentis da
+    taxa de engajamento, as 'top_n' postagens com maior taxa e os totais por
+    'periodo' ('dia', 'semana', 'mes' ou 'ano').
+    """
+    try:
+        tabela = carregar_postagens(arquivo)
+        resumo = resumir_engajamento(tabela, top_n=top_n, periodo=periodo)
+        span_atual().registrar(postagens=resumo["postagens"])
+        return formatar_resumo(resumo, periodo)
+    except FileNotFoundError:
+        return f"Arquivo '{arquivo}' não encontrado."
+    except Exception as e:
+        return f"Ocorreu um erro ao analisar o arquivo: {e}"
+
+
+@rastreador.rastrear()
 def consulta_artigos(titulo: str) -> str:
+    """
+    Busca artigos no arXiv. Retorna um handle para a lista completa (com os
+    resumos) e uma prévia com título, categoria e link de cada artigo. Use
+    'recuperar_resultado' com o handle e o número do artigo para ler o resumo.
+    """
     try:
         busca = arxiv.Search(
             query=titulo, max_results=5, sort_by=arxiv.SortCriterion.Relevance
         )
-        resultados = []
-        links = []
-        for resultado in busca.results():
-            resultados.append(
-                f"Título: {resultado.title}\nResumo: {resultado.summary}\nCategoria: {resultado.primary_category}\nLink: {resultado.entry_id}\n"
-            )
-            links.append(resultado.entry_id)
-
-        # Salva o resultado para ser usado por outros passos
-        with open("resultado_pesquisa_arxiv.json", "w", encoding="utf-8") as f:
-            json.dump(links, f)
-        print("Resultado da pesquisa Arxiv salvo em 'resultado_pesquisa_arxiv.json'")
-        return "\n\n".join(resultados) if resultados else "Nenhum artigo encontrado."
+        artigos = [
+            {
+                "Título": resultado.title,
+                "Resumo": resultado.summary,
+                "Categoria": resultado.primary_category,
+                "Link": resultado.entry_id,
+            }
+            for resultado in busca.results()
+        ]
+        span_atual().registrar(artigos=len(artigos))
+        if not artigos:
+            return "Nenhum artigo encontrado."
+
+        # Guarda a lista completa para ser usada por outras ferramentas
+        handle = armazem_artefatos.salvar(artigos, "artigos_arxiv", f"Busca: {titulo}")
+        previa = [
+            f"[{i}] {a['Título']} ({a['Categoria']}) - {a['Link']}"
+            for i, a in enumerate(artigos, start=1)
+        ]
+        return (
+            f"{len(artigos)} artigos encontrados (handle: {handle}).\n"
+            + "\n".join(previa)
+            + f"\nPara baixar o PDF do artigo n, use baixar_pdf_arxiv com '{handle}#n'."
+        )
     except Exception as e:
         return f"Ocorreu um erro ao buscar no arXiv: {e}"
 
 
+@rastreador.rastrear()
 def baixar_pdf_arxiv(link: str) -> str:
+    """
+    Baixa o PDF de um artigo do arXiv. Aceita o link do artigo ou uma
+    referência a um resultado de 'consulta_artigos' no formato 'art_xxxxxxxx#n'
+    (sem '#n', baixa o primeiro artigo).
+    """
     try:
+        if armazem_artefatos.eh_handle(link):
+            referencia = link.strip() if "#" in link else f"{link.strip()}#1"
+            artigo = armazem_artefatos.obter(referencia)
+            if artigo is None:
+                return (
+                    f"Nenhum artigo encontrado para a referência '{link}'. "
+                    "Use 'art_xxxxxxxx#n', com n a partir de 1 (o primeiro artigo da busca)."
+                )
+            link = artigo["Link"]
         if "arxiv.org" not in link:
             return "O link fornecido não é um link válido do arXiv."
         artigo_id = link.split("/")[-1]
         pdf_url = f"https://arxiv.org/pdf/{artigo_id}.pdf"
-        response = requests.get(pdf_url, stream=True)
-        if response.status_code == 200:
-            os.makedirs("downloads", exist_ok=True)
-            nome_arquivo = f"downloads/artigo_{artigo_id}.pdf"
-            with open(nome_arquivo, "wb") as f:
-                f.write(response.content)
-            return f"PDF salvo como {nome_arquivo}"
-        else:
-            return f"Erro ao baixar o PDF. Código de status: {response.status_code}"
+        nome_arquivo = f"downloads/artigo_{artigo_id}.pdf"
+        # Conexão reaproveitada, com timeout e novas tentativas (comum/rede.py)
+        cliente_http.baixar(pdf_url, nome_arquivo)
+        for ouvinte in ouvintes_download:
+            ouvinte(nome_arquivo)
+        return f"PDF salvo como {nome_arquivo}"
+    except requests.exceptions.HTTPError as e:
+        return f"Erro ao baixar o PDF. Código de status: {e.response.status_code}"
     except Exception as e:
         return f"Ocorreu um erro: {e}"
 
 
+def recuperar_resultado(handle: str, parte: int = 1) -> str:
+    """
+    Recupera o conteúdo completo de um resultado de ferramenta que foi
+    truncado, a partir do handle informado na prévia. Para listas (ex.: a
+    busca de artigos), 'parte' é o número do item.
+    """
+    return gerenciador_contexto.recuperar(handle, parte)
+
+
+# ==============================================================================
+# INTENÇÕES DA ROTA RÁPIDA (SEM LLM)
+# ==============================================================================
+_CONTAGENS_ENGAJAMENTO = {
+    "curtidas": r"(\d[\d.]*)\s*curtidas",
+    "comentarios": r"(\d[\d.]*)\s*coment[áa]rios",
+    "compartilhamentos": r"(\d[\d.]*)\s*compartilhamentos",
+    "seguidores": r"(\d[\d.]*)\s*seguidores",
+}
+_ARQUIVO_NO_TEXTO = r"([\w./\\-]+\.(?:csv|parquet))\b"
+# "por dia", "por semanas", "por anos", "por meses": sem o "por", "nos últimos 2 anos" não é agrupamento
+_PERIODO_NO_TEXTO = r"\bpor\s+(dia|semana|m[êe]s|ano)(?:e?s)?\b"
+_TOP_N_NO_TEXTO = r"\b(?:top\s*(\d+)|(\d+)\s+(?:melhores|maiores|principais))\b"
+
+
+def extrair_engajamento(texto: str):
+    """
+    Extrai os argumentos de 'calcular_engajamento' de pedidos como
+    "150 curtidas, 35 comentários, 20 compartilhamentos e 2000 seguidores".
+    Retorna None se alguma contagem faltar ou aparecer mais de uma vez
+    (pedidos com dois posts ficam com o agente).
+    """
+    argumentos = {}
+    for nome, padrao in _CONTAGENS_ENGAJAMENTO.items():
+        encontrados = re.findall(padrao, texto, re.IGNORECASE)
+        if len(encontrados) != 1:
+            return None
+        argumentos[nome] = int(encontrados[0].rstrip(".").replace(".", ""))
+    return argumentos, 1.0
+
+
+def extrair_engajamento_lote(texto: str):
+    """
+    Extrai os argumentos de 'analisar_engajamento_lote' de pedidos que citam
+    um arquivo .csv/.parquet, como "analise o engajamento de posts.csv por semana".
+    Retorna None se o pedido citar mais de um arquivo, período ou top N.
+    """
+    arquivos = re.findall(_ARQUIVO_NO_TEXTO, texto, re.IGNORECASE)
+    periodos = re.findall(_PERIODO_NO_TEXTO, texto, re.IGNORECASE)
+    top_n = re.findall(_TOP_N_NO_TEXTO, texto, re.IGNORECASE)
+    if len(arquivos) != 1 or len(periodos) > 1 or len(top_n) > 1:
+        return None
+    argumentos = {"arquivo": arquivos[0]}
+    if periodos:
+        argumentos["periodo"] = periodos[0].lower().replace("ê", "e")
+    if top_n:
+        argumentos["top_n"] = int(top_n[0][0] or top_n[0][1])
+    return argumentos, 0.9
+
+
+pre_roteador = PreRoteador([
+    Intencao(
+        nome="calcular_engajamento",
+        extrair=extrair_engajamento,
+        executar=calcular_engajamento,
+        gatilhos=[r"engajamento", r"curtidas", r"seguidores"],
+        termos=list(_CONTAGENS_ENGAJAMENTO.values()) + [
+            r"\bcalcul\w*", r"\bpostage(?:m|ns)\b", r"\bposts?\b", r"\bv[íi]deos?\b", r"\bperfil\b",
+            r"\b(?:teve|tem|tinha)\b",
+        ],
+    ),
+    Intencao(
+        nome="analisar_engajamento_lote",
+        extrair=extrair_engajamento_lote,
+        executar=analisar_engajamento_lote,
+        gatilhos=[r"\.(?:csv|parquet)\b", r"\bpostage?ns\b", _PERIODO_NO_TEXTO],
+        termos=[
+            _ARQUIVO_NO_TEXTO, _TOP_N_NO_TEXTO, r"\banalis\w*", r"\bagrup\w*", r"\bengajamento\b",
+            r"\bposts?\b", r"\barquivos?\b",
+        ],
+    ),
+])
+
+
 print("Módulo de configuração carregado.")
@@ -3,36 +3,66 @@ import asyncio
 import passo_0_configuracao_e_ferramentas as config
 
 
+def criar_agente(verbose: bool = True):
+    """
+    Cria o agente de funções da aula 1 (também usado por 'executar_lote.py').
+    """
+    # Criando ferramentas a partir das funções importadas
+    # ('em_thread' mantém o span ativo da pergunta dentro da ferramenta)
+    def ferramenta(fn):
+        return config.FunctionTool.from_defaults(fn=fn, async_fn=config.em_thread(fn))
+
+    ferramenta_calculo = ferramenta(config.calcular_engajamento)
+    ferramenta_engajamento_lote = ferramenta(config.analisar_engajamento_lote)
+    ferramenta_consulta_arxiv = ferramenta(config.gerenciador_contexto.envolver(config.consulta_artigos))
+    ferramenta_recuperar = ferramenta(config.recuperar_resultado)
+
+    # O laço ReAct roda no modelo rápido; a resposta final é reescrita pela
+    # rota 'sintese' (o 'sintese=' de transmitir_resposta e o 'llm_sintese' do ExecutorLote)
+    return config.ReActAgent(
+        tools=[ferramenta_calculo, ferramenta_engajamento_lote, ferramenta_consulta_arxiv, ferramenta_recuperar],
+        llm=config.roteador.llm("selecao_ferramenta"),
+        verbose=verbose,
+    )
+
+
 async def main():
     print("\n" + "=" * 50)
     print("PASSO 1: AGENTE DE FUNÇÕES SIMPLES (AULA 1)")
     print("=" * 50 + "\n")
 
-    # Criando ferramentas a partir das funções importadas
-    ferramenta_calculo = config.FunctionTool.from_defaults(
-        fn=config.calcular_engajamento
-    )
-    ferramenta_consulta_arxiv = config.FunctionTool.from_defaults(
-        fn=config.consulta_artigos
-    )
+    agent = criar_agente()
+    memoria = config.gerenciador_contexto.criar_memoria()
+    # Retoma o histórico e os artefatos (ex.: buscas no arXiv) da sessão anterior
+    config.sessao.restaurar(config.armazem_artefatos, {"agente_funcoes": memoria})
 
-    agent = config.ReActAgent(
-        tools=[ferramenta_calculo, ferramenta_consulta_arxiv],
-        llm=config.llm_groq,
-        verbose=True,
-    )
+    # Pedidos reconhecidos pela rota rápida chamam a ferramenta diretamente;
+    # os demais seguem para o agente
+    async def perguntar(mensagem: str):
+        return await config.pre_roteador.responder(
+            mensagem,
+            lambda m: config.transmitir_resposta(agent, m, sintese=config.roteador.llm("sintese"), memory=memoria),
+            memoria=memoria,
+        )
 
     print("\n--- Teste 1.1: Calculando engajamento ---")
-    response1 = await agent.run(
+    await perguntar(
         "Qual é o engajamento de uma postagem com 150 curtidas, 35 comentários, 20 compartilhamentos e 2000 seguidores?"
     )
-    print("Resposta do Agente:", response1)
+    config.gerenciador_contexto.compactar_memoria(memoria)
 
     print("\n--- Teste 1.2: Consultando artigos no Arxiv ---")
-    response2 = await agent.run(
+    await perguntar(
         "Me retorne artigos sobre o uso da inteligência artificial nas redes sociais"
     )
-    print("Resposta do Agente:", response2)
+
+    config.sessao.salvar(config.armazem_artefatos, {"agente_funcoes": memoria})
+
+    print("\n--- Estatísticas por rota de modelo ---")
+    print(config.roteador.relatorio())
+
+    print("\n--- Resumo do rastreamento ---")
+    print(config.rastreador.resumo_chamas())
 
     print("\n" + "=" * 50)
     print("PASSO 1 CONCLUÍDO")
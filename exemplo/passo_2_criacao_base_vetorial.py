@@ -1,5 +1,7 @@
 # passo_2_criacao_base_vetorial.py
 import passo_0_configuracao_e_ferramentas as config
+from extracao_pdf import ExtratorPDF
+import glob
 import os
 
 if __name__ == '__main__':
@@ -25,17 +27,28 @@ if __name__ == '__main__':
         artigo_docs = config.SimpleDirectoryReader(input_files=["data/artigo1.txt"]).load_data()
         livro_docs = config.SimpleDirectoryReader(input_files=["data/livro1.txt"]).load_data()
         
-        print("Gerando e persistindo índice 'artigo'...")
-        artigo_index = config.VectorStoreIndex.from_documents(artigo_docs)
-        artigo_index.storage_context.persist(persist_dir="storage/artigo")
-        
-        print("Gerando e persistindo índice 'livro'...")
-        livro_index = config.VectorStoreIndex.from_documents(livro_docs)
-        livro_index.storage_context.persist(persist_dir="storage/livro")
+        # Fase pesada: o coletor de lixo fica suspenso enquanto os nós e
+        # embeddings são criados e o limite de memória é verificado no final
+        with config.governador.fase_pesada("indices_txt"):
+            print("Gerando e persistindo índice 'artigo'...")
+            artigo_index = config.VectorStoreIndex.from_documents(artigo_docs)
+            artigo_index.storage_context.persist(persist_dir="storage/artigo")
+
+            print("Gerando e persistindo índice 'livro'...")
+            livro_index = config.VectorStoreIndex.from_documents(livro_docs)
+            livro_index.storage_context.persist(persist_dir="storage/livro")
 
-        # Limpeza de memória
         del artigo_docs, livro_docs, artigo_index, livro_index
-        config.gc.collect()
+
+        # PDFs baixados no passo 4: extração em paralelo com cache por hash
+        pdfs = sorted(glob.glob("downloads/*.pdf"))
+        if pdfs:
+            print(f"Extraindo e indexando {len(pdfs)} PDF(s) da pasta 'downloads'...")
+            with config.governador.fase_pesada("indices_pdf"):
+                nos_pdfs = ExtratorPDF().extrair(pdfs)
+                pdfs_index = config.VectorStoreIndex(nos_pdfs)
+                pdfs_index.storage_context.persist(persist_dir="storage/artigos_baixados")
+            del nos_pdfs, pdfs_index
 
         print("\nÍndices vetoriais criados e salvos com sucesso na pasta 'storage'.")
 
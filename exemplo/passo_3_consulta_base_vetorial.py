@@ -1,5 +1,7 @@
 # passo_3_consulta_base_vetorial.py
 import passo_0_configuracao_e_ferramentas as config
+from indexacao_continua import IndexadorContinuo
+import glob
 import os
 
 if __name__ == '__main__':
@@ -18,26 +20,77 @@ if __name__ == '__main__':
         livro_storage = config.StorageContext.from_defaults(persist_dir="storage/livro")
         loaded_livro_index = config.load_index_from_storage(livro_storage)
 
-        artigo_engine = loaded_artigo_index.as_query_engine(similarity_top_k=3)
-        livro_engine = loaded_livro_index.as_query_engine(similarity_top_k=3)
+        # A síntese das respostas usa o modelo forte; o agente só escolhe a ferramenta
+        llm_sintese = config.roteador.llm("sintese")
+        # Recupera mais candidatos e deixa o reordenador escolher quantos vão para a síntese
+        opcoes_motor = dict(
+            similarity_top_k=config.CANDIDATOS_RECUPERACAO,
+            node_postprocessors=[config.reordenador],
+            llm=llm_sintese,
+        )
+        # Os motores das ferramentas não usam streaming: a QueryEngineTool
+        # converte a resposta em texto antes de devolvê-la ao agente
+        artigo_engine = loaded_artigo_index.as_query_engine(**opcoes_motor)
+        livro_engine = loaded_livro_index.as_query_engine(**opcoes_motor)
+        # Motor com streaming apenas para a consulta direta (transmitir_consulta)
+        livro_engine_streaming = loaded_livro_index.as_query_engine(**opcoes_motor, streaming=True)
         
         query_engine_tools = [
             config.QueryEngineTool(query_engine=artigo_engine, metadata=config.ToolMetadata(name="artigo_engine", description="Fornece informações sobre algoritmos de IA em redes sociais a partir de um artigo.")),
             config.QueryEngineTool(query_engine=livro_engine, metadata=config.ToolMetadata(name="livro_engine", description="Fornece informações sobre tendências de IA a partir de um livro.")),
         ]
+
+        # Artigos baixados: índice vivo, atualizado em segundo plano a cada PDF
+        # novo em 'downloads/' (inclusive os baixados pelo passo 4 em paralelo)
+        indexador = IndexadorContinuo().iniciar()
+        config.ouvintes_download.append(indexador.enfileirar)
+        pdfs_engine = indexador.motor_consulta(**opcoes_motor)
+        pdfs_engine_streaming = indexador.motor_consulta(**opcoes_motor, streaming=True)
+        query_engine_tools.append(
+            config.QueryEngineTool(query_engine=pdfs_engine, metadata=config.ToolMetadata(name="artigos_baixados_engine", description="Fornece informações dos artigos científicos baixados do arXiv."))
+        )
         print("Motores de consulta prontos.")
 
+        memoria = config.gerenciador_contexto.criar_memoria()
+        config.sessao.restaurar(config.armazem_artefatos, {"agente_documentos": memoria})
         agent_documentos = config.AgentRunner(
-            config.FunctionCallingAgentWorker.from_tools(query_engine_tools, llm=config.llm_groq, verbose=True)
+            config.FunctionCallingAgentWorker.from_tools(
+                query_engine_tools, llm=config.roteador.llm("selecao_ferramenta"), verbose=True
+            ),
+            memory=memoria,
         )
 
         print("\n--- Teste 3.1: Consultando artigo ---")
-        response = agent_documentos.chat("Quais os principais algoritmos de IA usados nas redes sociais?")
-        print("Resposta do Agente:", response)
+        config.transmitir_chat(agent_documentos, "Quais os principais algoritmos de IA usados nas redes sociais?")
+        config.gerenciador_contexto.compactar_memoria(memoria)
         
         print("\n--- Teste 3.2: Consultando livro ---")
-        response = agent_documentos.chat("Quais as principais tendências de IA que eu deveria estudar?")
-        print("Resposta do Agente:", response)
+        config.transmitir_chat(agent_documentos, "Quais as principais tendências de IA que eu deveria estudar?")
+
+        print("\n--- Teste 3.3: Consulta direta ao motor do livro (streaming) ---")
+        config.transmitir_consulta(livro_engine_streaming, "Quais as principais tendências de IA citadas no livro?")
+
+        print("\n--- Teste 3.4: Artigo recém-baixado, consultado sem reconstruir o índice ---")
+        # Reaproveita um PDF já baixado; baixar do arXiv só com BAIXAR_ARTIGO_TESTE=1
+        pdfs_baixados = sorted(glob.glob("downloads/*.pdf"))
+        if pdfs_baixados:
+            print(f"Usando o PDF já baixado '{pdfs_baixados[0]}'.")
+            indexador.enfileirar(pdfs_baixados[0])
+        elif os.getenv("BAIXAR_ARTIGO_TESTE") == "1":
+            print(config.baixar_pdf_arxiv("http://arxiv.org/abs/1706.03762v7"))
+        else:
+            print("Nenhum PDF em 'downloads/'. Defina BAIXAR_ARTIGO_TESTE=1 para baixar um artigo do arXiv.")
+        if pdfs_baixados or os.getenv("BAIXAR_ARTIGO_TESTE") == "1":
+            indexador.aguardar()
+            config.transmitir_consulta(pdfs_engine_streaming, "Qual é o tema principal do artigo baixado?")
+        indexador.parar()
+        config.sessao.salvar(config.armazem_artefatos, {"agente_documentos": memoria})
+
+        print("\n--- Estatísticas por rota de modelo ---")
+        print(config.roteador.relatorio())
+
+        print("\n--- Resumo do rastreamento ---")
+        print(config.rastreador.resumo_chamas())
         
     print("\n" + "="*50)
     print("PASSO 3 CONCLUÍDO")
@@ -1,12 +1,15 @@
 # passo_4_crew_pesquisa_e_download.py
 import passo_0_configuracao_e_ferramentas as config
-import json
 
 if __name__ == '__main__':
     print("\n" + "="*50)
     print("PASSO 4: CREWAI COM TAREFAS SEQUENCIAIS (AULA 4)")
     print("="*50 + "\n")
 
+    # Artefatos de passos anteriores (ex.: buscas do passo 1) continuam
+    # válidos aqui: os handles são restaurados da sessão gravada
+    config.sessao.restaurar(config.armazem_artefatos)
+
     # Ferramentas para o CrewAI
     tool_arxiv = config.LlamaIndexTool.from_tool(config.FunctionTool.from_defaults(fn=config.consulta_artigos))
     tool_baixar = config.LlamaIndexTool.from_tool(config.FunctionTool.from_defaults(fn=config.baixar_pdf_arxiv))
@@ -17,21 +20,21 @@ if __name__ == '__main__':
         goal='Encontrar e baixar artigos científicos do arXiv.',
         backstory='Você é um agente eficiente que primeiro localiza artigos e depois baixa seus PDFs.',
         tools=[tool_arxiv, tool_baixar],
-        llm=config.llm_crewai,
+        llm=config.roteador.llm_crewai("selecao_ferramenta"),
         verbose=True
     )
 
     # Tarefas
     task_pesquisa = config.Task(
         description="Busque artigos no arXiv sobre 'Large Language Models'.",
-        expected_output="Uma lista formatada dos artigos e seus links. O resultado também deve ser salvo em disco.",
+        expected_output="Uma lista formatada dos artigos e seus links, incluindo o handle retornado pela busca (ex.: 'art_1a2b3c4d').",
         agent=pesquisador_downloader_agent
     )
 
     task_download = config.Task(
         description=(
-            "Leia o arquivo 'resultado_pesquisa_arxiv.json' para obter os links da pesquisa anterior. "
-            "Baixe o PDF do PRIMEIRO artigo da lista."
+            "Use o handle retornado pela pesquisa anterior para baixar o PDF do PRIMEIRO artigo da lista, "
+            "passando '<handle>#1' para a ferramenta de download."
         ),
         expected_output="A confirmação de que o PDF foi salvo, com o nome do arquivo.",
         agent=pesquisador_downloader_agent,
@@ -46,6 +49,7 @@ if __name__ == '__main__':
     )
 
     result = crew.kickoff()
+    config.sessao.salvar(config.armazem_artefatos)
     
     print("\n###################### RESULTADO CREW SEQUENCIAL ######################")
     print(result)
@@ -6,22 +6,22 @@ if __name__ == '__main__':
     print("PASSO 5: CREWAI COM VERIFICAÇÃO E HIERARQUIA (AULA 4)")
     print("="*50 + "\n")
 
-    # Ferramenta de pesquisa web (Tavily)
-    tavily_tool_spec = config.TavilyToolSpec(api_key=config.tavily_key)
-    tavily_tools = [config.LlamaIndexTool.from_tool(t) for t in tavily_tool_spec.to_tool_list()]
+    # Ferramentas de pesquisa web (Tavily com cache): os dois crews compartilham
+    # o mesmo cache, então cada busca e cada página são buscadas uma única vez
+    pesquisar_web, verificar_links = [config.LlamaIndexTool.from_tool(t) for t in config.busca_web.ferramentas()]
 
     # Agentes
     pesquisador_web = config.Agent(
         role='Pesquisador Web Especialista',
         goal='Encontrar artigos científicos na web sobre IA na privacidade.',
         backstory='Você é mestre da pesquisa online, focado em fontes confiáveis.',
-        tools=tavily_tools, llm=config.llm_crewai, verbose=True
+        tools=[pesquisar_web], llm=config.roteador.llm_crewai("pesquisa"), verbose=True
     )
     verificador = config.Agent(
         role='Verificador de Artigos',
         goal='Garantir que os links encontrados são de artigos científicos autênticos.',
         backstory='Você tem um olhar crítico para filtrar apenas artigos genuínos.',
-        tools=tavily_tools, llm=config.llm_crewai, verbose=True
+        tools=[verificar_links, pesquisar_web], llm=config.roteador.llm_crewai("verificacao"), verbose=True
     )
 
     # Tarefas para o Crew de verificação
@@ -31,7 +31,10 @@ if __name__ == '__main__':
         agent=pesquisador_web
     )
     task_verificacao = config.Task(
-        description="Verifique a lista de links da tarefa anterior. Retorne a lista final validada.",
+        description=(
+            "Verifique a lista de links da tarefa anterior, passando todos os links de uma vez "
+            "para a ferramenta verificar_links. Retorne a lista final validada."
+        ),
         expected_output="Uma lista final de links confirmados como artigos científicos.",
         agent=verificador, context=[task_pesquisa_web]
     )
@@ -54,12 +57,12 @@ if __name__ == '__main__':
         role="Gerente de Pesquisa",
         goal="Coordenar a equipe para produzir uma lista validada de artigos sobre IA na privacidade.",
         backstory="Você delega a busca e a verificação para garantir um resultado de alta qualidade.",
-        allow_delegation=True, llm=config.llm_crewai, verbose=True
+        allow_delegation=True, llm=config.roteador.llm_crewai("gerente"), verbose=True
     )
     crew_hierarquica = config.Crew(
         agents=[pesquisador_web, verificador],
         tasks=[task_pesquisa_web, task_verificacao],
-        manager_llm=config.llm_crewai,
+        manager_llm=config.roteador.llm_crewai("gerente"),
         process=config.Process.hierarchical,
         verbose=2
     )
@@ -67,6 +70,8 @@ if __name__ == '__main__':
     print("\n###################### RESULTADO CREW HIERÁRQUICO ######################")
     print(result_hierarquia)
     print("######################################################################\n")
+
+    print(f"[BUSCA WEB] {config.busca_web.relatorio()}")
     
     print("\n" + "="*50)
     print("PASSO 5 CONCLUÍDO")